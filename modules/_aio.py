@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+异步运行工具
+在常驻后台线程的事件循环中执行协程，让同步调用方也能复用异步客户端的连接池
+"""
+
+import os
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """获取后台事件循环（首次调用时启动）"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='aio-loop', daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def _reset_after_fork():
+    """fork出的子进程只继承事件循环对象，不继承运行它的线程，需要在子进程中重新创建"""
+    global _loop, _loop_lock
+    _loop = None
+    _loop_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    在后台事件循环中运行协程并阻塞等待结果
+    :param coro: 协程对象
+    :return: 协程返回值
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+缓存工具
+提供线程安全的LRU + TTL内存缓存
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """带过期时间的LRU缓存（线程安全）"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 6 * 3600):
+        """
+        初始化缓存
+        :param maxsize: 最大条目数，超出时淘汰最久未使用的条目
+        :param ttl: 条目有效期（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存
+        :param key: 缓存键
+        :param default: 未命中或已过期时的返回值
+        :return: 缓存值
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        写入缓存
+        :param key: 缓存键
+        :param value: 缓存值
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+配置加载工具
+保证config.env在每个进程中只解析一次
+"""
+
+import os
+import functools
+from pathlib import Path
+from dotenv import dotenv_values
+
+# 项目根目录和配置文件路径（导入时解析一次）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = PROJECT_ROOT / 'config.env'
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env(path: Path) -> dict:
+    """读取并缓存配置文件内容"""
+    return dotenv_values(path)
+
+
+def load_config():
+    """加载环境变量配置（已设置的环境变量不会被覆盖）"""
+    for key, value in _load_env(CONFIG_PATH).items():
+        if value is not None:
+            os.environ.setdefault(key, value)
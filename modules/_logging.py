@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+日志工具
+为各模块提供只初始化一次的日志记录器
+"""
+
+import os
+import queue
+import atexit
+import logging
+import functools
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from ._config import PROJECT_ROOT
+
+# 日志目录（导入时创建一次）
+LOG_DIR = PROJECT_ROOT / 'logs'
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class _ForwardingQueueHandler(QueueHandler):
+    """把日志记录连同目标处理器放入队列，由后台线程写出"""
+
+    def __init__(self, log_queue: queue.SimpleQueue, target: logging.Handler):
+        super().__init__(log_queue)
+        self.target = target
+
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.put_nowait((self.target, record))
+
+
+class _DispatchingQueueListener(QueueListener):
+    """后台线程：按记录附带的目标处理器写出日志"""
+
+    def handle(self, item):
+        target, record = item
+        if record.levelno >= target.level:
+            target.handle(record)
+
+
+# 所有文件和控制台输出共用一个队列和一个后台线程，记录日志的线程不阻塞在磁盘IO上
+_queue = queue.SimpleQueue()
+_listener = _DispatchingQueueListener(_queue)
+_listener.start()
+
+
+def _stop_listener():
+    """退出时写出队列中剩余的日志"""
+    _listener.stop()
+
+
+def _restart_listener_after_fork():
+    """fork出的子进程不继承后台线程，需要在子进程中为同一队列重新启动监听线程"""
+    global _listener
+    _listener = _DispatchingQueueListener(_queue)
+    _listener.start()
+
+
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def queue_handler(target: logging.Handler) -> logging.Handler:
+    """
+    包装处理器：记录日志时只入队，实际写出在后台线程完成
+    :param target: 实际写出日志的处理器（需自行设置格式）
+    :return: 挂到记录器上的队列处理器
+    """
+    return _ForwardingQueueHandler(_queue, target)
+
+
+@functools.lru_cache(maxsize=None)
+def get_logger(name: str, filename: str, tag: str = None) -> logging.Logger:
+    """
+    获取带文件输出的日志记录器（同名记录器只配置一次）
+    :param name: 日志记录器名称
+    :param filename: 日志文件名
+    :param tag: 日志格式中的模块标识（默认由名称生成）
+    :return: 日志记录器
+    """
+    # 按大小轮转，避免长期运行的服务日志无限增长
+    handler = RotatingFileHandler(LOG_DIR / filename, maxBytes=10 << 20, backupCount=3, encoding='utf-8')
+    handler.setFormatter(logging.Formatter(
+        f'%(asctime)s - {tag or name.upper()} - %(levelname)s - %(message)s'
+    ))
+    
+    # 只挂到具名记录器上，控制台输出交给根记录器
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler(handler))
+    return logger
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+OpenAI接口限流
+同一事件循环内GPT和Whisper请求共用同一组RPM/TPM令牌桶，在发出请求前主动避开429
+"""
+
+import os
+import asyncio
+import weakref
+import functools
+import threading
+
+# aiolimiter为可选依赖，未安装时只依赖429退避重试
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+
+# 限流器不是线程安全的，也不能跨事件循环唤醒等待者，每个事件循环一组
+# 请求通常都在_aio的后台事件循环中发出，多个事件循环同时请求时各自计量
+_limiters = weakref.WeakKeyDictionary()
+_limiters_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_rates():
+    """读取RPM/TPM配置（首次使用时读取）"""
+    return int(os.getenv("OPENAI_RPM", "500")), int(os.getenv("OPENAI_TPM", "0"))
+
+
+def _get_limiters():
+    """获取当前事件循环的限流器（首次使用时创建）"""
+    if AsyncLimiter is None:
+        return None, None
+    loop = asyncio.get_running_loop()
+    with _limiters_lock:
+        limiters = _limiters.get(loop)
+        if limiters is None:
+            rpm, tpm = _get_rates()
+            _limiters[loop] = limiters = (
+                AsyncLimiter(rpm, 60) if rpm > 0 else None,
+                AsyncLimiter(tpm, 60) if tpm > 0 else None
+            )
+            # 限流器持有事件循环的强引用，条目不会随事件循环自动移除，创建时清理已关闭的事件循环
+            for old_loop in [l for l in _limiters if l.is_closed()]:
+                del _limiters[old_loop]
+    return limiters
+
+
+async def acquire(tokens: int = 0):
+    """
+    等待限流额度
+    :param tokens: 本次请求预计消耗的token数（0表示不计入TPM）
+    """
+    rpm, tpm = _get_limiters()
+    if rpm is not None:
+        await rpm.acquire()
+    if tpm is not None and tokens > 0:
+        # 单次请求超过整分钟额度时按整桶计算，避免永远等不到
+        await tpm.acquire(min(tokens, tpm.max_rate))
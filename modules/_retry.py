@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+OpenAI接口重试工具
+GPT和Whisper共用同一套状态码处理和退避策略
+"""
+
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+# 不重试的状态码 -> 错误说明（None表示附带响应内容）
+_FATAL_ERRORS = {
+    400: None,
+    401: "OpenAI API密钥无效或已过期",
+}
+
+# 可重试的状态码 -> 错误说明
+_RETRY_ERRORS = {
+    429: "API请求频率过高，请稍后重试",
+    502: "OpenAI服务器网关错误，服务器可能暂时不可用",
+    503: "OpenAI服务暂时不可用，服务器可能正在维护",
+}
+
+
+async def call_with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    parse: Callable[[httpx.Response], Optional[Dict]],
+    *,
+    label: str,
+    max_retries: int,
+    retry_delay: float,
+    retry_delays: Dict[int, Callable[[int], float]],
+    logger: logging.Logger
+) -> Dict:
+    """
+    发送请求并按状态码退避重试
+    :param send: 发送一次请求的协程函数（每次尝试重新调用）
+    :param parse: 解析200响应，返回结果字典；返回None表示内容为空，需要重试
+    :param label: 日志和错误信息中的接口名称
+    :param max_retries: 最大尝试次数
+    :param retry_delay: 默认等待秒数（超时、连接错误和未单独配置的状态码）
+    :param retry_delays: 状态码 -> 等待时间函数（参数为尝试序号，从0开始）
+    :param logger: 日志记录器
+    :return: 成功时为parse的返回值，失败时为{"success": False, "error": ...}
+    """
+    error_msg = f"{label}调用失败，已重试{max_retries}次"
+    for attempt in range(max_retries):
+        delay = retry_delay
+        try:
+            logger.info(f"调用{label} (尝试 {attempt + 1}/{max_retries})")
+            response = await send()
+            status = response.status_code
+
+            if status == 200:
+                result = parse(response)
+                if result is not None:
+                    return result
+                error_msg = f"{label}返回空内容"
+                logger.warning(error_msg)
+
+            elif status in _FATAL_ERRORS:
+                error_msg = _FATAL_ERRORS[status] or f"请求参数错误: {response.text}"
+                logger.error(f"{label}请求失败 ({status}): {error_msg}")
+                return {
+                    "success": False,
+                    "error": error_msg
+                }
+
+            else:
+                error_msg = _RETRY_ERRORS.get(status) or f"{label}请求失败，状态码: {status}"
+                logger.warning(f"{error_msg} (尝试 {attempt + 1}/{max_retries})")
+                if status in retry_delays:
+                    delay = retry_delays[status](attempt)
+
+        except httpx.TimeoutException:
+            error_msg = f"{label}请求超时"
+            logger.warning(f"请求超时 (尝试 {attempt + 1}/{max_retries})")
+
+        except httpx.HTTPError as e:
+            error_msg = f"{label}请求异常: {e}"
+            logger.warning(f"请求异常 (尝试 {attempt + 1}/{max_retries}): {e}")
+
+        except Exception as e:
+            logger.error(f"{label}调用异常: {e}")
+            return {
+                "success": False,
+                "error": f"{label}调用异常: {e}"
+            }
+
+        if attempt < max_retries - 1:
+            # 加入与等待时间成比例的随机抖动（最多10%），避免大量请求在同一时刻重试
+            wait_time = delay + random.uniform(0, delay * 0.1)
+            logger.info(f"等待 {wait_time:.1f} 秒后重试")
+            await asyncio.sleep(wait_time)
+
+    return {
+        "success": False,
+        "error": error_msg
+    }
@@ -3,6 +3,6 @@
 负责识别用户输入中的链接类型，并决定使用哪个解析器
 """
 
-from .link_classifier import LinkClassifier
+from .link_classifier import URL_RE, LinkClassifier, identify_link_type
 
-__all__ = ['LinkClassifier'] 
\ No newline at end of file
+__all__ = ['LinkClassifier', 'URL_RE', 'identify_link_type'] 
\ No newline at end of file
@@ -4,11 +4,152 @@
 识别用户输入中的链接类型，并决定使用哪个解析器
 """
 
-import os
 import re
+import sys
 import logging
+import functools
 from typing import Dict, Optional, Tuple
-from dotenv import load_dotenv
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from .._config import load_config
+from .._logging import get_logger
+
+try:
+    import regex as _regex
+except ImportError:
+    _regex = None
+
+# 直链媒体文件扩展名
+VIDEO_EXTS = frozenset({'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv', 'webm', 'm4v'})
+AUDIO_EXTS = frozenset({'mp3', 'wav', 'm4a', 'aac', 'flac', 'ogg'})
+
+# 超过该数量的链接时并发分类
+PARALLEL_THRESHOLD = 4
+
+# 平台域名后缀与链接类型的对应关系
+HOST_TYPES = {
+    "bilibili.com": "bilibili",
+    "b23.tv": "bilibili",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "vimeo.com": "vimeo",
+    "douyin.com": "douyin",
+    "kuaishou.com": "kuaishou"
+}
+
+# 链接类型常量，按主要链接的优先级排序（直链 > 平台链接 > 未知）
+# 驻留后各处的相等比较可以直接走指针比较的快速路径
+_PLATFORMS = tuple(sys.intern(s) for s in (
+    "direct_video", "direct_audio", "bilibili", "youtube", "vimeo", "douyin", "kuaishou", "unknown"
+))
+
+# 链接类型 -> 优先级序号
+_PRIORITY = {link_type: i for i, link_type in enumerate(_PLATFORMS)}
+
+# 链接类型与解析器名称的对应关系
+PARSER_MAPPING = dict(zip(_PLATFORMS, (
+    "direct_downloader",
+    "direct_downloader",
+    "bilibili_parser",
+    "youtube_parser",
+    "vimeo_parser",
+    "douyin_parser",
+    "kuaishou_parser",
+    "generic_parser"
+)))
+
+# URL提取正则：使用占有量词，匹配失败时不回溯
+# （优先使用第三方regex模块，标准库re自Python 3.11起支持占有量词）
+if _regex is not None or sys.version_info >= (3, 11):
+    URL_RE = (_regex or re).compile(r'https?://[^\s<>"{}|\\^`\[\]]++')
+else:
+    URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+# 定义链接模式
+LINK_PATTERNS = {
+    "bilibili": [
+        r'https?://(?:www\.)?bilibili\.com/video/([A-Za-z0-9]+)',
+        r'https?://b23\.tv/([A-Za-z0-9]+)',
+        r'https?://(?:www\.)?bilibili\.com/bangumi/play/([A-Za-z0-9]+)',
+        r'https?://(?:www\.)?bilibili\.com/medialist/play/([A-Za-z0-9]+)',
+        r'https?://(?:www\.)?bilibili\.com/cheese/play/([A-Za-z0-9]+)'
+    ],
+    "youtube": [
+        r'https?://(?:www\.)?youtube\.com/watch\?v=([A-Za-z0-9_-]+)',
+        r'https?://youtu\.be/([A-Za-z0-9_-]+)',
+        r'https?://(?:www\.)?youtube\.com/embed/([A-Za-z0-9_-]+)'
+    ],
+    "vimeo": [
+        r'https?://(?:www\.)?vimeo\.com/(\d+)',
+        r'https?://player\.vimeo\.com/video/(\d+)'
+    ],
+    "douyin": [
+        r'https?://(?:www\.)?douyin\.com/video/([A-Za-z0-9]+)',
+        r'https?://v\.douyin\.com/([A-Za-z0-9]+)'
+    ],
+    "kuaishou": [
+        r'https?://(?:www\.)?kuaishou\.com/short-video/([A-Za-z0-9]+)',
+        r'https?://v\.kuaishou\.com/([A-Za-z0-9]+)'
+    ]
+}
+
+
+def _combine_patterns(link_type: str, patterns: list) -> tuple:
+    """
+    将同一平台的模式合并为带命名分组的正则
+    :param link_type: 链接类型
+    :param patterns: 模式字符串列表
+    :return: (合并正则, {分组名: 平台ID分组序号})
+    """
+    combined = re.compile('|'.join(
+        f"(?P<{link_type}_{i}>{pattern})" for i, pattern in enumerate(patterns)
+    ))
+    id_groups = {
+        f"{link_type}_{i}": combined.groupindex[f"{link_type}_{i}"] + 1 if re.compile(pattern).groups else None
+        for i, pattern in enumerate(patterns)
+    }
+    return combined, id_groups
+
+
+# 按域名后缀预筛选，每个链接只需尝试对应平台的模式：域名后缀 -> (链接类型, 合并正则, 分组映射)
+_COMBINED_PATTERNS = {link_type: _combine_patterns(link_type, patterns) for link_type, patterns in LINK_PATTERNS.items()}
+_HOST_PATTERNS = {
+    suffix: (link_type,) + _COMBINED_PATTERNS[link_type]
+    for suffix, link_type in HOST_TYPES.items()
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def identify_link_type(url: str) -> Tuple[str, Optional[str]]:
+    """
+    识别单个链接的类型（纯函数，结果按URL缓存）
+    :param url: 链接
+    :return: (链接类型, 平台ID)
+    """
+    # 直链只需检查路径的扩展名，无需走正则匹配
+    parts = urlsplit(url)
+    path = parts.path
+    ext = path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    if ext in VIDEO_EXTS:
+        return "direct_video", None
+    if ext in AUDIO_EXTS:
+        return "direct_audio", None
+    
+    # 按域名标签从长到短查找后缀，耗时只与域名层级数有关，与平台数量无关
+    labels = (parts.hostname or '').split('.')
+    for i in range(len(labels) - 1):
+        entry = _HOST_PATTERNS.get('.'.join(labels[i:]))
+        if entry:
+            link_type, combined, id_groups = entry
+            match = combined.match(url)
+            if match:
+                id_group = id_groups[match.lastgroup]
+                return link_type, match.group(id_group) if id_group else None
+            break
+    
+    # 如果没有匹配到任何模式，默认为未知类型
+    return "unknown", None
+
 
 class LinkClassifier:
     """链接分类器"""
@@ -16,67 +157,12 @@ class LinkClassifier:
     def __init__(self):
         """初始化链接分类器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - LINK_CLASSIFIER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'link_classifier.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('LinkClassifier')
+        self.logger = get_logger('LinkClassifier', 'link_classifier.log', 'LINK_CLASSIFIER')
         
-        # 定义链接模式
-        self.link_patterns = {
-            "bilibili": [
-                r'https?://(?:www\.)?bilibili\.com/video/([A-Za-z0-9]+)',
-                r'https?://b23\.tv/([A-Za-z0-9]+)',
-                r'https?://(?:www\.)?bilibili\.com/bangumi/play/([A-Za-z0-9]+)',
-                r'https?://(?:www\.)?bilibili\.com/medialist/play/([A-Za-z0-9]+)',
-                r'https?://(?:www\.)?bilibili\.com/cheese/play/([A-Za-z0-9]+)'
-            ],
-            "youtube": [
-                r'https?://(?:www\.)?youtube\.com/watch\?v=([A-Za-z0-9_-]+)',
-                r'https?://youtu\.be/([A-Za-z0-9_-]+)',
-                r'https?://(?:www\.)?youtube\.com/embed/([A-Za-z0-9_-]+)'
-            ],
-            "vimeo": [
-                r'https?://(?:www\.)?vimeo\.com/(\d+)',
-                r'https?://player\.vimeo\.com/video/(\d+)'
-            ],
-            "douyin": [
-                r'https?://(?:www\.)?douyin\.com/video/([A-Za-z0-9]+)',
-                r'https?://v\.douyin\.com/([A-Za-z0-9]+)'
-            ],
-            "kuaishou": [
-                r'https?://(?:www\.)?kuaishou\.com/short-video/([A-Za-z0-9]+)',
-                r'https?://v\.kuaishou\.com/([A-Za-z0-9]+)'
-            ],
-            "direct_video": [
-                # 视频文件扩展名
-                r'.*\.(mp4|avi|mov|mkv|wmv|flv|webm|m4v)(\?.*)?$',
-                # B站视频直链（CDN域名）
-                r'https?://[^/]*bilivideo\.com/.*\.(mp4|flv|m4v)(\?.*)?$',
-                # 其他常见视频CDN域名
-                r'https?://[^/]*\.(cdn|media|video|stream)\.com/.*\.(mp4|avi|mov|mkv|wmv|flv|webm|m4v)(\?.*)?$',
-                # 包含视频关键词的直链
-                r'https?://[^/]*\.(mp4|avi|mov|mkv|wmv|flv|webm|m4v)(\?.*)?$'
-            ],
-            "direct_audio": [
-                # 音频文件扩展名
-                r'.*\.(mp3|wav|m4a|aac|flac|ogg)(\?.*)?$',
-                # 包含音频关键词的直链
-                r'https?://[^/]*\.(mp3|wav|m4a|aac|flac|ogg)(\?.*)?$'
-            ]
-        }
+        self.link_patterns = LINK_PATTERNS
         
         self.logger.info("链接分类器已初始化")
     
@@ -87,11 +173,29 @@ class LinkClassifier:
         :return: 分类结果
         """
         try:
-            self.logger.info(f"开始分类链接: {input_text}")
+            self.logger.info("开始分类链接: %s", input_text)
+            
+            # 快速路径：输入本身就是单个链接时，跳过链接提取
+            stripped = input_text.strip()
+            if stripped.startswith(('http://', 'https://')) and URL_RE.fullmatch(stripped):
+                link_type, platform_id = self._identify_link_type(stripped)
+                self.logger.debug("单链接 %s 分类为: %s, 平台ID: %s", stripped, link_type, platform_id)
+                link = {
+                    "url": stripped,
+                    "type": link_type,
+                    "platform_id": platform_id,
+                    "parser": self._get_parser_name(link_type)
+                }
+                return {
+                    "success": True,
+                    "links": [link],
+                    "primary_link": link,
+                    "total_links": 1
+                }
             
             # 查找所有链接
             links = self._extract_links(input_text)
-            self.logger.info(f"提取到 {len(links)} 个链接: {links}")
+            self.logger.info("提取到 %d 个链接: %s", len(links), links)
             
             if not links:
                 return {
@@ -101,11 +205,18 @@ class LinkClassifier:
                     "primary_link": None
                 }
             
-            # 分类每个链接
+            # 分类每个链接（链接较多时并发识别，单个链接留在当前线程避免线程池开销）
+            if len(links) > PARALLEL_THRESHOLD:
+                with ThreadPoolExecutor(max_workers=min(16, len(links))) as executor:
+                    identified = list(executor.map(self._identify_link_type, links))
+            else:
+                identified = [self._identify_link_type(link) for link in links]
+            
             classified_links = []
-            for link in links:
-                link_type, platform_id = self._identify_link_type(link)
-                self.logger.info(f"链接 {link} 分类为: {link_type}, 平台ID: {platform_id}")
+            debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+            for link, (link_type, platform_id) in zip(links, identified):
+                if debug_enabled:
+                    self.logger.debug("链接 %s 分类为: %s, 平台ID: %s", link, link_type, platform_id)
                 classified_links.append({
                     "url": link,
                     "type": link_type,
@@ -115,7 +226,7 @@ class LinkClassifier:
             
             # 确定主要链接（优先级：直链 > 平台链接）
             primary_link = self._select_primary_link(classified_links)
-            self.logger.info(f"选择主要链接: {primary_link}")
+            self.logger.info("选择主要链接: %s", primary_link)
             
             return {
                 "success": True,
@@ -125,7 +236,7 @@ class LinkClassifier:
             }
             
         except Exception as e:
-            self.logger.error(f"链接分类失败: {e}")
+            self.logger.error("链接分类失败: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -135,35 +246,15 @@ class LinkClassifier:
     
     def _extract_links(self, text: str) -> list:
         """提取文本中的所有链接"""
-        # 简单的URL提取正则表达式
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        return re.findall(url_pattern, text)
+        return URL_RE.findall(text)
     
     def _identify_link_type(self, url: str) -> Tuple[str, Optional[str]]:
         """识别单个链接的类型"""
-        for link_type, patterns in self.link_patterns.items():
-            for pattern in patterns:
-                match = re.match(pattern, url)
-                if match:
-                    platform_id = match.group(1) if len(match.groups()) > 0 else None
-                    return link_type, platform_id
-        
-        # 如果没有匹配到任何模式，默认为未知类型
-        return "unknown", None
+        return identify_link_type(url)
     
     def _get_parser_name(self, link_type: str) -> str:
         """根据链接类型获取对应的解析器名称"""
-        parser_mapping = {
-            "bilibili": "bilibili_parser",
-            "youtube": "youtube_parser", 
-            "vimeo": "vimeo_parser",
-            "douyin": "douyin_parser",
-            "kuaishou": "kuaishou_parser",
-            "direct_video": "direct_downloader",
-            "direct_audio": "direct_downloader",
-            "unknown": "generic_parser"
-        }
-        return parser_mapping.get(link_type, "generic_parser")
+        return PARSER_MAPPING.get(link_type, "generic_parser")
     
     def _select_primary_link(self, classified_links: list) -> Optional[dict]:
         """选择主要链接"""
@@ -172,11 +263,5 @@ class LinkClassifier:
         
         # 优先级：直链 > 平台链接 > 未知
         # 直链优先级更高，因为可以直接下载，不需要解析
-        priority_order = ["direct_video", "direct_audio", "bilibili", "youtube", "vimeo", "douyin", "kuaishou", "unknown"]
-        
-        for priority_type in priority_order:
-            for link in classified_links:
-                if link["type"] == priority_type:
-                    return link
-        
-        return classified_links[0]  # 如果没有找到优先级链接，返回第一个 
\ No newline at end of file
+        # 同一优先级取最先出现的链接；未知类型排在最后
+        return min(classified_links, key=lambda link: _PRIORITY.get(link["type"], len(_PRIORITY)))
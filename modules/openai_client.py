@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+OpenAI接口客户端
+TextProcessor和AudioTranscriber共用同一份配置、连接池、限流器和重试策略
+"""
+
+import os
+import uuid
+import asyncio
+import weakref
+import logging
+import functools
+import mimetypes
+import importlib.util
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from . import _ratelimit
+from ._config import load_config
+from ._retry import call_with_retry
+
+# 安装h2后启用HTTP/2，多个并发请求复用同一条连接
+_HTTP2 = importlib.util.find_spec('h2') is not None
+_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+# 上传文件时每次从磁盘读取的块大小
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _multipart_upload(file_path: str, fields: List[Tuple[str, str]]) -> Tuple[Dict, AsyncIterator[bytes]]:
+    """
+    构建流式multipart请求体：文件内容按块读取发送，不整体载入内存
+    :param file_path: 上传的文件路径
+    :param fields: 普通表单字段 [(名称, 值)]，同名字段可重复
+    :return: (请求头, 请求体异步迭代器)
+    """
+    boundary = uuid.uuid4().hex
+    filename = os.path.basename(file_path).replace('"', '%22')
+    content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+
+    head = b''.join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        for name, value in fields
+    ) + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode('utf-8')
+    tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+    async def body() -> AsyncIterator[bytes]:
+        yield head
+        with open(file_path, 'rb') as f:
+            while True:
+                # 磁盘读取放到线程中，不阻塞事件循环
+                chunk = await asyncio.to_thread(f.read, _UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        yield tail
+
+    # 显式给出Content-Length，避免分块传输编码
+    headers = {
+        'Content-Type': f'multipart/form-data; boundary={boundary}',
+        'Content-Length': str(len(head) + os.path.getsize(file_path) + len(tail))
+    }
+    return headers, body()
+
+
+class RetryPolicy:
+    """单类请求的重试策略"""
+
+    def __init__(self, label: str, max_retries: int, retry_delay: float,
+                 retry_delays: Optional[Dict[int, Callable[[int], float]]] = None, timeout: float = 60):
+        """
+        初始化重试策略
+        :param label: 日志和错误信息中的接口名称
+        :param max_retries: 最大尝试次数
+        :param retry_delay: 默认等待秒数
+        :param retry_delays: 状态码 -> 等待时间函数（参数为尝试序号）
+        :param timeout: 单次请求超时（秒）
+        """
+        self.label = label
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_delays = retry_delays or {}
+        self.timeout = timeout
+
+
+class OpenAIClient:
+    """OpenAI接口客户端（进程内单例）"""
+
+    def __init__(self):
+        """初始化客户端配置"""
+        load_config()
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.base_url = os.getenv("OPENAI_BASE_URL")
+
+        # 长连接客户端，每个事件循环一个，首次请求时创建；事件循环被回收后条目自动移除
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def configured(self) -> bool:
+        """API密钥和地址是否都已配置"""
+        return bool(self.api_key and self.base_url)
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """获取当前事件循环的长连接客户端（同一事件循环内的请求共享连接池）"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            self._clients[loop] = client = httpx.AsyncClient(http2=_HTTP2, limits=_LIMITS)
+            # 已关闭的事件循环上的连接无法再异步关闭，直接丢弃对应客户端
+            for old_loop in [l for l in self._clients if l.is_closed()]:
+                del self._clients[old_loop]
+        return client
+
+    async def aclose(self):
+        """关闭所有事件循环上的HTTP客户端，释放连接池（下次请求时重新创建）"""
+        current = asyncio.get_running_loop()
+        clients, self._clients = list(self._clients.items()), weakref.WeakKeyDictionary()
+        for loop, client in clients:
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                # 客户端只能在所属事件循环上关闭
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def request(self, method: str, path: str, parse: Callable[[httpx.Response], Optional[Dict]],
+                      policy: RetryPolicy, logger: logging.Logger, tokens: int = 0,
+                      build: Optional[Callable[[], Dict]] = None, **kwargs) -> Dict:
+        """
+        发送请求（限流 + 按策略退避重试）
+        :param method: 请求方法
+        :param path: 相对于OPENAI_BASE_URL的路径
+        :param parse: 解析200响应，返回None表示内容为空需要重试
+        :param policy: 重试策略
+        :param logger: 日志记录器
+        :param tokens: 预计消耗的token数（计入TPM限流）
+        :param build: 每次尝试时生成额外请求参数（如需重新打开的上传流）
+        :return: 请求结果
+        """
+        url = f"{self.base_url}{path}"
+
+        async def send():
+            await _ratelimit.acquire(tokens)
+            extra = build() if build is not None else {}
+            headers = {"Authorization": f"Bearer {self.api_key}", **extra.pop("headers", {})}
+            return await self._get_http().request(
+                method, url, headers=headers, timeout=policy.timeout, **kwargs, **extra
+            )
+
+        return await call_with_retry(
+            send,
+            parse,
+            label=policy.label,
+            max_retries=policy.max_retries,
+            retry_delay=policy.retry_delay,
+            retry_delays=policy.retry_delays,
+            logger=logger
+        )
+
+    async def post_json(self, path: str, data: Dict, parse: Callable[[httpx.Response], Optional[Dict]],
+                        policy: RetryPolicy, logger: logging.Logger, tokens: int = 0) -> Dict:
+        """
+        发送JSON请求
+        :param path: 相对于OPENAI_BASE_URL的路径
+        :param data: 请求体
+        :param parse: 解析200响应
+        :param policy: 重试策略
+        :param logger: 日志记录器
+        :param tokens: 预计消耗的token数
+        :return: 请求结果
+        """
+        return await self.request("POST", path, parse, policy, logger, tokens=tokens, json=data)
+
+    async def post_multipart(self, path: str, file_path: str, fields: List[Tuple[str, str]],
+                             parse: Callable[[httpx.Response], Optional[Dict]],
+                             policy: RetryPolicy, logger: logging.Logger) -> Dict:
+        """
+        流式上传文件
+        :param path: 相对于OPENAI_BASE_URL的路径
+        :param file_path: 上传的文件路径
+        :param fields: 普通表单字段
+        :param parse: 解析200响应
+        :param policy: 重试策略
+        :param logger: 日志记录器
+        :return: 请求结果
+        """
+        def build() -> Dict:
+            # 每次重试重新打开文件
+            headers, body = _multipart_upload(file_path, fields)
+            return {"headers": headers, "content": body}
+
+        return await self.request("POST", path, parse, policy, logger, build=build)
+
+
+@functools.lru_cache(maxsize=1)
+def get_client() -> OpenAIClient:
+    """获取进程内共享的OpenAI客户端"""
+    return OpenAIClient()
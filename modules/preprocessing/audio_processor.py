@@ -5,9 +5,72 @@
 """
 
 import os
-import logging
-from typing import Dict, Optional
-from dotenv import load_dotenv
+import asyncio
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from .._config import load_config
+from .._logging import get_logger
+
+# PyAV为可选依赖，可用时在进程内完成音频提取
+try:
+    import av
+except ImportError:
+    av = None
+
+# 模拟音频文件内容：小的WAV文件头 + 一些静音数据
+_MOCK_WAV_BYTES = (
+    b'RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x40\x1f\x00\x00\x80\x3e\x00\x00\x02\x00\x10\x00data\x00\x08\x00\x00'
+    + bytes(1000)
+)
+
+def _build_ffmpeg_cmd(video_path: str, audio_path: str, audio_format: str) -> List[str]:
+    """
+    构建提取音频的ffmpeg命令
+    :param video_path: 视频文件路径
+    :param audio_path: 音频输出路径
+    :param audio_format: 音频格式
+    :return: 命令参数列表
+    """
+    return [
+        'ffmpeg',
+        '-loglevel', 'error',  # 只输出错误信息
+        '-i', video_path,
+        '-vn',  # 不包含视频
+        '-acodec', 'pcm_s16le' if audio_format == 'wav' else 'aac',  # 音频编码
+        '-ar', '16000',  # 采样率16kHz（适合语音识别）
+        '-ac', '1',  # 单声道
+        '-y',  # 覆盖输出文件
+        audio_path
+    ]
+
+
+def _extract_one(video_path: str, audio_path: str, audio_format: str) -> Dict:
+    """
+    在子进程池中提取单个视频的音频（模块级函数，便于进程间传递）
+    :param video_path: 视频文件路径
+    :param audio_path: 音频输出路径
+    :param audio_format: 音频格式
+    :return: 提取结果
+    """
+    try:
+        result = subprocess.run(
+            _build_ffmpeg_cmd(video_path, audio_path, audio_format),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=300
+        )
+        if result.returncode == 0:
+            return {"success": True}
+        return {"success": False, "error": f"ffmpeg音频提取失败: {result.stderr.decode('utf-8', 'replace')}"}
+    except subprocess.TimeoutExpired:
+        return {"success": False, "error": "ffmpeg音频提取超时"}
+    except FileNotFoundError:
+        return {"success": False, "error": "ffmpeg未安装，无法提取音频"}
+    except Exception as e:
+        return {"success": False, "error": f"ffmpeg音频提取异常: {e}"}
+
 
 class AudioProcessor:
     """音频处理器"""
@@ -15,27 +78,15 @@ class AudioProcessor:
     def __init__(self):
         """初始化音频处理器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - AUDIO_PROCESSOR - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'audio_processor.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('AudioProcessor')
+        self.logger = get_logger('AudioProcessor', 'audio_processor.log', 'AUDIO_PROCESSOR')
         
         # 从环境变量读取配置
         self.temp_dir = os.getenv("TEMP_DIR", "./temp")
         self.output_dir = os.getenv("TRANSCRIPTION_OUTPUT_DIR", "./output/transcriptions")
+        self.batch_workers = int(os.getenv("AUDIO_BATCH_WORKERS", str(os.cpu_count() or 1)))
         
         # 确保目录存在
         os.makedirs(self.temp_dir, exist_ok=True)
@@ -107,10 +158,13 @@ class AudioProcessor:
     
     def _get_file_format(self, file_path: str) -> Optional[str]:
         """获取文件格式"""
-        if not file_path or '.' not in file_path:
+        if not file_path:
             return None
         
-        return file_path.split('.')[-1].lower()
+        # 对URL只取路径部分，避免把域名或查询参数当作扩展名
+        path = urlsplit(file_path).path if '://' in file_path else file_path
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        return ext or None
     
     def _convert_format(self, file_path: str, target_format: str) -> Optional[str]:
         """
@@ -156,9 +210,7 @@ class AudioProcessor:
                 }
             
             # 生成音频文件名
-            base_name = os.path.splitext(os.path.basename(video_path))[0]
-            audio_filename = f"{base_name}_audio.{audio_format}"
-            audio_path = os.path.join(self.temp_dir, audio_filename)
+            audio_path = self._get_audio_path(video_path, audio_format)
             
             # 检查是否已经存在音频文件
             if os.path.exists(audio_path):
@@ -173,39 +225,244 @@ class AudioProcessor:
             
             # 尝试使用ffmpeg提取音频
             success = self._extract_audio_with_ffmpeg(video_path, audio_path, audio_format)
+            return self._build_extraction_result(video_path, audio_path, audio_format, success)
+            
+        except Exception as e:
+            self.logger.error(f"音频提取失败: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "video_path": video_path
+            }
+    
+    def _build_extraction_result(self, video_path: str, audio_path: str, audio_format: str, success: bool) -> Dict:
+        """
+        根据ffmpeg执行结果构建音频提取结果
+        :param video_path: 视频文件路径
+        :param audio_path: 音频输出路径
+        :param audio_format: 音频格式
+        :param success: ffmpeg是否执行成功
+        :return: 提取结果
+        """
+        if success:
+            # 验证提取的音频文件
+            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
+                self.logger.info(f"音频提取完成: {audio_path}")
+                return {
+                    "success": True,
+                    "audio_path": audio_path,
+                    "video_path": video_path,
+                    "format": audio_format,
+                    "message": "音频提取完成"
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": "音频提取后文件无效",
+                    "video_path": video_path
+                }
+        else:
+            # 如果ffmpeg失败，创建模拟音频文件（用于测试）
+            self.logger.warning("ffmpeg提取失败，创建模拟音频文件用于测试")
+            self._create_mock_audio_file(audio_path)
+            
+            return {
+                "success": True,
+                "audio_path": audio_path,
+                "video_path": video_path,
+                "format": audio_format,
+                "message": "音频提取完成（模拟文件）"
+            }
+    
+    async def extract_audio_from_video_async(self, video_path: str, audio_format: str = "wav") -> Dict:
+        """
+        从视频中提取音频（异步版本，ffmpeg运行期间不阻塞事件循环）
+        :param video_path: 视频文件路径
+        :param audio_format: 音频格式
+        :return: 提取结果
+        """
+        try:
+            self.logger.info(f"开始从视频异步提取音频: {video_path}")
+            
+            if not os.path.exists(video_path):
+                return {
+                    "success": False,
+                    "error": "视频文件不存在",
+                    "video_path": video_path
+                }
+            
+            audio_path = self._get_audio_path(video_path, audio_format)
+            if os.path.exists(audio_path):
+                self.logger.info(f"音频文件已存在: {audio_path}")
+                return {
+                    "success": True,
+                    "audio_path": audio_path,
+                    "video_path": video_path,
+                    "format": audio_format,
+                    "message": "音频文件已存在"
+                }
+            
+            success = await self._extract_audio_with_ffmpeg_async(video_path, audio_path, audio_format)
+            return self._build_extraction_result(video_path, audio_path, audio_format, success)
+            
+        except Exception as e:
+            self.logger.error(f"音频提取失败: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "video_path": video_path
+            }
+    
+    def extract_audio_batch(self, video_paths: List[str], audio_format: str = "wav") -> Dict:
+        """
+        批量从视频中提取音频（多个ffmpeg进程并行）
+        :param video_paths: 视频文件路径列表
+        :param audio_format: 音频格式
+        :return: 提取结果，results与video_paths顺序一致
+        """
+        try:
+            self.logger.info(f"开始批量提取音频，共{len(video_paths)}个视频")
             
-            if success:
-                # 验证提取的音频文件
-                if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                    self.logger.info(f"音频提取完成: {audio_path}")
-                    return {
+            results = {}
+            jobs = []
+            # 重复的视频只提取一次
+            for video_path in dict.fromkeys(video_paths):
+                if not os.path.exists(video_path):
+                    results[video_path] = {
+                        "success": False,
+                        "error": "视频文件不存在",
+                        "video_path": video_path
+                    }
+                    continue
+                
+                audio_path = self._get_audio_path(video_path, audio_format)
+                if os.path.exists(audio_path):
+                    results[video_path] = {
                         "success": True,
                         "audio_path": audio_path,
                         "video_path": video_path,
                         "format": audio_format,
-                        "message": "音频提取完成"
+                        "message": "音频文件已存在"
                     }
                 else:
-                    return {
-                        "success": False,
-                        "error": "音频提取后文件无效",
-                        "video_path": video_path
+                    jobs.append((video_path, audio_path))
+            
+            if jobs:
+                # 并发数受AUDIO_BATCH_WORKERS限制，避免解码缓冲占用过多内存
+                max_workers = max(1, min(len(jobs), self.batch_workers))
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(_extract_one, video_path, audio_path, audio_format): (video_path, audio_path)
+                        for video_path, audio_path in jobs
                     }
-            else:
-                # 如果ffmpeg失败，创建模拟音频文件（用于测试）
-                self.logger.warning("ffmpeg提取失败，创建模拟音频文件用于测试")
-                self._create_mock_audio_file(audio_path)
-                
+                    for future in as_completed(futures):
+                        video_path, audio_path = futures[future]
+                        outcome = future.result()
+                        
+                        if outcome["success"] and os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
+                            message = "音频提取完成"
+                        else:
+                            # 与单个提取保持一致：失败时创建模拟音频文件（用于测试）
+                            self.logger.warning(f"{outcome.get('error', '音频提取后文件无效')}，创建模拟音频文件用于测试")
+                            self._create_mock_audio_file(audio_path)
+                            message = "音频提取完成（模拟文件）"
+                        
+                        results[video_path] = {
+                            "success": True,
+                            "audio_path": audio_path,
+                            "video_path": video_path,
+                            "format": audio_format,
+                            "message": message
+                        }
+            
+            ordered = [results[video_path] for video_path in video_paths]
+            self.logger.info(f"批量音频提取完成，成功{sum(1 for r in ordered if r['success'])}/{len(ordered)}个")
+            
+            return {
+                "success": all(r["success"] for r in ordered),
+                "results": ordered,
+                "total": len(ordered)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"批量音频提取失败: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "results": []
+            }
+    
+    def _get_audio_path(self, video_path: str, audio_format: str) -> str:
+        """根据视频文件路径生成音频输出路径"""
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        return os.path.join(self.temp_dir, f"{base_name}_audio.{audio_format}")
+    
+    def extract_audio_pcm_bytes(self, video_path: str) -> Dict:
+        """
+        从视频中提取原始PCM音频数据（16kHz单声道s16le），不落盘
+        :param video_path: 视频文件路径
+        :return: 提取结果，pcm_data为原始采样数据
+        """
+        try:
+            if not os.path.exists(video_path):
                 return {
-                    "success": True,
-                    "audio_path": audio_path,
-                    "video_path": video_path,
-                    "format": audio_format,
-                    "message": "音频提取完成（模拟文件）"
+                    "success": False,
+                    "error": "视频文件不存在",
+                    "video_path": video_path
+                }
+            
+            # 直接输出到标准输出，由调用方在内存中消费
+            cmd = [
+                'ffmpeg',
+                '-loglevel', 'error',
+                '-i', video_path,
+                '-vn',
+                '-f', 's16le',
+                '-acodec', 'pcm_s16le',
+                '-ar', '16000',
+                '-ac', '1',
+                'pipe:1'
+            ]
+            
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            try:
+                pcm_data, _ = proc.communicate(timeout=300)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                self.logger.error("ffmpeg音频提取超时")
+                return {
+                    "success": False,
+                    "error": "ffmpeg音频提取超时",
+                    "video_path": video_path
+                }
+            
+            if proc.returncode != 0 or not pcm_data:
+                return {
+                    "success": False,
+                    "error": f"ffmpeg音频提取失败，返回码: {proc.returncode}",
+                    "video_path": video_path
                 }
             
+            self.logger.info(f"PCM音频提取完成: {len(pcm_data)} 字节")
+            return {
+                "success": True,
+                "pcm_data": memoryview(pcm_data),
+                "sample_rate": 16000,
+                "channels": 1,
+                "sample_format": "s16le",
+                "video_path": video_path
+            }
+            
+        except FileNotFoundError:
+            self.logger.warning("ffmpeg未安装，无法提取音频")
+            return {
+                "success": False,
+                "error": "ffmpeg未安装",
+                "video_path": video_path
+            }
         except Exception as e:
-            self.logger.error(f"音频提取失败: {e}")
+            self.logger.error(f"PCM音频提取失败: {e}")
             return {
                 "success": False,
                 "error": str(e),
@@ -220,28 +477,22 @@ class AudioProcessor:
         :param audio_format: 音频格式
         :return: 是否成功
         """
+        # 优先使用PyAV在进程内解码和重采样，避免启动子进程
+        if av is not None and audio_format == 'wav':
+            if self._extract_audio_with_av(video_path, audio_path):
+                return True
+        
         try:
-            import subprocess
-            
             # 构建ffmpeg命令
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',  # 不包含视频
-                '-acodec', 'pcm_s16le' if audio_format == 'wav' else 'aac',  # 音频编码
-                '-ar', '16000',  # 采样率16kHz（适合语音识别）
-                '-ac', '1',  # 单声道
-                '-y',  # 覆盖输出文件
-                audio_path
-            ]
+            cmd = _build_ffmpeg_cmd(video_path, audio_path, audio_format)
             
             self.logger.info(f"执行ffmpeg命令: {' '.join(cmd)}")
             
             # 执行ffmpeg命令
             result = subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,  # 保留字节，仅在失败时解码
                 timeout=300  # 5分钟超时
             )
             
@@ -249,7 +500,7 @@ class AudioProcessor:
                 self.logger.info("ffmpeg音频提取成功")
                 return True
             else:
-                self.logger.warning(f"ffmpeg音频提取失败: {result.stderr}")
+                self.logger.warning(f"ffmpeg音频提取失败: {result.stderr.decode('utf-8', 'replace')}")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -262,19 +513,85 @@ class AudioProcessor:
             self.logger.error(f"ffmpeg音频提取异常: {e}")
             return False
     
+    async def _extract_audio_with_ffmpeg_async(self, video_path: str, audio_path: str, audio_format: str) -> bool:
+        """
+        使用ffmpeg异步提取音频
+        :param video_path: 视频文件路径
+        :param audio_path: 音频输出路径
+        :param audio_format: 音频格式
+        :return: 是否成功
+        """
+        try:
+            cmd = _build_ffmpeg_cmd(video_path, audio_path, audio_format)
+            self.logger.info(f"异步执行ffmpeg命令: {' '.join(cmd)}")
+            
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout=300)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                self.logger.error("ffmpeg音频提取超时")
+                return False
+            
+            if proc.returncode == 0:
+                self.logger.info("ffmpeg音频提取成功")
+                return True
+            else:
+                self.logger.warning(f"ffmpeg音频提取失败: {stderr.decode('utf-8', 'replace')}")
+                return False
+                
+        except FileNotFoundError:
+            self.logger.warning("ffmpeg未安装，无法提取音频")
+            return False
+        except Exception as e:
+            self.logger.error(f"ffmpeg音频提取异常: {e}")
+            return False
+    
+    def _extract_audio_with_av(self, video_path: str, audio_path: str) -> bool:
+        """
+        使用PyAV在进程内提取音频（16kHz单声道PCM）
+        :param video_path: 视频文件路径
+        :param audio_path: 音频输出路径
+        :return: 是否成功
+        """
+        try:
+            with av.open(video_path) as container, av.open(audio_path, mode='w') as output:
+                in_stream = container.streams.audio[0]
+                out_stream = output.add_stream('pcm_s16le', rate=16000, layout='mono')
+                resampler = av.AudioResampler(format='s16', layout='mono', rate=16000)
+                
+                for frame in container.decode(in_stream):
+                    for resampled in resampler.resample(frame):
+                        for packet in out_stream.encode(resampled):
+                            output.mux(packet)
+                
+                # 刷新重采样器和编码器中的剩余数据
+                for resampled in resampler.resample(None):
+                    for packet in out_stream.encode(resampled):
+                        output.mux(packet)
+                for packet in out_stream.encode(None):
+                    output.mux(packet)
+            
+            self.logger.info("PyAV音频提取成功")
+            return True
+            
+        except Exception as e:
+            self.logger.warning(f"PyAV音频提取失败，改用ffmpeg: {e}")
+            return False
+    
     def _create_mock_audio_file(self, audio_path: str):
         """
         创建模拟音频文件（用于测试）
         :param audio_path: 音频文件路径
         """
         try:
-            # 创建一个小的WAV文件头
-            wav_header = b'RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x40\x1f\x00\x00\x80\x3e\x00\x00\x02\x00\x10\x00data\x00\x08\x00\x00'
-            
             with open(audio_path, 'wb') as f:
-                f.write(wav_header)
-                # 添加一些静音数据
-                f.write(b'\x00' * 1000)
+                f.write(_MOCK_WAV_BYTES)
             
             self.logger.info(f"创建模拟音频文件: {audio_path}")
             
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+共享HTTP会话
+在下载器和解析器之间复用连接池，避免每次请求重新建立TCP/TLS连接
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SESSION = requests.Session()
+
+# 连接池：重试由调用方自行控制
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# 公共默认请求头，调用时传入的请求头会与之合并
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析Retry-After响应头
+    :param value: 响应头的值（秒数或HTTP日期）
+    :return: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """
+    计算重试等待时间（full jitter指数退避，优先遵循服务器给出的Retry-After）
+    :param attempt: 当前尝试序号（从0开始）
+    :param base_delay: 基础等待秒数
+    :param cap: 等待时间上限（秒）
+    :param retry_after: Retry-After响应头的值（可选）
+    :return: 等待秒数
+    """
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is not None:
+        return server_delay
+    return random.uniform(0, min(cap, base_delay * (2 ** attempt)))
@@ -5,12 +5,122 @@
 """
 
 import os
+import re
 import time
 import requests
-import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional
-from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from ..._config import load_config
+from ..._logging import get_logger
+from ._http import SESSION, backoff_delay
+
+# 下载请求头模板，每次请求复制后按需合并
+_BASE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    # 媒体文件不压缩传输，保证Range请求、Content-Length和落盘大小一致
+    'Accept-Encoding': 'identity',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# B站直链附加请求头
+_BILI_HEADERS_EXTRA = {
+    'Referer': 'https://www.bilibili.com/',
+    'Origin': 'https://www.bilibili.com',
+    'Sec-Fetch-Dest': 'video',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'cross-site',
+}
+
+# 其他视频CDN附加请求头
+_CDN_SUBSTRS = ('.cdn.com', '.media.com', '.video.com', '.stream.com')
+_CDN_HEADERS_EXTRA = {
+    'Referer': 'https://www.google.com/',
+    'Sec-Fetch-Dest': 'video',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'cross-site',
+}
+
+# 重试时依次使用的User-Agent（按尝试序号）
+_RETRY_USER_AGENTS = {
+    1: 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    2: 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
+}
+
+# Content-Range响应头：bytes 起始-结束/总大小
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)', re.IGNORECASE)
+
+
+def _parse_content_range(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    解析Content-Range响应头
+    :param value: 响应头的值
+    :return: (起始偏移, 结束偏移)，无法解析时返回None
+    """
+    match = _CONTENT_RANGE_RE.match(value or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _resume_validator(response) -> Optional[str]:
+    """获取续传时用作If-Range的校验值：优先使用强ETag，其次Last-Modified"""
+    etag = response.headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('last-modified')
+
+
+def _remove_quietly(*paths: str):
+    """删除文件，文件不存在时忽略"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class _SizeLimitExceeded(Exception):
+    """下载大小超过限制"""
+    
+    def __init__(self, downloaded_size: int):
+        super().__init__(downloaded_size)
+        self.downloaded_size = downloaded_size
+
+
+def _stream_to_file(raw, fd: int, buf_size: int, limit: Optional[int] = None) -> int:
+    """
+    将响应流读入复用的缓冲区并写入文件，不为每个数据块分配新的bytes对象
+    :param raw: 原始响应流（需支持readinto）
+    :param fd: 目标文件描述符
+    :param buf_size: 缓冲区大小（字节）
+    :param limit: 允许写入的最大字节数，超过时抛出_SizeLimitExceeded；为None时不检查
+    :return: 写入的字节数
+    """
+    mv = memoryview(bytearray(buf_size))
+    downloaded_size = 0
+    while True:
+        # 与iter_content一致，把urllib3的读取异常转换为requests异常，交给调用方的重试分支处理
+        try:
+            n = raw.readinto(mv)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        if not n:
+            return downloaded_size
+        downloaded_size += n
+        if limit is not None and downloaded_size > limit:
+            raise _SizeLimitExceeded(downloaded_size)
+        view = mv[:n]
+        while view:
+            view = view[os.write(fd, view):]
+
 
 class DirectDownloader:
     """直链下载器"""
@@ -18,28 +128,25 @@ class DirectDownloader:
     def __init__(self):
         """初始化直链下载器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - DIRECT_DOWNLOADER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'direct_downloader.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('DirectDownloader')
+        self.logger = get_logger('DirectDownloader', 'direct_downloader.log', 'DIRECT_DOWNLOADER')
         
         # 从环境变量读取配置
         self.download_dir = os.getenv("DOWNLOAD_DIR", "./downloads")
         self.max_file_size = int(os.getenv("MAX_FILE_SIZE_MB", "1000")) * 1024 * 1024  # 转换为字节
         self.timeout = int(os.getenv("DOWNLOAD_TIMEOUT", "300"))
+        self.chunk_size = int(os.getenv("HTTP_CHUNK_SIZE", "262144"))  # 每次读取的块大小（字节）
+        self.retry_cap = int(os.getenv("DOWNLOAD_RETRY_CAP_S", "60"))  # 重试等待上限（秒）
+        self.concurrency = int(os.getenv("DOWNLOAD_CONCURRENCY", "6"))
+        self.per_host_limit = int(os.getenv("DOWNLOAD_PER_HOST_LIMIT", "4"))
+        self.multipart_parts = int(os.getenv("DOWNLOAD_MULTIPART_PARTS", "6"))
+        self.multipart_threshold = int(os.getenv("DOWNLOAD_MULTIPART_THRESHOLD_MB", "32")) * 1024 * 1024
+        
+        # 按域名限制并发，避免同一主机触发429
+        self._host_semaphores = defaultdict(lambda: threading.Semaphore(self.per_host_limit))
+        self._host_semaphores_lock = threading.Lock()
         
         # 确保下载目录存在
         os.makedirs(self.download_dir, exist_ok=True)
@@ -67,14 +174,18 @@ class DirectDownloader:
                 # 构建完整的文件路径
                 file_path = os.path.join(self.download_dir, filename)
                 
-                # 检查文件是否已存在
-                if os.path.exists(file_path):
+                # 检查文件是否已存在（一次stat同时获取大小）
+                try:
+                    existing = os.stat(file_path)
+                except FileNotFoundError:
+                    existing = None
+                if existing is not None:
                     self.logger.info(f"文件已存在: {file_path}")
                     return {
                         "success": True,
                         "file_path": file_path,
                         "filename": filename,
-                        "size": os.path.getsize(file_path),
+                        "size": existing.st_size,
                         "message": "文件已存在"
                     }
                 
@@ -85,14 +196,63 @@ class DirectDownloader:
                 if attempt > 0:
                     headers = self._get_retry_headers(url, attempt)
                 
+                # 存在未完成的.part文件时从断点续传，否则大文件且服务器支持Range请求时分段并行下载
+                part_path = file_path + '.part'
+                validator_path = part_path + '.validator'
+                try:
+                    resume_from = os.stat(part_path).st_size
+                except FileNotFoundError:
+                    resume_from = 0
+                
+                # 续传时以首次响应的ETag/Last-Modified作为If-Range，远端文件变化时服务器返回完整内容；
+                # 没有保存校验值时无法确认远端文件未变化，从头下载
+                validator = None
+                if resume_from:
+                    try:
+                        with open(validator_path, encoding='utf-8') as f:
+                            validator = f.read().strip() or None
+                    except FileNotFoundError:
+                        pass
+                    if validator is None:
+                        _remove_quietly(part_path)
+                        resume_from = 0
+                
+                if resume_from == 0 and attempt == 0 and self.multipart_parts > 1 and hasattr(os, 'pwrite'):
+                    multipart_result = self._try_multipart_download(url, file_path, filename, headers)
+                    if multipart_result is not None:
+                        return multipart_result
+                
+                if resume_from:
+                    headers['Range'] = f'bytes={resume_from}-'
+                    headers['If-Range'] = validator
+                    self.logger.info(f"从断点继续下载: {resume_from / (1024*1024):.2f}MB")
+                
                 # 开始下载
-                response = requests.get(url, stream=True, timeout=self.timeout, headers=headers)
-                response.raise_for_status()
+                response = SESSION.get(url, stream=True, timeout=self.timeout, headers=headers)
+                if response.status_code == 416 and resume_from:
+                    # 断点已失效，删除临时文件后重新下载
+                    response.close()
+                    _remove_quietly(part_path, validator_path)
+                    continue
+                if not 200 <= response.status_code < 300:
+                    raise requests.HTTPError(f"{response.status_code} Error for url: {url}", response=response)
+                
+                if response.status_code == 206 and resume_from:
+                    # 返回的区间必须从断点开始，否则拼接出的文件内容错误
+                    content_range = _parse_content_range(response.headers.get('content-range'))
+                    if content_range is None or content_range[0] != resume_from:
+                        self.logger.warning(f"续传返回的区间与断点不一致: {response.headers.get('content-range')}，从头下载")
+                        response.close()
+                        _remove_quietly(part_path, validator_path)
+                        continue
+                elif response.status_code != 206:
+                    # 服务器不支持续传或远端文件已变化时返回200，需从头写入
+                    resume_from = 0
                 
-                # 检查文件大小
+                # 检查文件大小（206响应的Content-Length为剩余部分）
                 content_length = response.headers.get('content-length')
                 if content_length:
-                    file_size = int(content_length)
+                    file_size = resume_from + int(content_length)
                     if file_size > self.max_file_size:
                         return {
                             "success": False,
@@ -100,66 +260,72 @@ class DirectDownloader:
                             "url": url
                         }
                 
-                # 下载文件
-                with open(file_path, 'wb') as f:
-                    downloaded_size = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                            
-                            # 检查下载大小是否超过限制
-                            if downloaded_size > self.max_file_size:
-                                f.close()
-                                os.remove(file_path)  # 删除部分下载的文件
-                                return {
-                                    "success": False,
-                                    "error": f"下载大小超过限制: {downloaded_size / (1024*1024):.2f}MB > {self.max_file_size / (1024*1024):.2f}MB",
-                                    "url": url
-                                }
+                # 下载文件（复用同一缓冲区直接写入文件描述符）
+                # 已按Content-Length校验过大小时不再逐块检查，未知大小时读取量超过限制即中止
+                # 从头写入时记录本次响应的校验值，供中断后续传使用
+                if not resume_from:
+                    validator = _resume_validator(response)
+                    if validator:
+                        with open(validator_path, 'w', encoding='utf-8') as f:
+                            f.write(validator)
+                    else:
+                        _remove_quietly(validator_path)
                 
-                # 验证下载的文件
-                if os.path.exists(file_path):
-                    actual_size = os.path.getsize(file_path)
-                    if actual_size == 0:
-                        os.remove(file_path)
-                        return {
-                            "success": False,
-                            "error": "下载的文件大小为0，可能下载失败",
-                            "url": url
-                        }
-                    
-                    self.logger.info(f"下载完成: {file_path}, 大小: {actual_size / (1024*1024):.2f}MB")
-                    
+                response.raw.decode_content = True
+                stream_limit = None if content_length else self.max_file_size - resume_from
+                try:
+                    with open(part_path, 'ab' if resume_from else 'wb', buffering=0) as f:
+                        _stream_to_file(response.raw, f.fileno(), self.chunk_size, stream_limit)
+                        actual_size = os.fstat(f.fileno()).st_size
+                except _SizeLimitExceeded as e:
+                    _remove_quietly(part_path, validator_path)  # 删除部分下载的文件
+                    downloaded_size = resume_from + e.downloaded_size
                     return {
-                        "success": True,
-                        "file_path": file_path,
-                        "filename": filename,
-                        "size": actual_size,
-                        "message": "下载完成"
+                        "success": False,
+                        "error": f"下载大小超过限制: {downloaded_size / (1024*1024):.2f}MB > {self.max_file_size / (1024*1024):.2f}MB",
+                        "url": url
                     }
-                else:
+                
+                # 验证下载的文件
+                if actual_size == 0:
+                    _remove_quietly(part_path, validator_path)
                     return {
                         "success": False,
-                        "error": "文件下载后不存在",
+                        "error": "下载的文件大小为0，可能下载失败",
                         "url": url
                     }
+                
+                # 下载完成后原子地重命名为目标文件
+                os.replace(part_path, file_path)
+                _remove_quietly(validator_path)
+                self.logger.info(f"下载完成: {file_path}, 大小: {actual_size / (1024*1024):.2f}MB")
+                
+                return {
+                    "success": True,
+                    "file_path": file_path,
+                    "filename": filename,
+                    "size": actual_size,
+                    "message": "下载完成"
+                }
                     
             except requests.exceptions.HTTPError as e:
                 error_msg = f"HTTP错误: {e}"
                 if e.response.status_code == 403:
                     error_msg = "访问被拒绝(403)，可能是链接过期或需要特殊请求头"
                     if attempt < max_retries - 1:
-                        self.logger.warning(f"403错误，将在{retry_delay}秒后重试 (尝试 {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay)
+                        wait_time = backoff_delay(attempt, retry_delay, self.retry_cap)
+                        self.logger.warning(f"403错误，将在{wait_time:.1f}秒后重试 (尝试 {attempt + 1}/{max_retries})")
+                        time.sleep(wait_time)
                         continue
                 elif e.response.status_code == 404:
                     error_msg = "文件不存在(404)，链接可能已失效"
                 elif e.response.status_code == 429:
                     error_msg = "请求过于频繁(429)，请稍后重试"
                     if attempt < max_retries - 1:
-                        self.logger.warning(f"429错误，将在{retry_delay * 2}秒后重试 (尝试 {attempt + 1}/{max_retries})")
-                        time.sleep(retry_delay * 2)
+                        wait_time = backoff_delay(attempt, retry_delay, self.retry_cap,
+                                                  e.response.headers.get('Retry-After'))
+                        self.logger.warning(f"429错误，将在{wait_time:.1f}秒后重试 (尝试 {attempt + 1}/{max_retries})")
+                        time.sleep(wait_time)
                         continue
                 
                 self.logger.error(f"下载失败: {error_msg}")
@@ -170,8 +336,9 @@ class DirectDownloader:
                 }
             except requests.exceptions.Timeout as e:
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"下载超时，将在{retry_delay}秒后重试 (尝试 {attempt + 1}/{max_retries})")
-                    time.sleep(retry_delay)
+                    wait_time = backoff_delay(attempt, retry_delay, self.retry_cap)
+                    self.logger.warning(f"下载超时，将在{wait_time:.1f}秒后重试 (尝试 {attempt + 1}/{max_retries})")
+                    time.sleep(wait_time)
                     continue
                 else:
                     self.logger.error(f"下载超时: {e}")
@@ -180,10 +347,12 @@ class DirectDownloader:
                         "error": f"下载超时: {e}",
                         "url": url
                     }
-            except requests.exceptions.ConnectionError as e:
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                # 传输中途断开时保留.part文件，下次尝试从断点续传
                 if attempt < max_retries - 1:
-                    self.logger.warning(f"连接错误，将在{retry_delay}秒后重试 (尝试 {attempt + 1}/{max_retries})")
-                    time.sleep(retry_delay)
+                    wait_time = backoff_delay(attempt, retry_delay, self.retry_cap)
+                    self.logger.warning(f"连接错误，将在{wait_time:.1f}秒后重试 (尝试 {attempt + 1}/{max_retries})")
+                    time.sleep(wait_time)
                     continue
                 else:
                     self.logger.error(f"连接错误: {e}")
@@ -206,35 +375,163 @@ class DirectDownloader:
             "url": url
         }
     
+    def _try_multipart_download(self, url: str, file_path: str, filename: str, headers: dict) -> Optional[Dict]:
+        """
+        尝试分段并行下载大文件
+        :param url: 文件URL
+        :param file_path: 保存路径
+        :param filename: 文件名
+        :param headers: 请求头
+        :return: 下载结果；不适用或失败时返回None，由调用方回退到单连接下载
+        """
+        try:
+            head = SESSION.head(url, headers=headers, timeout=30, allow_redirects=True)
+            if head.status_code != 200 or head.headers.get('accept-ranges', '').lower() != 'bytes':
+                return None
+            
+            total_size = int(head.headers.get('content-length') or 0)
+            if total_size < self.multipart_threshold:
+                return None
+            if total_size > self.max_file_size:
+                return {
+                    "success": False,
+                    "error": f"文件大小超过限制: {total_size / (1024*1024):.2f}MB > {self.max_file_size / (1024*1024):.2f}MB",
+                    "url": url
+                }
+            
+            # 每个分段占用一个同域名并发名额，只使用当前空闲的名额，不足两个时不分段
+            semaphore = self._host_semaphore(url)
+            slots = 0
+            while slots < self.multipart_parts and semaphore.acquire(blocking=False):
+                slots += 1
+            try:
+                if slots < 2:
+                    return None
+                
+                # 切分字节区间
+                part_size = -(-total_size // slots)
+                ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+                self.logger.info(f"分段下载: {url}, 大小: {total_size / (1024*1024):.2f}MB, 分段数: {len(ranges)}")
+                
+                # 预分配临时文件，各分段按偏移量直接写入；全部写完后才重命名为目标文件，
+                # 中途中断时目标路径不会出现未写完的文件
+                part_path = file_path + '.part'
+                fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.ftruncate(fd, total_size)
+                    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                        written = sum(executor.map(
+                            lambda r: self._download_range(url, headers, fd, r[0], r[1]), ranges
+                        ))
+                finally:
+                    os.close(fd)
+            finally:
+                for _ in range(slots):
+                    semaphore.release()
+            
+            if written != total_size:
+                raise IOError(f"分段下载大小不一致: {written} != {total_size}")
+            os.replace(part_path, file_path)
+            
+            self.logger.info(f"下载完成: {file_path}, 大小: {total_size / (1024*1024):.2f}MB")
+            return {
+                "success": True,
+                "file_path": file_path,
+                "filename": filename,
+                "size": total_size,
+                "message": "下载完成"
+            }
+            
+        except Exception as e:
+            self.logger.warning(f"分段下载失败，改用单连接下载: {e}")
+            try:
+                os.remove(file_path + '.part')
+            except FileNotFoundError:
+                pass
+            return None
+    
+    def _download_range(self, url: str, headers: dict, fd: int, start: int, end: int) -> int:
+        """
+        下载指定字节区间并写入文件对应位置
+        :return: 写入的字节数
+        """
+        range_headers = dict(headers, Range=f"bytes={start}-{end}")
+        with SESSION.get(url, stream=True, timeout=self.timeout, headers=range_headers) as response:
+            if response.status_code != 206:
+                raise IOError(f"服务器未返回分段内容，状态码: {response.status_code}")
+            # 返回的区间必须与请求一致，否则会覆盖相邻分段
+            content_range = response.headers.get('content-range')
+            if _parse_content_range(content_range) != (start, end):
+                raise IOError(f"服务器返回的区间与请求不一致: {content_range} != bytes {start}-{end}")
+            
+            offset = start
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                # 超出区间结尾的数据不写入，避免覆盖相邻分段或使文件超过总大小
+                if offset + len(chunk) > end + 1:
+                    raise IOError(f"服务器返回的数据超过请求区间: bytes {start}-{end}")
+                view = memoryview(chunk)
+                while view:
+                    n = os.pwrite(fd, view, offset)
+                    view = view[n:]
+                    offset += n
+        return offset - start
+    
+    def download_files(self, items: List[Tuple[str, Optional[str]]], max_workers: int = None) -> List[Dict]:
+        """
+        并行下载多个文件
+        :param items: (文件URL, 文件名) 列表，文件名可为None
+        :param max_workers: 最大并发数（可选，默认读取DOWNLOAD_CONCURRENCY）
+        :return: 下载结果列表，顺序与items一致
+        """
+        if not items:
+            return []
+        
+        max_workers = max_workers or self.concurrency
+        self.logger.info(f"开始并行下载 {len(items)} 个文件，并发数: {max_workers}")
+        
+        results = [None] * len(items)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = {
+                executor.submit(self._download_with_host_limit, url, filename): index
+                for index, (url, filename) in enumerate(items)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = {
+                        "success": False,
+                        "error": str(e),
+                        "url": items[index][0]
+                    }
+        
+        success_count = sum(1 for r in results if r.get("success"))
+        self.logger.info(f"并行下载完成，成功 {success_count}/{len(items)}")
+        return results
+    
+    def _download_with_host_limit(self, url: str, filename: str = None) -> Dict:
+        """在所属域名的并发限制内下载文件"""
+        with self._host_semaphore(url):
+            return self.download_file(url, filename)
+    
+    def _host_semaphore(self, url: str) -> threading.Semaphore:
+        """获取URL所属域名的并发限制信号量"""
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            return self._host_semaphores[host]
+    
     def _get_download_headers(self, url: str) -> dict:
         """获取下载请求头"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        headers = _BASE_HEADERS.copy()
         
         # 针对B站直链的特殊处理
         if 'bilivideo.com' in url:
-            headers.update({
-                'Referer': 'https://www.bilibili.com/',
-                'Origin': 'https://www.bilibili.com',
-                'Sec-Fetch-Dest': 'video',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'cross-site',
-            })
+            headers.update(_BILI_HEADERS_EXTRA)
         
         # 针对其他视频CDN的特殊处理
-        elif any(cdn in url for cdn in ['.cdn.com', '.media.com', '.video.com', '.stream.com']):
-            headers.update({
-                'Referer': 'https://www.google.com/',
-                'Sec-Fetch-Dest': 'video',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'cross-site',
-            })
+        elif any(cdn in url for cdn in _CDN_SUBSTRS):
+            headers.update(_CDN_HEADERS_EXTRA)
         
         return headers
     
@@ -243,13 +540,10 @@ class DirectDownloader:
         # 基础请求头
         headers = self._get_download_headers(url)
         
-        # 根据重试次数调整策略
-        if attempt == 1:
-            # 第一次重试：尝试不同的User-Agent
-            headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        elif attempt == 2:
-            # 第二次重试：尝试移动端User-Agent
-            headers['User-Agent'] = 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1'
+        # 根据重试次数调整策略：第一次重试换桌面端，第二次重试换移动端User-Agent
+        retry_ua = _RETRY_USER_AGENTS.get(attempt)
+        if retry_ua:
+            headers['User-Agent'] = retry_ua
         
         # 针对B站直链的特殊重试策略
         if 'bilivideo.com' in url:
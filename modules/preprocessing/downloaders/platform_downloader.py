@@ -4,10 +4,9 @@
 处理平台特定的下载逻辑
 """
 
-import os
-import logging
 from typing import Dict
-from dotenv import load_dotenv
+from ..._config import load_config
+from ..._logging import get_logger
 
 class PlatformDownloader:
     """平台下载器"""
@@ -15,23 +14,10 @@ class PlatformDownloader:
     def __init__(self):
         """初始化平台下载器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - PLATFORM_DOWNLOADER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'platform_downloader.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('PlatformDownloader')
+        self.logger = get_logger('PlatformDownloader', 'platform_downloader.log', 'PLATFORM_DOWNLOADER')
         self.logger.info("平台下载器已初始化")
     
     def download_from_platform(self, platform: str, url: str, **kwargs) -> Dict:
@@ -3,9 +3,27 @@
 包含各个平台的视频/音频解析器
 """
 
-from .bilibili_parser import BilibiliParser
-from .youtube_parser import YouTubeParser
-from .vimeo_parser import VimeoParser
-from .generic_parser import GenericParser
+import importlib
 
-__all__ = ['BilibiliParser', 'YouTubeParser', 'VimeoParser', 'GenericParser'] 
\ No newline at end of file
+# 解析器按需导入，避免加载包时就导入所有平台解析器及其依赖
+_LAZY_IMPORTS = {
+    'BilibiliParser': '.bilibili_parser',
+    'YouTubeParser': '.youtube_parser',
+    'VimeoParser': '.vimeo_parser',
+    'GenericParser': '.generic_parser',
+}
+
+__all__ = ['BilibiliParser', 'YouTubeParser', 'VimeoParser', 'GenericParser']
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
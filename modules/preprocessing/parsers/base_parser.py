@@ -4,11 +4,29 @@
 定义所有平台解析器的通用接口
 """
 
-import os
-import logging
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from ..._cache import TTLCache
+from ..._config import load_config
+from ..._logging import get_logger
+
+# 失败结果模板，复制后填入错误信息
+_ERROR_TEMPLATE = {"success": False, "error": None, "url": None}
+
+
+def error_result(error: str, url: str) -> Dict:
+    """
+    构建失败结果
+    :param error: 错误信息
+    :param url: 原始链接
+    :return: 失败结果
+    """
+    result = _ERROR_TEMPLATE.copy()
+    result["error"] = error
+    result["url"] = url
+    return result
+
 
 class BaseParser(ABC):
     """解析器基类"""
@@ -19,24 +37,14 @@ class BaseParser(ABC):
         :param platform_name: 平台名称
         """
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format=f'%(asctime)s - {platform_name.upper()}_PARSER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, f'{platform_name}_parser.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        self.logger = get_logger(f'{platform_name}_parser', f'{platform_name}_parser.log', f'{platform_name.upper()}_PARSER')
+        self.platform_name = sys.intern(platform_name)
         
-        self.logger = logging.getLogger(f'{platform_name}_parser')
-        self.platform_name = platform_name
+        # 视频信息缓存（下载链接有时效，只短期缓存）
+        self._info_cache = TTLCache(maxsize=128, ttl=600)
         
         self.logger.info(f"{platform_name}解析器已初始化")
     
@@ -76,25 +84,13 @@ class BaseParser(ABC):
         :return: 下载链接列表
         """
         try:
-            video_info = self.get_video_info(url, platform_id)
+            video_info = self._fetch_once(url, platform_id)
             if not video_info.get("success"):
                 return video_info
             
-            # 提取下载链接
-            download_urls = []
-            if "formats" in video_info:
-                for format_info in video_info["formats"]:
-                    if "url" in format_info:
-                        download_urls.append({
-                            "url": format_info["url"],
-                            "format": format_info.get("format", "unknown"),
-                            "quality": format_info.get("quality", "unknown"),
-                            "size": format_info.get("filesize", 0)
-                        })
-            
             return {
                 "success": True,
-                "download_urls": download_urls,
+                "download_urls": self._extract_download_urls(video_info),
                 "title": video_info.get("title"),
                 "duration": video_info.get("duration"),
                 "thumbnail": video_info.get("thumbnail")
@@ -106,4 +102,36 @@ class BaseParser(ABC):
                 "success": False,
                 "error": str(e),
                 "download_urls": []
-            } 
\ No newline at end of file
+            }
+    
+    def _fetch_once(self, url: str, platform_id: str) -> Dict:
+        """
+        获取视频信息，成功结果按(url, platform_id)缓存，解析和提取下载链接共用同一次请求
+        :param url: 原始链接
+        :param platform_id: 平台ID
+        :return: 视频信息
+        """
+        key = (url, platform_id)
+        video_info = self._info_cache.get(key)
+        if video_info is None:
+            video_info = self.get_video_info(url, platform_id)
+            if video_info.get("success"):
+                self._info_cache.set(key, video_info)
+        return video_info
+    
+    def _extract_download_urls(self, video_info: Dict) -> List[Dict]:
+        """
+        从视频信息中提取下载链接
+        :param video_info: 视频信息
+        :return: 下载链接列表
+        """
+        return [
+            {
+                "url": format_info["url"],
+                "format": format_info.get("format", "unknown"),
+                "quality": format_info.get("quality", "unknown"),
+                "size": format_info.get("filesize", 0)
+            }
+            for format_info in video_info.get("formats", [])
+            if "url" in format_info
+        ]
\ No newline at end of file
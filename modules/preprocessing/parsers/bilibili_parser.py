@@ -7,11 +7,48 @@ B站视频解析器
 import os
 import re
 import time
+import json
+import asyncio
 import requests
-import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
-from dotenv import load_dotenv
-from .base_parser import BaseParser
+from urllib.parse import urlsplit
+from .base_parser import BaseParser, error_result
+from ..downloaders._http import SESSION, backoff_delay
+from ..._cache import TTLCache
+from ..._config import load_config
+
+# B站链接模式
+_BILI_PATTERNS = [re.compile(p) for p in (
+    r'https?://(?:www\.)?bilibili\.com/video/([A-Za-z0-9]+)',
+    r'https?://b23\.tv/([A-Za-z0-9]+)',
+    r'https?://(?:www\.)?bilibili\.com/bangumi/play/([A-Za-z0-9]+)',
+    r'https?://(?:www\.)?bilibili\.com/medialist/play/([A-Za-z0-9]+)',
+    r'https?://(?:www\.)?bilibili\.com/cheese/play/([A-Za-z0-9]+)'
+)]
+
+# 从链接中提取视频ID：短链接命中第1组，标准链接的ID在第2组
+_BILI_ID_RE = re.compile(r'(b23\.tv/)|bilibili\.com/(?:video|bangumi/play|medialist/play|cheese/play)/([A-Za-z0-9]+)')
+_VIDEO_ID_RE = re.compile(r'/video/([A-Za-z0-9]+)')
+
+# 短链接解析结果和API返回结果缓存（下载地址有效期约6小时）
+load_config()
+_CACHE_TTL = int(os.getenv("BILIBILI_CACHE_TTL_S", str(6 * 3600)))
+_SHORT_URL_CACHE = TTLCache(maxsize=1024, ttl=_CACHE_TTL)
+_API_CACHE = TTLCache(maxsize=1024, ttl=_CACHE_TTL)
+
+# orjson为可选依赖，安装后直接从字节解析API响应
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# aiohttp为可选依赖，安装后批量解析时并发发起API请求
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 class BilibiliParser(BaseParser):
     """B站视频解析器"""
@@ -24,13 +61,14 @@ class BilibiliParser(BaseParser):
         self.api_url = os.getenv("BILIBILI_API_URL", "https://api.cenguigui.cn/api/bilibili/api.php")
         self.max_retries = int(os.getenv("BILIBILI_MAX_RETRIES", "3"))
         self.retry_delay = int(os.getenv("BILIBILI_RETRY_DELAY", "2"))
+        self.retry_cap = int(os.getenv("DOWNLOAD_RETRY_CAP_S", "60"))
         
         # 请求头配置
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json, text/plain, */*',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': 'gzip, deflate',  # requests只能原生解压gzip/deflate
             'Connection': 'keep-alive',
             'Referer': 'https://www.bilibili.com/',
         }
@@ -43,18 +81,10 @@ class BilibiliParser(BaseParser):
         :param url: 视频链接
         :return: 是否有效
         """
-        bilibili_patterns = [
-            r'https?://(?:www\.)?bilibili\.com/video/([A-Za-z0-9]+)',
-            r'https?://b23\.tv/([A-Za-z0-9]+)',
-            r'https?://(?:www\.)?bilibili\.com/bangumi/play/([A-Za-z0-9]+)',
-            r'https?://(?:www\.)?bilibili\.com/medialist/play/([A-Za-z0-9]+)',
-            r'https?://(?:www\.)?bilibili\.com/cheese/play/([A-Za-z0-9]+)'
-        ]
-        
-        for pattern in bilibili_patterns:
-            if re.match(pattern, url):
-                return True
-        return False
+        # 先用子串判断快速排除非B站链接，再做正则匹配
+        if 'bilibili.com' not in url and 'b23.tv' not in url:
+            return False
+        return any(pattern.match(url) for pattern in _BILI_PATTERNS)
     
     def parse_link(self, url: str, platform_id: str = None) -> Dict:
         """
@@ -68,20 +98,12 @@ class BilibiliParser(BaseParser):
             
             # 验证链接
             if not self.validate_url(url):
-                return {
-                    "success": False,
-                    "error": "无效的B站链接",
-                    "url": url
-                }
+                return error_result("无效的B站链接", url)
             
             # 提取视频ID
             video_id = self._extract_video_id(url)
             if not video_id:
-                return {
-                    "success": False,
-                    "error": "无法提取视频ID",
-                    "url": url
-                }
+                return error_result("无法提取视频ID", url)
             
             self.logger.info(f"提取到视频ID: {video_id}")
             
@@ -91,33 +113,123 @@ class BilibiliParser(BaseParser):
                 return api_result
             
             # 处理API返回结果
-            video_info = api_result["data"]
+            return self._build_parse_result(url, video_id, api_result["data"])
+            
+        except Exception as e:
+            self.logger.error(f"B站链接解析失败: {e}")
+            return error_result(str(e), url)
+    
+    def parse_links(self, urls: List[str]) -> List[Dict]:
+        """
+        批量解析B站视频链接，网络请求并发进行
+        :param urls: 视频链接列表
+        :return: 解析结果列表，顺序与urls一致
+        """
+        if not urls:
+            return []
+        
+        # 指向同一视频的链接只解析一次（忽略查询参数等差异），保持首次出现的顺序
+        keys = [self._canonical_key(url) for url in urls]
+        unique = {}
+        for key, url in zip(keys, urls):
+            unique.setdefault(key, url)
+        unique_urls = list(unique.values())
+        
+        if aiohttp is None:
+            # 未安装aiohttp时退回线程池并发
+            with ThreadPoolExecutor(max_workers=min(8, len(unique_urls))) as executor:
+                unique_results = list(executor.map(self.parse_link, unique_urls))
+        else:
+            unique_results = asyncio.run(self._parse_links_async(unique_urls))
+        
+        # 将结果按原始顺序展开，每条结果保留各自的原始链接
+        results_by_key = dict(zip(unique, unique_results))
+        return [
+            dict(results_by_key[key], url=url) if "url" in results_by_key[key] else results_by_key[key]
+            for key, url in zip(keys, urls)
+        ]
+    
+    def _canonical_key(self, url: str) -> str:
+        """
+        计算用于去重的链接标识（不发起网络请求）
+        :param url: 视频链接
+        :return: 能直接提取时为视频ID，否则为去掉协议和查询参数的链接
+        """
+        match = _BILI_ID_RE.search(url)
+        if match and match.group(2):
+            return match.group(2)
+        parts = urlsplit(url)
+        return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    
+    async def _parse_links_async(self, urls: List[str]) -> List[Dict]:
+        """在同一个aiohttp会话中并发解析多个链接"""
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=8)
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers) as session:
+            return await asyncio.gather(*[self.parse_link_async(url, session=session) for url in urls])
+    
+    async def parse_link_async(self, url: str, platform_id: str = None, session=None) -> Dict:
+        """
+        解析B站视频链接（异步版本）
+        :param url: 视频链接
+        :param platform_id: 平台ID（可选）
+        :param session: aiohttp会话（可选，不传时临时创建）
+        :return: 解析结果
+        """
+        if aiohttp is None:
+            return await asyncio.to_thread(self.parse_link, url, platform_id)
+        
+        if session is None:
+            async with aiohttp.ClientSession(headers=self.headers) as own_session:
+                return await self.parse_link_async(url, platform_id, own_session)
+        
+        try:
+            self.logger.info(f"开始解析B站链接: {url}")
+            
+            if not self.validate_url(url):
+                return error_result("无效的B站链接", url)
             
-            # 构建下载链接列表
-            download_urls = self._build_download_urls(video_info)
+            # 短链接解析仍使用同步请求，放到线程中执行
+            video_id = await asyncio.to_thread(self._extract_video_id, url)
+            if not video_id:
+                return error_result("无法提取视频ID", url)
             
-            return {
-                "success": True,
-                "title": video_info.get("title", "未知标题"),
-                "duration": video_info.get("duration", 0),
-                "duration_format": video_info.get("durationFormat", "00:00:00"),
-                "description": video_info.get("desc", ""),
-                "thumbnail": video_info.get("imgurl", ""),
-                "uploader": video_info.get("user", {}).get("name", "未知用户"),
-                "uploader_avatar": video_info.get("user", {}).get("user_img", ""),
-                "download_urls": download_urls,
-                "platform": "bilibili",
-                "video_id": video_id,
-                "url": url
-            }
+            self.logger.info(f"提取到视频ID: {video_id}")
+            
+            api_result = await self._call_bilibili_api_async(session, url)
+            if not api_result.get("success"):
+                return api_result
+            
+            return self._build_parse_result(url, video_id, api_result["data"])
             
         except Exception as e:
             self.logger.error(f"B站链接解析失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
+    
+    def _build_parse_result(self, url: str, video_id: str, video_info: Dict) -> Dict:
+        """
+        根据API返回的视频信息构建解析结果
+        :param url: 视频链接
+        :param video_id: 视频ID
+        :param video_info: API返回的视频信息
+        :return: 解析结果
+        """
+        # 构建下载链接列表
+        download_urls = self._build_download_urls(video_info)
+        
+        return {
+            "success": True,
+            "title": video_info.get("title", "未知标题"),
+            "duration": video_info.get("duration", 0),
+            "duration_format": video_info.get("durationFormat", "00:00:00"),
+            "description": video_info.get("desc", ""),
+            "thumbnail": video_info.get("imgurl", ""),
+            "uploader": video_info.get("user", {}).get("name", "未知用户"),
+            "uploader_avatar": video_info.get("user", {}).get("user_img", ""),
+            "download_urls": download_urls,
+            "platform": "bilibili",
+            "video_id": video_id,
+            "url": url
+        }
     
     def _extract_video_id(self, url: str) -> Optional[str]:
         """
@@ -125,33 +237,14 @@ class BilibiliParser(BaseParser):
         :param url: 视频链接
         :return: 视频ID
         """
-        try:
-            # 处理不同的B站链接格式
-            if "b23.tv" in url:
-                # 短链接需要先解析
-                return self._resolve_short_url(url)
-            elif "bilibili.com/video/" in url:
-                # 标准视频链接
-                match = re.search(r'/video/([A-Za-z0-9]+)', url)
-                return match.group(1) if match else None
-            elif "bilibili.com/bangumi/play/" in url:
-                # 番剧链接
-                match = re.search(r'/bangumi/play/([A-Za-z0-9]+)', url)
-                return match.group(1) if match else None
-            elif "bilibili.com/medialist/play/" in url:
-                # 视频列表链接
-                match = re.search(r'/medialist/play/([A-Za-z0-9]+)', url)
-                return match.group(1) if match else None
-            elif "bilibili.com/cheese/play/" in url:
-                # 课程链接
-                match = re.search(r'/cheese/play/([A-Za-z0-9]+)', url)
-                return match.group(1) if match else None
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"提取视频ID失败: {e}")
+        # 一次匹配同时区分短链接和标准视频、番剧、视频列表、课程链接
+        match = _BILI_ID_RE.search(url)
+        if not match:
             return None
+        if match.group(1):
+            # 短链接需要先解析（网络异常在_resolve_short_url中处理）
+            return self._resolve_short_url(url)
+        return match.group(2)
     
     def _resolve_short_url(self, short_url: str) -> Optional[str]:
         """
@@ -159,13 +252,19 @@ class BilibiliParser(BaseParser):
         :param short_url: 短链接
         :return: 视频ID
         """
+        video_id = _SHORT_URL_CACHE.get(short_url)
+        if video_id is not None:
+            return video_id
+        
         try:
-            response = requests.get(short_url, headers=self.headers, allow_redirects=False)
+            response = SESSION.get(short_url, headers=self.headers, allow_redirects=False)
             if response.status_code == 302:
                 location = response.headers.get('Location', '')
                 # 从重定向URL中提取视频ID
-                match = re.search(r'/video/([A-Za-z0-9]+)', location)
-                return match.group(1) if match else None
+                match = _VIDEO_ID_RE.search(location)
+                if match:
+                    _SHORT_URL_CACHE.set(short_url, match.group(1))
+                    return match.group(1)
             return None
         except Exception as e:
             self.logger.error(f"解析短链接失败: {e}")
@@ -173,7 +272,24 @@ class BilibiliParser(BaseParser):
     
     def _call_bilibili_api(self, url: str) -> Dict:
         """
-        调用B站解析API
+        调用B站解析API（成功结果按链接缓存）
+        :param url: 视频链接
+        :return: API返回结果
+        """
+        cache_key = (self.api_url, url)
+        cached = _API_CACHE.get(cache_key)
+        if cached is not None:
+            self.logger.info("命中B站API缓存")
+            return cached
+        
+        result = self._request_bilibili_api(url)
+        if result.get("success"):
+            _API_CACHE.set(cache_key, result)
+        return result
+    
+    def _request_bilibili_api(self, url: str) -> Dict:
+        """
+        请求B站解析API（带重试）
         :param url: 视频链接
         :return: API返回结果
         """
@@ -187,16 +303,17 @@ class BilibiliParser(BaseParser):
                 }
                 
                 # 发送请求
-                response = requests.get(
+                response = SESSION.get(
                     self.api_url,
                     params=params,
                     headers=self.headers,
                     timeout=30
                 )
-                response.raise_for_status()
+                if not 200 <= response.status_code < 300:
+                    raise requests.HTTPError(f"{response.status_code} Error for url: {response.url}", response=response)
                 
                 # 解析JSON响应
-                result = response.json()
+                result = _loads(response.content)
                 
                 # 检查API返回状态
                 if result.get("code") == 1:
@@ -211,42 +328,83 @@ class BilibiliParser(BaseParser):
                     
                     # 如果是最后一次尝试，返回错误
                     if attempt == self.max_retries - 1:
-                        return {
-                            "success": False,
-                            "error": f"B站API错误: {error_msg}",
-                            "url": url
-                        }
+                        return error_result(f"B站API错误: {error_msg}", url)
                     
                     # 等待后重试
-                    time.sleep(self.retry_delay)
+                    time.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap))
                     continue
                 
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"B站API请求失败 (尝试 {attempt + 1}/{self.max_retries}): {e}")
                 
                 if attempt == self.max_retries - 1:
-                    return {
-                        "success": False,
-                        "error": f"B站API请求失败: {e}",
-                        "url": url
-                    }
+                    return error_result(f"B站API请求失败: {e}", url)
                 
-                time.sleep(self.retry_delay)
+                # 429时优先遵循服务器给出的Retry-After
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None and response.status_code == 429 else None
+                time.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap, retry_after))
                 continue
                 
             except Exception as e:
                 self.logger.error(f"B站API调用异常: {e}")
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "url": url
-                }
+                return error_result(str(e), url)
         
-        return {
-            "success": False,
-            "error": f"B站API调用失败，已重试{self.max_retries}次",
-            "url": url
-        }
+        return error_result(f"B站API调用失败，已重试{self.max_retries}次", url)
+    
+    async def _call_bilibili_api_async(self, session, url: str) -> Dict:
+        """
+        调用B站解析API（异步版本）
+        :param session: aiohttp会话
+        :param url: 视频链接
+        :return: API返回结果
+        """
+        cache_key = (self.api_url, url)
+        cached = _API_CACHE.get(cache_key)
+        if cached is not None:
+            self.logger.info("命中B站API缓存")
+            return cached
+        
+        timeout = aiohttp.ClientTimeout(total=30)
+        
+        for attempt in range(self.max_retries):
+            try:
+                self.logger.info(f"调用B站API (尝试 {attempt + 1}/{self.max_retries})")
+                
+                async with session.get(self.api_url, params={'url': url}, timeout=timeout) as response:
+                    response.raise_for_status()
+                    result = _loads(await response.read())
+                
+                if result.get("code") == 1:
+                    self.logger.info("B站API调用成功")
+                    api_result = {
+                        "success": True,
+                        "data": result
+                    }
+                    _API_CACHE.set(cache_key, api_result)
+                    return api_result
+                
+                error_msg = result.get("msg", "未知错误")
+                self.logger.warning(f"B站API返回错误: {error_msg}")
+                
+                if attempt == self.max_retries - 1:
+                    return error_result(f"B站API错误: {error_msg}", url)
+                
+                await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap))
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"B站API请求失败 (尝试 {attempt + 1}/{self.max_retries}): {e}")
+                
+                if attempt == self.max_retries - 1:
+                    return error_result(f"B站API请求失败: {e}", url)
+                
+                await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap))
+                
+            except Exception as e:
+                self.logger.error(f"B站API调用异常: {e}")
+                return error_result(str(e), url)
+        
+        return error_result(f"B站API调用失败，已重试{self.max_retries}次", url)
     
     def _build_download_urls(self, video_info: Dict) -> List[Dict]:
         """
@@ -306,8 +464,4 @@ class BilibiliParser(BaseParser):
             
         except Exception as e:
             self.logger.error(f"获取视频信息失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            } 
\ No newline at end of file
+            return error_result(str(e), url) 
\ No newline at end of file
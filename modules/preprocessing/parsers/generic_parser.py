@@ -5,9 +5,72 @@
 """
 
 import os
-import re
-from typing import Dict
-from .base_parser import BaseParser
+import functools
+from typing import Dict, List
+from urllib.parse import SplitResult, urlsplit
+from .base_parser import BaseParser, error_result
+
+# 媒体文件直链扩展名
+_MEDIA_EXTS = frozenset({'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv', 'webm', 'm4v', 'mp3', 'wav', 'm4a', 'aac', 'flac', 'ogg'})
+
+# 平台识别模式
+PLATFORM_PATTERNS = {
+    "bilibili": r'bilibili\.com|b23\.tv',
+    "youtube": r'youtube\.com|youtu\.be',
+    "vimeo": r'vimeo\.com',
+    "douyin": r'douyin\.com',
+    "kuaishou": r'kuaishou\.com',
+}
+
+# 域名后缀 -> 平台，按主机名逐级查表即可识别平台
+PLATFORM_DOMAINS = {
+    'bilibili.com': 'bilibili',
+    'b23.tv': 'bilibili',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'vimeo.com': 'vimeo',
+    'douyin.com': 'douyin',
+    'kuaishou.com': 'kuaishou',
+}
+
+@functools.lru_cache(maxsize=4096)
+def _parse_once(url: str) -> SplitResult:
+    """拆分URL（同一URL只拆分一次，供各辅助函数共用）"""
+    return urlsplit(url)
+
+
+def url_basename(url: str) -> str:
+    """
+    取URL路径的最后一段（不含查询参数和片段），直接在原字符串上定位，不创建中间列表
+    :param url: 链接
+    :return: 路径最后一段，可能为空字符串
+    """
+    end = len(url)
+    for sep in '?#':
+        index = url.find(sep, 0, end)
+        if index >= 0:
+            end = index
+    return url[url.rfind('/', 0, end) + 1:end]
+
+
+@functools.lru_cache(maxsize=4096)
+def is_direct_url(url: str) -> bool:
+    """检查是否为媒体文件直链（只看路径末尾的扩展名，查询参数由urlsplit去掉）"""
+    _, dot, ext = _parse_once(url).path.rpartition('.')
+    return bool(dot) and '/' not in ext and ext.lower() in _MEDIA_EXTS
+
+
+@functools.lru_cache(maxsize=4096)
+def _match_platform(url: str) -> str:
+    """识别链接平台，未知时返回unknown"""
+    # 从完整主机名开始逐级去掉最左侧的标签查表，只匹配完整的域名标签
+    labels = (_parse_once(url).hostname or '').split('.')
+    for i in range(len(labels) - 1):
+        platform = PLATFORM_DOMAINS.get('.'.join(labels[i:]))
+        if platform:
+            return platform
+    return "unknown"
+
 
 class GenericParser(BaseParser):
     """通用解析器"""
@@ -49,19 +112,11 @@ class GenericParser(BaseParser):
                     "suggested_parser": f"{platform}_parser"
                 }
             
-            return {
-                "success": False,
-                "error": "无法识别的链接类型",
-                "url": url
-            }
+            return error_result("无法识别的链接类型", url)
             
         except Exception as e:
             self.logger.error(f"通用链接解析失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
     
     def get_video_info(self, url: str, platform_id: str = None) -> Dict:
         """
@@ -81,46 +136,30 @@ class GenericParser(BaseParser):
                     "platform": "direct"
                 }
             
-            return {
-                "success": False,
-                "error": "无法获取非直链的信息",
-                "url": url
-            }
+            return error_result("无法获取非直链的信息", url)
                 
         except Exception as e:
             self.logger.error(f"获取通用链接信息失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
     
     def _is_direct_link(self, url: str) -> bool:
         """检查是否为直链"""
-        # 检查是否为媒体文件直链
-        media_extensions = r'\.(mp4|avi|mov|mkv|wmv|flv|webm|m4v|mp3|wav|m4a|aac|flac|ogg)(\?.*)?$'
-        return bool(re.search(media_extensions, url, re.IGNORECASE))
+        return is_direct_url(url)
     
     def _extract_filename(self, url: str) -> str:
         """从URL中提取文件名"""
-        # 移除查询参数
-        clean_url = url.split('?')[0]
-        # 获取文件名
-        filename = clean_url.split('/')[-1]
-        return filename if filename else "unknown_file"
+        return url_basename(url) or "unknown_file"
+    
+    def classify_batch(self, urls: List[str]) -> List[str]:
+        """
+        批量识别链接平台
+        :param urls: 链接列表
+        :return: 平台名称列表，顺序与urls一致，未知时为unknown
+        """
+        # 相同链接只识别一次
+        platforms = {url: _match_platform(url) for url in dict.fromkeys(urls)}
+        return [platforms[url] for url in urls]
     
     def _identify_platform(self, url: str) -> str:
         """识别链接平台"""
-        platform_patterns = {
-            "bilibili": r'bilibili\.com|b23\.tv',
-            "youtube": r'youtube\.com|youtu\.be',
-            "vimeo": r'vimeo\.com',
-            "douyin": r'douyin\.com',
-            "kuaishou": r'kuaishou\.com'
-        }
-        
-        for platform, pattern in platform_patterns.items():
-            if re.search(pattern, url, re.IGNORECASE):
-                return platform
-        
-        return "unknown" 
\ No newline at end of file
+        return _match_platform(url) 
\ No newline at end of file
@@ -6,7 +6,7 @@ Vimeo视频解析器
 
 import os
 from typing import Dict
-from .base_parser import BaseParser
+from .base_parser import BaseParser, error_result
 
 class VimeoParser(BaseParser):
     """Vimeo视频解析器"""
@@ -31,22 +31,13 @@ class VimeoParser(BaseParser):
             
             # 验证URL
             if not self.validate_url(url):
-                return {
-                    "success": False,
-                    "error": "无效的Vimeo链接",
-                    "url": url
-                }
+                return error_result("无效的Vimeo链接", url)
             
-            # 获取视频信息
-            video_info = self.get_video_info(url, platform_id)
+            # 获取视频信息（同一次请求同时包含下载链接）
+            video_info = self._fetch_once(url, platform_id)
             if not video_info.get("success"):
                 return video_info
             
-            # 获取下载链接
-            download_info = self.get_download_urls(url, platform_id)
-            if not download_info.get("success"):
-                return download_info
-            
             return {
                 "success": True,
                 "url": url,
@@ -54,17 +45,13 @@ class VimeoParser(BaseParser):
                 "title": video_info.get("title"),
                 "duration": video_info.get("duration"),
                 "thumbnail": video_info.get("thumbnail"),
-                "download_urls": download_info.get("download_urls", []),
+                "download_urls": self._extract_download_urls(video_info),
                 "platform": "vimeo"
             }
             
         except Exception as e:
             self.logger.error(f"Vimeo链接解析失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
     
     def get_video_info(self, url: str, platform_id: str) -> Dict:
         """
@@ -75,24 +62,12 @@ class VimeoParser(BaseParser):
         """
         try:
             if not self.api_key:
-                return {
-                    "success": False,
-                    "error": "Vimeo API密钥未配置",
-                    "url": url
-                }
+                return error_result("Vimeo API密钥未配置", url)
             
             # 使用Vimeo API获取视频信息
             # 这里需要实现具体的API调用逻辑
-            return {
-                "success": False,
-                "error": "Vimeo解析功能尚未完全实现",
-                "url": url
-            }
+            return error_result("Vimeo解析功能尚未完全实现", url)
                 
         except Exception as e:
             self.logger.error(f"获取Vimeo视频信息失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            } 
\ No newline at end of file
+            return error_result(str(e), url) 
\ No newline at end of file
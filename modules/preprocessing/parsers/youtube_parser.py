@@ -5,8 +5,11 @@ YouTube视频解析器
 """
 
 import os
+import queue
+import atexit
+import threading
 from typing import Dict
-from .base_parser import BaseParser
+from .base_parser import BaseParser, error_result
 
 class YouTubeParser(BaseParser):
     """YouTube视频解析器"""
@@ -17,17 +20,80 @@ class YouTubeParser(BaseParser):
         
         # 从环境变量读取配置
         self.use_yt_dlp = os.getenv("USE_YT_DLP", "false").lower() == "true"
+        self.ydl_pool_size = max(1, int(os.getenv("YT_DLP_POOL_SIZE", "4")))
         
-        if self.use_yt_dlp:
+        # yt-dlp导入开销较大，首次解析YouTube链接时才加载
+        # YoutubeDL实例复用以避免每次解析都重新加载提取器，但实例不是线程安全的，
+        # 因此维护一个实例池，每次解析取出一个独占使用，多个链接可同时解析
+        self.yt_dlp = None
+        self._ydl_loaded = False
+        self._ydl_idle = queue.Queue()
+        self._ydl_created = 0
+        self._ydl_lock = threading.Lock()
+    
+    def _load_yt_dlp(self):
+        """首次调用时导入yt-dlp，未启用或未安装时返回None"""
+        with self._ydl_lock:
+            if not self._ydl_loaded:
+                self._ydl_loaded = True
+                if self.use_yt_dlp:
+                    try:
+                        import yt_dlp
+                        self.yt_dlp = yt_dlp
+                        atexit.register(self.close)
+                        self.logger.info("yt-dlp已加载")
+                    except ImportError:
+                        self.logger.warning("yt-dlp未安装，将使用基础解析")
+        return self.yt_dlp
+    
+    def _checkout_ydl(self):
+        """
+        从实例池取出一个YoutubeDL实例，用完后需调用_checkin_ydl放回
+        池中没有空闲实例时按需创建，达到上限后等待其他调用放回
+        :return: YoutubeDL实例，未启用yt-dlp时返回None
+        """
+        yt_dlp = self._load_yt_dlp()
+        if yt_dlp is None:
+            return None
+        
+        try:
+            return self._ydl_idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._ydl_lock:
+            create = self._ydl_created < self.ydl_pool_size
+            if create:
+                self._ydl_created += 1
+        if not create:
+            return self._ydl_idle.get()
+        
+        try:
+            return yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': False
+            })
+        except Exception:
+            with self._ydl_lock:
+                self._ydl_created -= 1
+            raise
+    
+    def _checkin_ydl(self, ydl):
+        """将YoutubeDL实例放回实例池"""
+        if ydl is not None:
+            self._ydl_idle.put(ydl)
+    
+    def close(self):
+        """释放实例池中空闲的yt-dlp实例"""
+        while True:
             try:
-                import yt_dlp
-                self.yt_dlp = yt_dlp
-                self.logger.info("yt-dlp已加载")
-            except ImportError:
-                self.logger.warning("yt-dlp未安装，将使用基础解析")
-                self.yt_dlp = None
-        else:
-            self.yt_dlp = None
+                ydl = self._ydl_idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._ydl_lock:
+                self._ydl_created -= 1
+            ydl.close()
     
     def parse_link(self, url: str, platform_id: str) -> Dict:
         """
@@ -41,22 +107,13 @@ class YouTubeParser(BaseParser):
             
             # 验证URL
             if not self.validate_url(url):
-                return {
-                    "success": False,
-                    "error": "无效的YouTube链接",
-                    "url": url
-                }
+                return error_result("无效的YouTube链接", url)
             
-            # 获取视频信息
-            video_info = self.get_video_info(url, platform_id)
+            # 获取视频信息（同一次请求同时包含下载链接）
+            video_info = self._fetch_once(url, platform_id)
             if not video_info.get("success"):
                 return video_info
             
-            # 获取下载链接
-            download_info = self.get_download_urls(url, platform_id)
-            if not download_info.get("success"):
-                return download_info
-            
             return {
                 "success": True,
                 "url": url,
@@ -64,17 +121,13 @@ class YouTubeParser(BaseParser):
                 "title": video_info.get("title"),
                 "duration": video_info.get("duration"),
                 "thumbnail": video_info.get("thumbnail"),
-                "download_urls": download_info.get("download_urls", []),
+                "download_urls": self._extract_download_urls(video_info),
                 "platform": "youtube"
             }
             
         except Exception as e:
             self.logger.error(f"YouTube链接解析失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
     
     def get_video_info(self, url: str, platform_id: str) -> Dict:
         """
@@ -84,37 +137,26 @@ class YouTubeParser(BaseParser):
         :return: 视频信息
         """
         try:
-            if self.yt_dlp:
+            ydl = self._checkout_ydl()
+            try:
                 # 使用yt-dlp获取信息
-                ydl_opts = {
-                    'quiet': True,
-                    'no_warnings': True,
-                    'extract_flat': False
+                info = ydl.extract_info(url, download=False) if ydl is not None else None
+            finally:
+                self._checkin_ydl(ydl)
+            
+            if info is not None:
+                return {
+                    "success": True,
+                    "title": info.get("title", ""),
+                    "duration": info.get("duration", 0),
+                    "thumbnail": info.get("thumbnail", ""),
+                    "formats": info.get("formats", []),
+                    "platform": "youtube"
                 }
-                
-                with self.yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    
-                    return {
-                        "success": True,
-                        "title": info.get("title", ""),
-                        "duration": info.get("duration", 0),
-                        "thumbnail": info.get("thumbnail", ""),
-                        "formats": info.get("formats", []),
-                        "platform": "youtube"
-                    }
             else:
                 # 基础解析（需要实现）
-                return {
-                    "success": False,
-                    "error": "YouTube解析功能需要安装yt-dlp或实现基础解析",
-                    "url": url
-                }
+                return error_result("YouTube解析功能需要安装yt-dlp或实现基础解析", url)
                 
         except Exception as e:
             self.logger.error(f"获取YouTube视频信息失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            } 
\ No newline at end of file
+            return error_result(str(e), url) 
\ No newline at end of file
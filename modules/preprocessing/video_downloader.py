@@ -4,19 +4,135 @@
 协调解析器和下载器完成视频下载
 """
 
-import os
-import logging
 from typing import Dict, Optional
-from dotenv import load_dotenv
+from urllib.parse import urlsplit
 import re
 import time
+import functools
 
 # 导入解析器和下载器
 from .parsers.bilibili_parser import BilibiliParser
 from .parsers.youtube_parser import YouTubeParser
 from .parsers.vimeo_parser import VimeoParser
-from .parsers.generic_parser import GenericParser
+from .parsers.base_parser import error_result
+from .parsers.generic_parser import GenericParser, PLATFORM_DOMAINS, PLATFORM_PATTERNS, is_direct_url, url_basename
 from .downloaders.direct_downloader import DirectDownloader
+from .._config import load_config
+from .._logging import get_logger
+
+# 优先选择的下载格式
+_PREFERRED_FORMATS = frozenset({"mp4", "webm"})
+
+# 文件名中不允许出现的字符替换表
+_UNSAFE_TRANS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# 有专用解析器的平台，由其模式构建分发正则，一次匹配即可确定平台
+_PARSER_PLATFORMS = ("bilibili", "youtube", "vimeo")
+_DISPATCH_RE = re.compile(
+    '|'.join(f'(?P<{platform}>{PLATFORM_PATTERNS[platform]})' for platform in _PARSER_PLATFORMS),
+    re.IGNORECASE
+)
+
+
+def _build_host_trie() -> dict:
+    """按倒序域名标签构建平台前缀树，如 com -> bilibili -> 终止标记"""
+    trie = {}
+    for domain, platform in PLATFORM_DOMAINS.items():
+        if platform not in _PARSER_PLATFORMS:
+            continue
+        node = trie
+        for label in reversed(domain.split('.')):
+            node = node.setdefault(label, {})
+        node[_TRIE_END] = platform
+    return trie
+
+
+_TRIE_END = None  # 终止标记，不会与域名标签冲突
+_HOST_TRIE = _build_host_trie()
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify(url: str) -> str:
+    """检测链接平台（结果只取决于URL，按URL缓存）"""
+    # 媒体文件直链直接交给下载器，不经过解析器
+    if is_direct_url(url):
+        return "direct_video"
+    
+    hostname = urlsplit(url).hostname
+    if hostname is not None:
+        # 从顶级域名开始沿前缀树逐级匹配，遇到第一个终止节点即得到平台
+        node = _HOST_TRIE
+        for label in reversed(hostname.split('.')):
+            node = node.get(label)
+            if node is None:
+                return "generic"
+            platform = node.get(_TRIE_END)
+            if platform:
+                return platform
+        return "generic"
+    
+    # 无法解析出主机名（如缺少协议头）时退回模式扫描
+    match = _DISPATCH_RE.search(url)
+    return match.lastgroup if match else "generic"
+
+def _quality_score(url_info: dict) -> int:
+    """质量评分"""
+    quality = (url_info.get("quality") or "").lower()
+    if "1080" in quality or "hd" in quality:
+        return 3
+    elif "720" in quality:
+        return 2
+    elif "480" in quality:
+        return 1
+    return 0
+
+
+def _format_score(url_info: dict) -> int:
+    """格式评分"""
+    format_type = (url_info.get("format") or "").lower()
+    if format_type in _PREFERRED_FORMATS:
+        return 2
+    elif format_type == "direct":
+        return 1
+    return 0
+
+
+def _size_score(size: int) -> int:
+    """文件大小评分（越小越好）"""
+    if size > 0:
+        if size < 100 * 1024 * 1024:  # 小于100MB
+            return 2
+        elif size < 500 * 1024 * 1024:  # 小于500MB
+            return 1
+    return 0
+
+
+def _score_download_url(url_info: dict) -> int:
+    """下载链接评分：质量、格式、文件大小"""
+    return _quality_score(url_info) + _format_score(url_info) + _size_score(url_info.get("size") or 0)
+
+
+# 平台 -> 解析器类，解析器在首次使用时才创建
+_PARSER_FACTORIES = {
+    "bilibili": BilibiliParser,
+    "youtube": YouTubeParser,
+    "vimeo": VimeoParser,
+    "generic": GenericParser
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_parser(platform: str):
+    """获取平台解析器（进程内每个平台只创建一次），不支持的平台返回None"""
+    factory = _PARSER_FACTORIES.get(platform)
+    return factory() if factory else None
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_downloader() -> DirectDownloader:
+    """获取进程内共享的直链下载器"""
+    return DirectDownloader()
+
 
 class VideoDownloader:
     """视频下载器主模块"""
@@ -24,34 +140,13 @@ class VideoDownloader:
     def __init__(self):
         """初始化视频下载器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
         # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - VIDEO_DOWNLOADER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'video_downloader.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('VideoDownloader')
+        self.logger = get_logger('VideoDownloader', 'video_downloader.log', 'VIDEO_DOWNLOADER')
         
-        # 初始化各个解析器
-        self.parsers = {
-            "bilibili": BilibiliParser(),
-            "youtube": YouTubeParser(),
-            "vimeo": VimeoParser(),
-            "generic": GenericParser()
-        }
-        
-        # 初始化下载器
-        self.downloader = DirectDownloader()
+        # 下载器在进程内共享，复用连接池和按域名的并发限制
+        self.downloader = _shared_downloader()
         
         self.logger.info("视频下载器已初始化")
     
@@ -93,13 +188,9 @@ class VideoDownloader:
                     return download_result
             
             # 获取对应的解析器
-            parser = self.parsers.get(platform)
+            parser = self.get_parser(platform)
             if not parser:
-                return {
-                    "success": False,
-                    "error": f"不支持的平台: {platform}",
-                    "url": url
-                }
+                return error_result(f"不支持的平台: {platform}", url)
             
             # 解析链接
             self.logger.info(f"使用{platform}解析器解析链接")
@@ -115,11 +206,7 @@ class VideoDownloader:
             # 获取下载链接
             download_urls = parse_result.get("download_urls", [])
             if not download_urls:
-                return {
-                    "success": False,
-                    "error": "未找到可下载的链接",
-                    "url": url
-                }
+                return error_result("未找到可下载的链接", url)
             
             # 选择最佳下载链接
             best_url = self._select_best_download_url(download_urls)
@@ -144,100 +231,47 @@ class VideoDownloader:
                 
         except Exception as e:
             self.logger.error(f"视频下载失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "url": url
-            }
+            return error_result(str(e), url)
+    
+    def get_parser(self, platform: str):
+        """
+        获取平台解析器（首次使用时创建）
+        :param platform: 平台名称
+        :return: 解析器，不支持的平台返回None
+        """
+        return _get_parser(platform)
     
     def _extract_filename_from_url(self, url: str) -> str:
         """从URL中提取文件名"""
-        try:
-            # 移除查询参数
-            clean_url = url.split('?')[0]
-            # 获取路径的最后一部分
-            filename = clean_url.split('/')[-1]
-            
-            # 如果没有扩展名，添加默认扩展名
-            if '.' not in filename:
-                if 'bilivideo.com' in url:
-                    filename += '.mp4'  # B站直链默认是mp4
-                else:
-                    filename += '.mp4'  # 其他情况默认mp4
-            
-            # 清理文件名中的特殊字符
-            filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-            
-            return filename
-        except Exception as e:
-            self.logger.warning(f"提取文件名失败: {e}")
-            return f"video_{int(time.time())}.mp4"
+        # 获取路径的最后一部分（不含查询参数）
+        filename = url_basename(url)
+        
+        # 如果没有扩展名，添加默认扩展名（B站直链及其他情况默认都是mp4）
+        if '.' not in filename:
+            filename += '.mp4'
+        
+        # 清理文件名中的特殊字符
+        return filename.translate(_UNSAFE_TRANS)
     
     def _generate_safe_filename(self, title: str, extension: str = ".mp4") -> str:
         """生成安全的文件名"""
-        try:
-            # 清理标题中的特殊字符
-            safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-            # 限制长度
-            if len(safe_title) > 100:
-                safe_title = safe_title[:100]
-            # 添加时间戳确保唯一性
-            timestamp = int(time.time())
-            return f"{safe_title}_{timestamp}{extension}"
-        except Exception as e:
-            self.logger.warning(f"生成安全文件名失败: {e}")
-            return f"video_{int(time.time())}{extension}"
+        # 清理标题中的特殊字符并限制长度
+        safe_title = (title or "video").translate(_UNSAFE_TRANS)[:100]
+        # 添加时间戳确保唯一性
+        timestamp = int(time.time())
+        return f"{safe_title}_{timestamp}{extension}"
     
     def _detect_platform(self, url: str) -> str:
         """检测链接平台"""
-        for platform, parser in self.parsers.items():
-            if parser.validate_url(url):
-                return platform
-        
-        return "generic"
+        return _classify(url)
     
     def _select_best_download_url(self, download_urls: list) -> str:
         """选择最佳下载链接"""
         if not download_urls:
             return ""
         
-        # 优先选择高质量、小文件的链接
-        best_url = download_urls[0]["url"]
-        best_score = 0
-        
-        for url_info in download_urls:
-            score = 0
-            
-            # 质量评分
-            quality = url_info.get("quality", "unknown").lower()
-            if "1080" in quality or "hd" in quality:
-                score += 3
-            elif "720" in quality:
-                score += 2
-            elif "480" in quality:
-                score += 1
-            
-            # 格式评分
-            format_type = url_info.get("format", "unknown").lower()
-            if format_type in ["mp4", "webm"]:
-                score += 2
-            elif format_type == "direct":
-                score += 1
-            
-            # 文件大小评分（越小越好）
-            size = url_info.get("size", 0)
-            if size > 0:
-                size_mb = size / (1024 * 1024)
-                if size_mb < 100:  # 小于100MB
-                    score += 2
-                elif size_mb < 500:  # 小于500MB
-                    score += 1
-            
-            if score > best_score:
-                best_score = score
-                best_url = url_info["url"]
-        
-        return best_url
+        # 优先选择高质量、小文件的链接（同分时取靠前的）
+        return max(download_urls, key=_score_download_url)["url"]
     
     def get_download_status(self, url: str) -> Dict:
         """
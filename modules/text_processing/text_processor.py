@@ -5,12 +5,211 @@
 """
 
 import os
-import time
-import logging
-import requests
+import asyncio
+import hashlib
+import functools
 import json
-from typing import Dict, Optional
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from .._aio import run_sync
+from .._config import PROJECT_ROOT, load_config
+from .._logging import get_logger
+from .._cache import TTLCache
+from ..openai_client import RetryPolicy, get_client
+
+# tiktoken为可选依赖，安装后按实际token数切分批量纠正的分组
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# diskcache为可选依赖，安装后GPT结果缓存落盘，进程重启后仍可命中
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# orjson为可选依赖，安装后更快地解析结构化输出
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# fastjsonschema为可选依赖，安装后按完整schema校验结构化输出
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# 各文本任务的固定说明，放在系统消息中作为共享前缀
+_CORRECT_INSTRUCTIONS = """请纠正用户提供的转录文本中的错误，包括：
+1. 语法错误
+2. 标点符号错误
+3. 明显的听写错误
+4. 保持原意不变
+
+请返回纠正后的文本。"""
+
+_FORMAT_INSTRUCTIONS = """请将用户提供的转录文本格式化为Markdown格式，要求：
+1. 添加适当的标题和段落
+2. 使用Markdown语法美化
+3. 保持内容完整性
+4. 添加适当的强调和列表
+
+请返回格式化后的Markdown文本。"""
+
+_SUMMARIZE_INSTRUCTIONS = """请总结用户提供的转录文本的主要内容，要求：
+1. 提取关键信息
+2. 概括主要观点
+3. 保持客观准确
+4. 总结长度适中
+
+请返回文本总结。"""
+
+_CORRECT_BATCH_INSTRUCTIONS = """请纠正用户提供的每一段转录文本中的错误，包括：
+1. 语法错误
+2. 标点符号错误
+3. 明显的听写错误
+4. 保持原意不变
+
+每段文本以<<<序号>>>开头。请在segments中逐段返回段落序号index和纠正后的文本text，不要合并或遗漏任何段落。"""
+
+# 任务类型 -> 完整系统消息（导入时生成一次，每次请求的前缀逐字节相同）
+_SYSTEM = {
+    task_type: f"你是一个专业的文本处理助手，专门负责{task_type}任务。请根据用户的要求完成任务，返回准确、有用的结果。\n\n{instructions}"
+    for task_type, instructions in (
+        ("text_correction", _CORRECT_INSTRUCTIONS),
+        ("text_formatting", _FORMAT_INSTRUCTIONS),
+        ("text_summarization", _SUMMARIZE_INSTRUCTIONS),
+        ("text_correction_batch", _CORRECT_BATCH_INSTRUCTIONS),
+    )
+}
+
+# 任务名 -> 任务类型
+_TASK_TYPES = {
+    "correct": "text_correction",
+    "format": "text_formatting",
+    "summarize": "text_summarization",
+}
+
+# 结构化输出的JSON Schema
+_CORRECTION_SCHEMA = {
+    "type": "object",
+    "properties": {"corrected_text": {"type": "string"}},
+    "required": ["corrected_text"],
+    "additionalProperties": False
+}
+
+_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {"summary": {"type": "string"}},
+    "required": ["summary"],
+    "additionalProperties": False
+}
+
+_CORRECTION_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"index": {"type": "integer"}, "text": {"type": "string"}},
+                "required": ["index", "text"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["segments"],
+    "additionalProperties": False
+}
+
+# 任务类型 -> (结果字段, JSON Schema)；格式化任务直接返回Markdown文本
+_STRUCTURED_OUTPUTS = {
+    "text_correction": ("corrected_text", _CORRECTION_SCHEMA),
+    "text_summarization": ("summary", _SUMMARY_SCHEMA),
+    "text_correction_batch": ("segments", _CORRECTION_BATCH_SCHEMA),
+}
+
+_TEXT_FORMAT = {"type": "text"}
+
+# 任务类型 -> response_format（strict模式下模型输出必定符合schema）
+_RESPONSE_FORMATS = {
+    task_type: {
+        "type": "json_schema",
+        "json_schema": {"name": task_type, "strict": True, "schema": schema}
+    }
+    for task_type, (_, schema) in _STRUCTURED_OUTPUTS.items()
+}
+
+_GPT_CACHE_DIR = str(PROJECT_ROOT / '.cache' / 'gpt')
+
+
+class _ResponseCache:
+    """GPT结果缓存（安装diskcache时持久化到磁盘，否则使用进程内缓存）"""
+    
+    def __init__(self, ttl: int):
+        """
+        初始化缓存
+        :param ttl: 缓存有效期（秒）
+        """
+        self.ttl = ttl
+        if diskcache is not None:
+            self._store = diskcache.Cache(_GPT_CACHE_DIR, size_limit=256 << 20)
+        else:
+            self._store = TTLCache(maxsize=256, ttl=ttl)
+    
+    def get(self, key: str) -> Optional[str]:
+        return self._store.get(key)
+    
+    def set(self, key: str, content: str):
+        if diskcache is not None:
+            self._store.set(key, content, expire=self.ttl)
+        else:
+            self._store.set(key, content)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """获取模型对应的tiktoken编码器（未知模型使用通用编码）"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('o200k_base')
+
+
+@functools.lru_cache(maxsize=None)
+def _get_validator(task_type: str):
+    """获取任务类型对应的已编译schema校验器"""
+    return fastjsonschema.compile(_STRUCTURED_OUTPUTS[task_type][1])
+
+
+def _parse_structured(task_type: str, content: str):
+    """
+    解析结构化输出
+    :param task_type: 任务类型
+    :param content: 模型返回的JSON文本
+    :return: 结果字段的值，格式不符时返回None
+    """
+    field = _STRUCTURED_OUTPUTS[task_type][0]
+    try:
+        payload = _loads(content)
+    except ValueError:
+        return None
+    if fastjsonschema is not None:
+        try:
+            _get_validator(task_type)(payload)
+        except fastjsonschema.JsonSchemaException:
+            return None
+    elif not isinstance(payload, dict) or field not in payload:
+        return None
+    return payload[field]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_response_cache(ttl: int) -> _ResponseCache:
+    """获取进程内共享的GPT结果缓存"""
+    return _ResponseCache(ttl)
 
 class TextProcessor:
     """文本处理器"""
@@ -18,27 +217,17 @@ class TextProcessor:
     def __init__(self):
         """初始化文本处理器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
-        
-        # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - TEXT_PROCESSER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'text_processor.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        load_config()
+        
+        # 设置日志（同名记录器只配置一次）
+        self.logger = get_logger('TextProcessor', 'text_processor.log', 'TEXT_PROCESSER')
         
-        self.logger = logging.getLogger('TextProcessor')
+        # 共享的OpenAI客户端（连接池、限流和API配置）
+        self._openai = get_client()
+        self.openai_api_key = self._openai.api_key
+        self.openai_base_url = self._openai.base_url
         
         # 从环境变量读取配置
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.openai_base_url = os.getenv("OPENAI_BASE_URL")
         self.gpt_model = os.getenv("GPT_MODEL", "gpt-4o")
         self.max_retries = int(os.getenv("GPT_MAX_RETRIES", "3"))
         self.retry_delay = int(os.getenv("GPT_RETRY_DELAY", "2"))
@@ -49,6 +238,27 @@ class TextProcessor:
         self.gpt_503_retry_multiplier = int(os.getenv("GPT_503_RETRY_MULTIPLIER", "2"))
         self.gpt_502_base_delay = int(os.getenv("GPT_502_BASE_DELAY", "5"))
         self.gpt_503_base_delay = int(os.getenv("GPT_503_BASE_DELAY", "10"))
+        retry_delays = {
+            429: lambda attempt: self.retry_delay * (2 ** attempt),
+            502: lambda attempt: self.retry_delay * (self.gpt_502_retry_multiplier ** attempt) + self.gpt_502_base_delay,
+            503: lambda attempt: self.retry_delay * (self.gpt_503_retry_multiplier ** attempt) + self.gpt_503_base_delay,
+        }
+        self._retry_policy = RetryPolicy("GPT API", self.max_retries, self.retry_delay, retry_delays, self.timeout)
+        self._batch_policy = RetryPolicy("Batch API", self.max_retries, self.retry_delay, retry_delays, self.timeout)
+        
+        # 结果缓存：相同模型、任务和提示词直接返回上次结果（有效期为0时关闭）
+        self.cache_ttl = int(os.getenv("GPT_CACHE_TTL_S", str(7 * 86400)))
+        self._response_cache = _get_response_cache(self.cache_ttl) if self.cache_ttl > 0 else None
+        # 开启缓存时使用temperature=0，保证相同输入得到稳定输出
+        self.temperature = 0 if self._response_cache is not None else 0.3
+        
+        # 批量纠正时每次请求输入文本的token上限
+        self.batch_max_tokens = int(os.getenv("GPT_BATCH_MAX_TOKENS", "3000"))
+        
+        # 同时在途的GPT请求上限
+        self.max_concurrency = int(os.getenv("GPT_MAX_CONCURRENCY", "4"))
+        self._semaphore = None
+        self._semaphore_loop = None
         
         # 检查配置
         self._validate_config()
@@ -62,7 +272,28 @@ class TextProcessor:
         if not self.openai_base_url:
             self.logger.warning("未设置OPENAI_BASE_URL，GPT功能将不可用")
     
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def close(self):
+        """关闭共享的HTTP客户端，释放连接池"""
+        await self._openai.aclose()
+    
     def process_text(self, text: str, task: str = "format") -> Dict:
+        """
+        处理文本（同步接口，在后台事件循环中执行）
+        :param text: 输入文本
+        :param task: 处理任务类型 (correct, format, summarize)
+        :return: 处理结果
+        """
+        return run_sync(self.process_text_async(text, task))
+    
+    async def process_text_async(self, text: str, task: str = "format") -> Dict:
         """
         处理文本
         :param text: 输入文本
@@ -82,11 +313,11 @@ class TextProcessor:
             
             # 根据任务类型处理文本
             if task == "correct":
-                return self._correct_text(text)
+                return await self._correct_text(text)
             elif task == "format":
-                return self._format_text(text)
+                return await self._format_text(text)
             elif task == "summarize":
-                return self._summarize_text(text)
+                return await self._summarize_text(text)
             else:
                 return {
                     "success": False,
@@ -102,22 +333,44 @@ class TextProcessor:
                 "text": text[:100] + "..." if len(text) > 100 else text
             }
     
-    def _correct_text(self, text: str) -> Dict:
+    def process_all(self, text: str) -> Dict:
+        """
+        同时执行纠正、格式化和总结（同步接口，在后台事件循环中执行）
+        :param text: 输入文本
+        :return: 各任务的处理结果
+        """
+        return run_sync(self.process_all_async(text))
+    
+    async def process_all_async(self, text: str) -> Dict:
+        """
+        并发执行纠正、格式化和总结三个任务
+        :param text: 输入文本
+        :return: 各任务的处理结果
+        """
+        tasks = ("correct", "format", "summarize")
+        results = await asyncio.gather(
+            *[self.process_text_async(text, task) for task in tasks],
+            return_exceptions=True
+        )
+        
+        merged = {}
+        for task, result in zip(tasks, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"文本处理失败 ({task}): {result}")
+                result = {"success": False, "error": str(result), "task": task}
+            merged[task] = result
+        
+        return {
+            "success": any(result.get("success") for result in merged.values()),
+            "results": merged,
+            "message": "文本处理完成"
+        }
+    
+    async def _correct_text(self, text: str) -> Dict:
         """纠正文本"""
         self.logger.info("开始纠正文本")
         
-        prompt = f"""请纠正以下转录文本中的错误，包括：
-1. 语法错误
-2. 标点符号错误
-3. 明显的听写错误
-4. 保持原意不变
-
-转录文本：
-{text}
-
-请返回纠正后的文本："""
-        
-        gpt_result = self._call_gpt_api(prompt, "text_correction")
+        gpt_result = await self._call_gpt_api(f"转录文本：\n{text}", "text_correction")
         
         if gpt_result.get("success"):
             return {
@@ -136,22 +389,95 @@ class TextProcessor:
                 "task": "correct"
             }
     
-    def _format_text(self, text: str) -> Dict:
+    def correct_texts(self, texts: List[str]) -> Dict:
+        """
+        批量纠正多段文本（同步接口，在后台事件循环中执行）
+        :param texts: 文本分段列表
+        :return: 处理结果
+        """
+        if not self.openai_api_key or not self.openai_base_url:
+            return {
+                "success": False,
+                "error": "OpenAI API配置不完整，请检查OPENAI_API_KEY和OPENAI_BASE_URL",
+                "task": "correct"
+            }
+        return run_sync(self._correct_text_batch(texts))
+    
+    def _count_tokens(self, text: str) -> int:
+        """估算文本token数（未安装tiktoken时按字符数保守估计）"""
+        if tiktoken is None:
+            return len(text)
+        return len(_get_encoding(self.gpt_model).encode(text))
+    
+    def _pack_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        按token预算把分段打包成若干批
+        :param texts: 文本分段列表
+        :return: 每批包含的分段序号
+        """
+        batches, current, used = [], [], 0
+        for i, text in enumerate(texts):
+            tokens = self._count_tokens(text)
+            if current and used + tokens > self.batch_max_tokens:
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _correct_text_batch(self, texts: List[str]) -> Dict:
+        """
+        批量纠正文本：多段文本合并为一次请求，共用同一份任务说明
+        :param texts: 文本分段列表
+        :return: 处理结果
+        """
+        self.logger.info(f"开始批量纠正文本，共{len(texts)}段")
+        
+        async def run_batch(indexes: List[int]) -> Dict:
+            prompt = "\n".join(f"<<<{n}>>>\n{texts[i]}" for n, i in enumerate(indexes))
+            # 输出与输入长度相当，再为JSON结构预留余量
+            max_tokens = max(2000, int(sum(self._count_tokens(texts[i]) for i in indexes) * 1.5))
+            return await self._call_gpt_api(prompt, "text_correction_batch", max_tokens=max_tokens)
+        
+        batches = self._pack_batches(texts)
+        gpt_results = await asyncio.gather(*[run_batch(indexes) for indexes in batches])
+        
+        corrected = list(texts)
+        for indexes, gpt_result in zip(batches, gpt_results):
+            if not gpt_result.get("success"):
+                return {
+                    "success": False,
+                    "error": gpt_result.get("error", "GPT API调用失败"),
+                    "original_texts": texts,
+                    "task": "correct"
+                }
+            values = {
+                segment.get("index"): segment.get("text")
+                for segment in gpt_result["content"] if isinstance(segment, dict)
+            }
+            for n, i in enumerate(indexes):
+                value = values.get(n)
+                if isinstance(value, str) and value:
+                    corrected[i] = value
+                else:
+                    # 缺失的段落保留原文
+                    self.logger.warning(f"批量纠正结果缺少第{i}段，保留原文")
+        
+        return {
+            "success": True,
+            "original_texts": texts,
+            "corrected_texts": corrected,
+            "task": "correct",
+            "message": f"批量文本纠正完成，共{len(batches)}次请求"
+        }
+    
+    async def _format_text(self, text: str) -> Dict:
         """格式化文本"""
         self.logger.info("开始格式化文本")
         
-        prompt = f"""请将以下转录文本格式化为Markdown格式，要求：
-1. 添加适当的标题和段落
-2. 使用Markdown语法美化
-3. 保持内容完整性
-4. 添加适当的强调和列表
-
-转录文本：
-{text}
-
-请返回格式化后的Markdown文本："""
-        
-        gpt_result = self._call_gpt_api(prompt, "text_formatting")
+        gpt_result = await self._call_gpt_api(f"转录文本：\n{text}", "text_formatting")
         
         if gpt_result.get("success"):
             return {
@@ -170,22 +496,11 @@ class TextProcessor:
                 "task": "format"
             }
     
-    def _summarize_text(self, text: str) -> Dict:
+    async def _summarize_text(self, text: str) -> Dict:
         """总结文本"""
         self.logger.info("开始总结文本")
         
-        prompt = f"""请总结以下转录文本的主要内容，要求：
-1. 提取关键信息
-2. 概括主要观点
-3. 保持客观准确
-4. 总结长度适中
-
-转录文本：
-{text}
-
-请返回文本总结："""
-        
-        gpt_result = self._call_gpt_api(prompt, "text_summarization")
+        gpt_result = await self._call_gpt_api(f"转录文本：\n{text}", "text_summarization")
         
         if gpt_result.get("success"):
             return {
@@ -204,182 +519,247 @@ class TextProcessor:
                 "task": "summarize"
             }
     
-    def _call_gpt_api(self, prompt: str, task_type: str) -> Dict:
+    def _build_request_body(self, prompt: str, task_type: str,
+                            response_format: Optional[Dict] = None, max_tokens: int = 2000) -> Dict:
+        """
+        构建chat/completions请求体（实时调用和Batch API共用）
+        :param prompt: 提示词（放在最后的可变内容）
+        :param task_type: 任务类型（决定使用的固定系统消息）
+        :param response_format: 响应格式（默认按任务类型选择JSON Schema或纯文本）
+        :param max_tokens: 最大输出token数
+        :return: 请求体
+        """
+        # 固定系统消息在前、可变文本在后，便于命中OpenAI的自动前缀缓存
+        return {
+            "model": self.gpt_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": _SYSTEM[task_type]
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+            "prompt_cache_key": task_type,
+            "response_format": response_format or _RESPONSE_FORMATS.get(task_type, _TEXT_FORMAT)
+        }
+    
+    async def _call_gpt_api(self, prompt: str, task_type: str,
+                            response_format: Optional[Dict] = None, max_tokens: int = 2000) -> Dict:
         """
         调用GPT API
-        :param prompt: 提示词
+        :param prompt: 提示词（放在最后的可变内容）
         :param task_type: 任务类型
-        :return: API调用结果
+        :param response_format: 响应格式（默认按任务类型选择）
+        :param max_tokens: 最大输出token数
+        :return: API调用结果（结构化任务的content为解析后的结果字段）
         """
-        for attempt in range(self.max_retries):
-            try:
-                self.logger.info(f"调用GPT API (尝试 {attempt + 1}/{self.max_retries})")
-                
-                # 构建API请求
-                url = f"{self.openai_base_url}/chat/completions"
-                headers = {
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                data = {
+        data = self._build_request_body(prompt, task_type, response_format, max_tokens)
+        system_content = _SYSTEM[task_type]
+        
+        cache_key = None
+        if self._response_cache is not None:
+            cache_key = hashlib.sha256(f"{self.gpt_model}|{system_content}|{prompt}".encode('utf-8')).hexdigest()
+            content = self._response_cache.get(cache_key)
+            if content is not None:
+                self.logger.info("命中GPT结果缓存")
+                return {
+                    "success": True,
+                    "content": content,
                     "model": self.gpt_model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": f"你是一个专业的文本处理助手，专门负责{task_type}任务。请根据用户的要求完成任务，返回准确、有用的结果。"
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "max_tokens": 2000,
-                    "temperature": 0.3,
-                    "response_format": {"type": "text"}
+                    "task_type": task_type,
+                    "cached": True
+                }
+        
+        # 按输入token数加上输出上限估算本次请求的TPM消耗
+        estimated_tokens = self._count_tokens(system_content) + self._count_tokens(prompt) + max_tokens
+        
+        def parse(response) -> Optional[Dict]:
+            content = response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+            if not content:
+                return None
+            if task_type in _STRUCTURED_OUTPUTS:
+                # 缓存和返回解析后的值，命中缓存时无需再次解析
+                content = _parse_structured(task_type, content)
+                if content is None:
+                    self.logger.warning("GPT返回的JSON不符合schema")
+                    return None
+            self.logger.info("GPT API调用成功")
+            if cache_key is not None:
+                self._response_cache.set(cache_key, content)
+            return {
+                "success": True,
+                "content": content,
+                "model": self.gpt_model,
+                "task_type": task_type
+            }
+        
+        # 限制同时在途的请求数，避免并发任务集中触发429
+        async with self._get_semaphore():
+            return await self._openai.post_json(
+                "/chat/completions", data, parse, self._retry_policy, self.logger, tokens=estimated_tokens
+            )
+    
+    def submit_batch(self, jobs: List[Dict]) -> Dict:
+        """
+        通过OpenAI Batch API提交离线文本任务（同步接口，在后台事件循环中执行）
+        :param jobs: 任务列表，每项包含custom_id、text、task (correct, format, summarize)
+        :return: 提交结果（含batch_id）
+        """
+        return run_sync(self.submit_batch_async(jobs))
+    
+    async def submit_batch_async(self, jobs: List[Dict]) -> Dict:
+        """
+        通过OpenAI Batch API提交离线文本任务（24小时内完成，费用为实时调用的一半）
+        :param jobs: 任务列表，每项包含custom_id、text、task (correct, format, summarize)
+        :return: 提交结果（含batch_id）
+        """
+        if not self.openai_api_key or not self.openai_base_url:
+            return {
+                "success": False,
+                "error": "OpenAI API配置不完整，请检查OPENAI_API_KEY和OPENAI_BASE_URL"
+            }
+        
+        lines = []
+        for job in jobs:
+            task = job.get("task", "format")
+            if task not in _TASK_TYPES:
+                return {
+                    "success": False,
+                    "error": f"不支持的任务类型: {task}"
                 }
-                
-                # 发送请求
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    json=data,
-                    timeout=self.timeout
+            lines.append(json.dumps({
+                "custom_id": str(job["custom_id"]),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                # 离线结果按纯文本返回，下载后无需按任务类型解析
+                "body": self._build_request_body(
+                    f"转录文本：\n{job['text']}", _TASK_TYPES[task], response_format=_TEXT_FORMAT
                 )
-                
-                # 检查响应
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-                    
-                    if content:
-                        self.logger.info("GPT API调用成功")
-                        return {
-                            "success": True,
-                            "content": content,
-                            "model": self.gpt_model,
-                            "task_type": task_type
-                        }
-                    else:
-                        self.logger.warning("GPT API返回空内容")
-                        if attempt < self.max_retries - 1:
-                            time.sleep(self.retry_delay)
-                            continue
-                        else:
-                            return {
-                                "success": False,
-                                "error": "GPT API返回空内容"
-                            }
-                
-                elif response.status_code == 401:
-                    error_msg = "OpenAI API密钥无效或已过期"
-                    self.logger.error(f"认证失败: {error_msg}")
-                    return {
-                        "success": False,
-                        "error": error_msg
-                    }
-                
-                elif response.status_code == 429:
-                    error_msg = "API请求频率过高，请稍后重试"
-                    self.logger.warning(f"频率限制: {error_msg}")
-                    if attempt < self.max_retries - 1:
-                        wait_time = self.retry_delay * (2 ** attempt)  # 指数退避
-                        self.logger.info(f"等待 {wait_time} 秒后重试")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": error_msg
-                        }
-                
-                elif response.status_code == 502:
-                    error_msg = "OpenAI服务器网关错误，服务器可能暂时不可用"
-                    self.logger.warning(f"网关错误 (尝试 {attempt + 1}/{self.max_retries}): {error_msg}")
-                    
-                    if attempt < self.max_retries - 1:
-                        # 502错误使用更长的重试间隔
-                        wait_time = self.retry_delay * (self.gpt_502_retry_multiplier ** attempt) + self.gpt_502_base_delay
-                        self.logger.info(f"等待 {wait_time} 秒后重试 (502错误特殊处理)")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"{error_msg}，建议稍后重试或检查网络连接"
-                        }
-                
-                elif response.status_code == 503:
-                    error_msg = "OpenAI服务暂时不可用，服务器可能正在维护"
-                    self.logger.warning(f"服务不可用 (尝试 {attempt + 1}/{self.max_retries}): {error_msg}")
-                    
-                    if attempt < self.max_retries - 1:
-                        wait_time = self.retry_delay * (self.gpt_503_retry_multiplier ** attempt) + self.gpt_503_base_delay
-                        self.logger.info(f"等待 {wait_time} 秒后重试 (503错误特殊处理)")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"{error_msg}，建议稍后重试"
-                        }
-                
-                elif response.status_code == 400:
-                    error_msg = f"请求参数错误: {response.text}"
-                    self.logger.error(f"参数错误: {error_msg}")
-                    return {
-                        "success": False,
-                        "error": error_msg
-                    }
-                
-                else:
-                    error_msg = f"GPT API请求失败，状态码: {response.status_code}"
-                    self.logger.warning(f"API错误: {error_msg}")
-                    
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": error_msg
-                        }
-                
-            except requests.exceptions.Timeout:
-                error_msg = "GPT API请求超时"
-                self.logger.warning(f"请求超时 (尝试 {attempt + 1}/{self.max_retries})")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    return {
-                        "success": False,
-                        "error": error_msg
-                    }
-            
-            except requests.exceptions.RequestException as e:
-                error_msg = f"GPT API请求异常: {e}"
-                self.logger.warning(f"请求异常 (尝试 {attempt + 1}/{self.max_retries}): {e}")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    return {
-                        "success": False,
-                        "error": error_msg
-                    }
+            }, ensure_ascii=False))
+        
+        self.logger.info(f"提交Batch任务，共{len(lines)}条请求")
+        
+        # 上传JSONL输入文件
+        upload = await self._batch_request(
+            "POST", "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", "\n".join(lines).encode('utf-8'), "application/jsonl")}
+        )
+        if not upload.get("success"):
+            return upload
+        
+        # 创建Batch任务
+        created = await self._batch_request(
+            "POST", "/batches",
+            json={
+                "input_file_id": upload["data"]["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            }
+        )
+        if not created.get("success"):
+            return created
+        
+        batch_id = created["data"]["id"]
+        self.logger.info(f"Batch任务已提交: {batch_id}")
+        return {
+            "success": True,
+            "batch_id": batch_id,
+            "status": created["data"].get("status"),
+            "message": "Batch任务已提交"
+        }
+    
+    def wait_batch(self, batch_id: str, max_wait: int = 24 * 3600) -> Dict:
+        """
+        等待Batch任务完成并下载结果（同步接口，在后台事件循环中执行）
+        :param batch_id: Batch任务ID
+        :param max_wait: 最长等待时间（秒）
+        :return: 各custom_id对应的处理结果
+        """
+        return run_sync(self.wait_batch_async(batch_id, max_wait))
+    
+    async def wait_batch_async(self, batch_id: str, max_wait: int = 24 * 3600) -> Dict:
+        """
+        轮询Batch任务状态（指数退避），完成后下载输出文件
+        :param batch_id: Batch任务ID
+        :param max_wait: 最长等待时间（秒）
+        :return: 各custom_id对应的处理结果
+        """
+        waited, delay = 0, 10
+        while True:
+            polled = await self._batch_request("GET", f"/batches/{batch_id}")
+            if not polled.get("success"):
+                return polled
             
-            except Exception as e:
-                error_msg = f"GPT API调用异常: {e}"
-                self.logger.error(f"API异常: {e}")
+            batch = polled["data"]
+            status = batch.get("status")
+            if status == "completed":
+                break
+            if status in ("failed", "expired", "cancelled"):
+                return {
+                    "success": False,
+                    "error": f"Batch任务未完成，状态: {status}",
+                    "batch_id": batch_id
+                }
+            if waited >= max_wait:
                 return {
                     "success": False,
-                    "error": error_msg
+                    "error": f"等待Batch任务超时，当前状态: {status}",
+                    "batch_id": batch_id
                 }
+            
+            self.logger.info(f"Batch任务状态: {status}，{delay}秒后再次查询")
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, 600)
+        
+        output_file_id = batch.get("output_file_id")
+        if not output_file_id:
+            return {
+                "success": False,
+                "error": "Batch任务没有输出文件",
+                "batch_id": batch_id
+            }
+        
+        downloaded = await self._batch_request("GET", f"/files/{output_file_id}/content", raw=True)
+        if not downloaded.get("success"):
+            return downloaded
+        
+        results = {}
+        for line in downloaded["data"].splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                content = response["body"].get("choices", [{}])[0].get("message", {}).get("content", "")
+                results[item["custom_id"]] = {"success": True, "content": content}
+            else:
+                error = item.get("error") or response.get("body", {}).get("error") or "请求失败"
+                results[item["custom_id"]] = {"success": False, "error": str(error)}
         
         return {
-            "success": False,
-            "error": f"GPT API调用失败，已重试{self.max_retries}次"
-        } 
\ No newline at end of file
+            "success": True,
+            "batch_id": batch_id,
+            "results": results,
+            "message": f"Batch任务完成，共{len(results)}条结果"
+        }
+    
+    async def _batch_request(self, method: str, path: str, raw: bool = False, **kwargs) -> Dict:
+        """
+        发送Batch相关的API请求（与实时调用使用相同的重试策略）
+        :param method: 请求方法
+        :param path: 相对于OPENAI_BASE_URL的路径
+        :param raw: 是否返回原始文本（否则解析为JSON）
+        :return: 请求结果
+        """
+        return await self._openai.request(
+            method, path,
+            lambda response: {"success": True, "data": response.text if raw else response.json()},
+            self._batch_policy, self.logger, **kwargs
+        )
@@ -5,11 +5,42 @@
 """
 
 import os
-import time
+import csv
+import json
 import logging
-import requests
-from typing import Dict, Optional
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from .._aio import run_sync
+from .._config import PROJECT_ROOT, load_config
+from .._logging import get_logger
+from ..openai_client import RetryPolicy, get_client
+
+# orjson为可选依赖，安装后直接从字节解析较大的verbose_json响应
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+_WHISPER_CACHE_DIR = PROJECT_ROOT / '.cache' / 'whisper'
+
+
+def _atomic_write(path: str, data: bytes):
+    """
+    原子写入文件：先写同目录下的临时文件再重命名，不会留下不完整的文件
+    :param path: 目标文件路径
+    :param data: 文件内容
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 class AudioTranscriber:
     """音频转录器"""
@@ -17,31 +48,39 @@ class AudioTranscriber:
     def __init__(self):
         """初始化音频转录器"""
         # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
+        load_config()
         
-        # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
+        # 设置日志（同名记录器只配置一次）
+        self.logger = get_logger('AudioTranscriber', 'audio_transcriber.log', 'AUDIO_TRANSCRIBER')
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - AUDIO_TRANSCRIBER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'audio_transcriber.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        self.logger = logging.getLogger('AudioTranscriber')
+        # 共享的OpenAI客户端（连接池、限流和API配置）
+        self._openai = get_client()
+        self.openai_api_key = self._openai.api_key
+        self.openai_base_url = self._openai.base_url
         
         # 从环境变量读取配置
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.openai_base_url = os.getenv("OPENAI_BASE_URL")
         self.whisper_model = os.getenv("WHISPER_MODEL", "whisper-1")
         self.max_retries = int(os.getenv("WHISPER_MAX_RETRIES", "3"))
         self.retry_delay = int(os.getenv("WHISPER_RETRY_DELAY", "2"))
         self.timeout = int(os.getenv("WHISPER_TIMEOUT", "300"))
+        self._retry_policy = RetryPolicy("Whisper API", self.max_retries, self.retry_delay, {
+            429: lambda attempt: self.retry_delay * (2 ** attempt),
+        }, self.timeout)
+        
+        # 时间戳粒度：下游只用到段落级时间戳，默认不请求体积大得多的词级时间戳
+        self.granularities = [
+            g.strip() for g in os.getenv("WHISPER_GRANULARITIES", "segment").split(",") if g.strip()
+        ]
+        
+        # 大文件切分：超过阈值的音频按固定时长切片后并发转录
+        self.split_threshold = int(os.getenv("WHISPER_SPLIT_THRESHOLD_MB", "8")) * 1024 * 1024
+        self.segment_seconds = int(os.getenv("WHISPER_SEGMENT_SECONDS", "120"))
+        self.max_concurrency = int(os.getenv("WHISPER_MAX_CONCURRENCY", "8"))
+        self._semaphore = None
+        self._semaphore_loop = None
+        
+        # 转录结果缓存：同一音频重复处理时直接返回，不再调用Whisper
+        self.cache_enabled = os.getenv("WHISPER_CACHE", "true").lower() == "true"
         
         # 检查配置
         self._validate_config()
@@ -54,8 +93,7 @@ class AudioTranscriber:
         :param seconds: 秒数
         :return: 格式化的时间字符串 (MM:SS)
         """
-        minutes = int(seconds // 60)
-        remaining_seconds = int(seconds % 60)
+        minutes, remaining_seconds = divmod(int(seconds), 60)
         return f"{minutes:02d}:{remaining_seconds:02d}"
     
     def _validate_config(self):
@@ -65,10 +103,32 @@ class AudioTranscriber:
         if not self.openai_base_url:
             self.logger.warning("未设置OPENAI_BASE_URL，转录功能将不可用")
     
-    def transcribe_audio(self, audio_path: str) -> Dict:
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def close(self):
+        """关闭共享的HTTP客户端，释放连接池"""
+        await self._openai.aclose()
+    
+    def transcribe_audio(self, audio_path: str, out_path: Optional[str] = None) -> Dict:
+        """
+        转录音频文件（同步接口，在后台事件循环中执行）
+        :param audio_path: 音频文件路径
+        :param out_path: 转录文本的输出路径（可选）
+        :return: 转录结果
+        """
+        return run_sync(self.transcribe_audio_async(audio_path, out_path))
+    
+    async def transcribe_audio_async(self, audio_path: str, out_path: Optional[str] = None) -> Dict:
         """
         转录音频文件
         :param audio_path: 音频文件路径
+        :param out_path: 转录文本的输出路径（可选，成功时写入并在结果中返回transcript_file）
         :return: 转录结果
         """
         try:
@@ -96,14 +156,30 @@ class AudioTranscriber:
                     "audio_path": audio_path
                 }
             
-            # 只使用真实的Whisper API
-            transcript_result = self._transcribe_with_whisper(audio_path)
-            
-            if transcript_result.get("success"):
-                return transcript_result
+            # 整个文件做哈希，放到线程中执行，避免大文件阻塞事件循环
+            cache_path = await asyncio.to_thread(self._cache_path, audio_path, file_size) if self.cache_enabled else None
+            if cache_path is not None and cache_path.exists():
+                self.logger.info(f"命中转录缓存: {cache_path.name}")
+                transcript_result = _loads(cache_path.read_bytes())
+                transcript_result.update(audio_path=audio_path, cached=True)
             else:
-                # 如果转录失败，返回错误信息
-                return transcript_result
+                # 只使用真实的Whisper API，大文件切片后并发转录
+                transcript_result = None
+                if file_size > self.split_threshold:
+                    transcript_result = await self._transcribe_in_chunks(audio_path)
+                if transcript_result is None:
+                    transcript_result = await self._transcribe_with_whisper(audio_path)
+                
+                if transcript_result.get("success") and cache_path is not None:
+                    self._save_cache(cache_path, transcript_result)
+            
+            if transcript_result.get("success") and out_path:
+                # 转录文本直接落盘，调用方无需再次编码写入
+                _atomic_write(out_path, transcript_result["transcript"].encode('utf-8'))
+                transcript_result["transcript_file"] = out_path
+            
+            # 如果转录失败，返回错误信息
+            return transcript_result
             
         except Exception as e:
             self.logger.error(f"音频转录失败: {e}")
@@ -113,214 +189,229 @@ class AudioTranscriber:
                 "audio_path": audio_path
             }
     
-    def _transcribe_with_whisper(self, audio_path: str) -> Dict:
+    def _cache_path(self, audio_path: str, file_size: int):
+        """
+        计算转录缓存文件路径（按音频内容寻址）
+        :param audio_path: 音频文件路径
+        :param file_size: 音频文件大小
+        :return: 缓存文件路径
+        """
+        # 完整文件内容 + 文件大小 + 模型和时间戳粒度，任一变化都会生成新的缓存键
+        digest = hashlib.sha256()
+        with open(audio_path, 'rb') as f:
+            # 按1MiB分块读取，避免整个文件载入内存
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(f"|{file_size}|{self.whisper_model}|{','.join(self.granularities)}".encode('utf-8'))
+        return _WHISPER_CACHE_DIR / f"{digest.hexdigest()}.json"
+    
+    def _save_cache(self, cache_path, result: Dict):
+        """
+        写入转录缓存（先写临时文件再重命名，避免留下不完整的缓存）
+        :param cache_path: 缓存文件路径
+        :param result: 转录结果
+        """
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(str(cache_path), json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            self.logger.warning(f"写入转录缓存失败: {e}")
+    
+    async def _transcribe_with_whisper(self, audio_path: str) -> Dict:
         """
         使用OpenAI Whisper API转录音频
         :param audio_path: 音频文件路径
         :return: 转录结果
         """
-        for attempt in range(self.max_retries):
-            try:
-                self.logger.info(f"调用Whisper API (尝试 {attempt + 1}/{self.max_retries})")
-                
-                # 构建API请求
-                url = f"{self.openai_base_url}/audio/transcriptions"
-                headers = {
-                    "Authorization": f"Bearer {self.openai_api_key}"
-                }
-                
-                # 准备文件数据
-                with open(audio_path, 'rb') as audio_file:
-                    files = {
-                        'file': (os.path.basename(audio_path), audio_file, 'audio/wav')
-                    }
-                    data = {
-                        'model': self.whisper_model,
-                        'response_format': 'verbose_json',
-                        'language': 'zh',  # 支持中文
-                        'timestamp_granularities': ['word', 'segment']
-                    }
-                    
-                    # 发送请求
-                    response = requests.post(
-                        url,
-                        headers=headers,
-                        files=files,
-                        data=data,
-                        timeout=self.timeout
-                    )
-                
-                # 检查响应
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # 添加调试日志
-                    self.logger.info(f"Whisper API响应结构: {list(result.keys())}")
-                    if 'segments' in result:
-                        self.logger.info(f"找到segments数据，数量: {len(result['segments'])}")
-                        if len(result['segments']) > 0:
-                            self.logger.info(f"第一个segment示例: {result['segments'][0]}")
-                    else:
-                        self.logger.info("未找到segments数据，使用纯文本模式")
-                    
-                    # 处理verbose_json格式的响应
-                    if 'segments' in result:
-                        # 构建带时间戳的转录文本
-                        transcript_with_timestamps = []
-                        plain_transcript = []
-                        
-                        for segment in result['segments']:
-                            start_time = segment.get('start', 0)
-                            end_time = segment.get('end', 0)
-                            text = segment.get('text', '').strip()
-                            
-                            if text:
-                                # 格式化时间戳
-                                start_str = self._format_timestamp(start_time)
-                                end_str = self._format_timestamp(end_time)
-                                
-                                # 带时间戳的文本
-                                timestamped_text = f"[{start_str} - {end_str}] {text}"
-                                transcript_with_timestamps.append(timestamped_text)
-                                
-                                # 纯文本
-                                plain_transcript.append(text)
-                        
-                        # 合并文本
-                        transcript_with_timestamps = '\n'.join(transcript_with_timestamps)
-                        plain_transcript = ' '.join(plain_transcript)
-                        
-                        self.logger.info("Whisper API转录成功（带时间戳）")
-                        
-                        # 添加详细的调试日志
-                        self.logger.info(f"纯文本转录长度: {len(plain_transcript)}")
-                        self.logger.info(f"带时间戳转录长度: {len(transcript_with_timestamps)}")
-                        self.logger.info(f"第一个带时间戳文本示例: {transcript_with_timestamps[0] if transcript_with_timestamps else 'None'}")
-                        
-                        return {
-                            "success": True,
-                            "audio_path": audio_path,
-                            "transcript": plain_transcript,  # 纯文本版本
-                            "transcript_with_timestamps": transcript_with_timestamps,  # 带时间戳版本
-                            "segments": result.get('segments', []),  # 原始分段数据
-                            "model": self.whisper_model,
-                            "language": "zh",
-                            "message": "转录完成（含时间戳）"
-                        }
-                    else:
-                        # 兼容旧格式
-                        transcript = result.get('text', '')
-                        
-                        if transcript:
-                            self.logger.info("Whisper API转录成功（纯文本）")
-                            return {
-                                "success": True,
-                                "audio_path": audio_path,
-                                "transcript": transcript,
-                                "model": self.whisper_model,
-                                "language": "zh",
-                                "message": "转录完成"
-                            }
-                        else:
-                            self.logger.warning("Whisper API返回空转录结果")
-                            if attempt < self.max_retries - 1:
-                                time.sleep(self.retry_delay)
-                                continue
-                            else:
-                                return {
-                                    "success": False,
-                                    "error": "Whisper API返回空转录结果",
-                                    "audio_path": audio_path
-                                }
-                
-                elif response.status_code == 401:
-                    error_msg = "OpenAI API密钥无效或已过期"
-                    self.logger.error(f"认证失败: {error_msg}")
-                    return {
-                        "success": False,
-                        "error": error_msg,
-                        "audio_path": audio_path
-                    }
-                
-                elif response.status_code == 429:
-                    error_msg = "API请求频率过高，请稍后重试"
-                    self.logger.warning(f"频率限制: {error_msg}")
-                    if attempt < self.max_retries - 1:
-                        wait_time = self.retry_delay * (2 ** attempt)  # 指数退避
-                        self.logger.info(f"等待 {wait_time} 秒后重试")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": error_msg,
-                            "audio_path": audio_path
-                        }
-                
-                elif response.status_code == 400:
-                    error_msg = f"请求参数错误: {response.text}"
-                    self.logger.error(f"参数错误: {error_msg}")
-                    return {
-                        "success": False,
-                        "error": error_msg,
-                        "audio_path": audio_path
-                    }
-                
-                else:
-                    error_msg = f"Whisper API请求失败，状态码: {response.status_code}"
-                    self.logger.warning(f"API错误: {error_msg}")
-                    
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay)
-                        continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": error_msg,
-                            "audio_path": audio_path
-                        }
-                
-            except requests.exceptions.Timeout:
-                error_msg = "Whisper API请求超时"
-                self.logger.warning(f"请求超时 (尝试 {attempt + 1}/{self.max_retries})")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    return {
-                        "success": False,
-                        "error": error_msg,
-                        "audio_path": audio_path
-                    }
+        # 构建API请求
+        fields = [
+            ('model', self.whisper_model),
+            ('response_format', 'verbose_json'),
+            ('language', 'zh'),  # 支持中文
+            *(('timestamp_granularities', g) for g in self.granularities)
+        ]
+        
+        # 文件内容流式上传，与GPT请求共用连接池和限流额度
+        result = await self._openai.post_multipart(
+            "/audio/transcriptions", audio_path, fields,
+            lambda response: self._parse_whisper_response(audio_path, response),
+            self._retry_policy, self.logger
+        )
+        result.setdefault("audio_path", audio_path)
+        return result
+    
+    def _parse_whisper_response(self, audio_path: str, response) -> Optional[Dict]:
+        """
+        解析Whisper API的成功响应
+        :param audio_path: 音频文件路径
+        :param response: HTTP响应
+        :return: 转录结果，转录内容为空时返回None
+        """
+        result = _loads(response.content)
+        segments = result.get('segments')
+        
+        # 调试日志：仅在DEBUG级别格式化较大的响应内容
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(f"Whisper API响应结构: {list(result.keys())}")
+            if segments:
+                self.logger.debug(f"第一个segment示例: {segments[0]}")
+        
+        # 处理verbose_json格式的响应
+        if segments is not None:
+            self.logger.info(f"找到segments数据，数量: {len(segments)}")
             
-            except requests.exceptions.RequestException as e:
-                error_msg = f"Whisper API请求异常: {e}"
-                self.logger.warning(f"请求异常 (尝试 {attempt + 1}/{self.max_retries}): {e}")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    return {
-                        "success": False,
-                        "error": error_msg,
-                        "audio_path": audio_path
-                    }
+            # 构建带时间戳的转录文本和纯文本
+            plain_transcript, transcript_with_timestamps = self._join_segments(segments)
             
-            except Exception as e:
-                error_msg = f"Whisper API调用异常: {e}"
-                self.logger.error(f"API异常: {e}")
-                return {
-                    "success": False,
-                    "error": error_msg,
-                    "audio_path": audio_path
-                }
+            self.logger.info("Whisper API转录成功（带时间戳）")
+            self.logger.info(f"纯文本转录长度: {len(plain_transcript)}，带时间戳转录长度: {len(transcript_with_timestamps)}")
+            if debug:
+                self.logger.debug(f"带时间戳文本开头: {transcript_with_timestamps[:100]}")
+            
+            return {
+                "success": True,
+                "audio_path": audio_path,
+                "transcript": plain_transcript,  # 纯文本版本
+                "transcript_with_timestamps": transcript_with_timestamps,  # 带时间戳版本
+                "segments": segments,  # 原始分段数据
+                "model": self.whisper_model,
+                "language": "zh",
+                "message": "转录完成（含时间戳）"
+            }
+        
+        # 兼容旧格式
+        self.logger.info("未找到segments数据，使用纯文本模式")
+        transcript = result.get('text', '')
+        if not transcript:
+            return None
+        
+        self.logger.info("Whisper API转录成功（纯文本）")
+        return {
+            "success": True,
+            "audio_path": audio_path,
+            "transcript": transcript,
+            "model": self.whisper_model,
+            "language": "zh",
+            "message": "转录完成"
+        }
+    
+    def _join_segments(self, segments: List[Dict]) -> Tuple[str, str]:
+        """
+        拼接分段转录结果
+        :param segments: Whisper返回的分段列表
+        :return: (纯文本, 带时间戳文本)
+        """
+        # 单次遍历同时填充两份输出，跳过空文本，最后各join一次
+        plain_parts, timestamped_parts = [], []
+        for segment in segments:
+            text = segment.get('text', '').strip()
+            if not text:
+                continue
+            start_min, start_sec = divmod(int(segment.get('start', 0)), 60)
+            end_min, end_sec = divmod(int(segment.get('end', 0)), 60)
+            plain_parts.append(text)
+            timestamped_parts.append(f"[{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d}] {text}")
+        plain_transcript = ' '.join(plain_parts)
+        transcript_with_timestamps = '\n'.join(timestamped_parts)
+        return plain_transcript, transcript_with_timestamps
+    
+    async def _split_audio(self, audio_path: str, output_dir: str) -> List[Tuple[str, float, float]]:
+        """
+        使用ffmpeg按固定时长切分音频（不重新编码）
+        :param audio_path: 音频文件路径
+        :param output_dir: 切片输出目录
+        :return: [(切片路径, 起始秒数, 结束秒数)]，切分失败时返回空列表
+        """
+        ext = os.path.splitext(audio_path)[1] or '.wav'
+        list_path = os.path.join(output_dir, 'segments.csv')
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-i', audio_path,
+            '-f', 'segment',
+            '-segment_time', str(self.segment_seconds),
+            '-segment_list', list_path,
+            '-segment_list_type', 'csv',
+            '-c', 'copy',
+            '-y',
+            os.path.join(output_dir, f'chunk_%03d{ext}')
+        ]
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await proc.communicate()
+        except FileNotFoundError:
+            self.logger.warning("ffmpeg未安装，无法切分音频")
+            return []
+        
+        if proc.returncode != 0:
+            self.logger.warning(f"ffmpeg切分音频失败: {stderr.decode('utf-8', 'replace')}")
+            return []
+        
+        # segment_list记录了每个切片的实际起止时间
+        with open(list_path, newline='', encoding='utf-8') as f:
+            return [(os.path.join(output_dir, row[0]), float(row[1]), float(row[2])) for row in csv.reader(f) if row]
+    
+    async def _transcribe_chunk(self, chunk_path: str, offset: float, end: float) -> Dict:
+        """
+        转录单个切片，并把时间戳平移到原音频的时间轴
+        :param chunk_path: 切片文件路径
+        :param offset: 切片在原音频中的起始秒数
+        :param end: 切片在原音频中的结束秒数
+        :return: 转录结果
+        """
+        async with self._get_semaphore():
+            result = await self._transcribe_with_whisper(chunk_path)
+        if not result.get("success"):
+            return result
+        
+        if 'segments' in result:
+            result['segments'] = [
+                dict(segment, start=segment.get('start', 0) + offset, end=segment.get('end', 0) + offset)
+                for segment in result['segments']
+            ]
+        else:
+            result['segments'] = [{"start": offset, "end": end, "text": result.get('transcript', '')}]
+        return result
+    
+    async def _transcribe_in_chunks(self, audio_path: str) -> Optional[Dict]:
+        """
+        切分大音频文件并发转录，再按时间顺序合并
+        :param audio_path: 音频文件路径
+        :return: 转录结果，无法切分时返回None（由调用方整体上传）
+        """
+        with tempfile.TemporaryDirectory(prefix='whisper_') as tmp_dir:
+            chunks = await self._split_audio(audio_path, tmp_dir)
+            if len(chunks) <= 1:
+                return None
+            
+            self.logger.info(f"音频已切分为{len(chunks)}段，开始并发转录")
+            results = await asyncio.gather(*[self._transcribe_chunk(*chunk) for chunk in chunks])
+        
+        for result in results:
+            if not result.get("success"):
+                result["audio_path"] = audio_path
+                return result
+        
+        segments = [segment for result in results for segment in result['segments']]
+        plain_transcript, transcript_with_timestamps = self._join_segments(segments)
+        self.logger.info(f"分段转录完成，共{len(chunks)}段")
         
         return {
-            "success": False,
-            "error": f"Whisper API调用失败，已重试{self.max_retries}次",
-            "audio_path": audio_path
+            "success": True,
+            "audio_path": audio_path,
+            "transcript": plain_transcript,
+            "transcript_with_timestamps": transcript_with_timestamps,
+            "segments": segments,
+            "model": self.whisper_model,
+            "language": "zh",
+            "chunks": len(chunks),
+            "message": "转录完成（含时间戳）"
         }
     
     def get_transcription_status(self, audio_path: str) -> Dict:
@@ -3,6 +3,6 @@
 包含整个处理流程的协调控制
 """
 
-from .workflow_controller import WorkflowController
+from .workflow_controller import WorkflowController, get_controller
 
-__all__ = ['WorkflowController'] 
\ No newline at end of file
+__all__ = ['WorkflowController', 'get_controller'] 
\ No newline at end of file
@@ -5,125 +5,399 @@
 """
 
 import os
+import uuid
+import mmap
+import hashlib
 import logging
 import json
+import asyncio
+import functools
+import itertools
+import threading
+import dataclasses
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
-from dotenv import load_dotenv
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from .._aio import run_sync
+from .._config import PROJECT_ROOT, load_config
+from .._logging import get_logger
+from .._cache import TTLCache
+
+# orjson为可选依赖，安装后更快地序列化包含完整转录文本的结果JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj: Dict) -> bytes:
+    """序列化为缩进2格的UTF-8 JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _dump_value(value) -> bytes:
+    """序列化单个值（不缩进）"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+# 已下载视频的元数据缓存目录（按链接哈希存放）
+_DOWNLOAD_CACHE_DIR = PROJECT_ROOT / '.cache' / 'downloads'
+
+# 写入输出文件时的缓冲区大小
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _write_file(path: str, data: Union[bytes, List[bytes], Iterable[bytes]]):
+    """
+    原子写入已编码的字节：先写同目录下的临时文件再重命名，中途失败不会留下不完整的文件
+    :param path: 文件路径
+    :param data: 文件内容；片段列表由writev交给内核聚合，生成器则边生成边写入
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        if isinstance(data, (bytes, list)) and hasattr(os, 'writev'):
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                pending = [memoryview(part) for part in ([data] if isinstance(data, bytes) else data) if part]
+                while pending:
+                    written = os.writev(fd, pending)
+                    # writev可能只写入一部分，跳过已写完的片段后继续
+                    while pending and written >= len(pending[0]):
+                        written -= len(pending.pop(0))
+                    if written:
+                        pending[0] = pending[0][written:]
+            finally:
+                os.close(fd)
+        else:
+            with open(tmp_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                for part in ([data] if isinstance(data, bytes) else data):
+                    f.write(part)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+@functools.lru_cache(maxsize=1)
+def _get_write_executor() -> ThreadPoolExecutor:
+    """获取进程内共享的文件写入线程池"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='result-writer')
+
+
+# 写入结果JSON的字段（按输出顺序）
+_JSON_FIELDS = (
+    'success', 'input_text', 'link_type', 'platform_id', 'video_path', 'audio_path',
+    'transcript', 'transcript_with_timestamps', 'formatted_text',
+    'text_processing_success', 'text_processing_error', 'message',
+    'title', 'duration', 'size', 'platform', 'url',
+    'transcript_file', 'transcript_with_timestamps_file', 'formatted_file', 'combined_file',
+)
+
+# 合并输出文件中的段名 -> 结果字段（按写入顺序）
+_COMBINED_SECTIONS = (
+    ('transcript', 'transcript'),
+    ('timestamped', 'transcript_with_timestamps'),
+    ('formatted', 'formatted_text'),
+)
+
+
+def read_combined_section(path: str, section: str) -> str:
+    """
+    从合并输出文件中读取一段文本（按头部偏移直接切片，不读取其他段）
+    :param path: 合并输出文件路径
+    :param section: 段名（transcript、timestamped、formatted）
+    :return: 该段文本
+    """
+    with open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        data_start = f.tell()
+        offset, length = header["offsets"][section]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[data_start + offset:data_start + offset + length].decode('utf-8')
+
+# 结果JSON中只保留文件名的路径字段
+_BASENAME_FIELDS = ('video_path', 'audio_path')
+
+# 体积较大的文本字段：分块转义后流式写入结果JSON
+_LARGE_FIELDS = ('transcript', 'transcript_with_timestamps', 'formatted_text')
+
+# 流式写入大文本字段时每块转义的字符数
+_JSON_CHUNK_CHARS = 1 << 18
+
+
+def _iter_result_json(result: Dict) -> Iterator[bytes]:
+    """
+    逐段生成完整结果JSON：其余字段一次序列化，大文本字段分块转义后依次输出，不在内存中拼出整个文档
+    :param result: 结果字典
+    :return: 缩进2格的UTF-8 JSON片段（按顺序拼接即为完整文档）
+    """
+    large = [field for field in _LARGE_FIELDS if isinstance(result.get(field), str)]
+    head = _dump_json({key: value for key, value in result.items() if key not in large})
+    if not large:
+        yield head
+        return
+    
+    # 去掉结尾的"\n}"，依次接上大文本字段
+    yield head[:-2] if head != b'{}' else b'{'
+    separator = b',\n  ' if head != b'{}' else b'\n  '
+    for field in large:
+        yield separator + _dump_value(field) + b': "'
+        value = result[field]
+        for start in range(0, len(value), _JSON_CHUNK_CHARS):
+            # JSON字符串按字符独立转义，分块转义后去掉两端引号即可直接拼接
+            yield _dump_value(value[start:start + _JSON_CHUNK_CHARS])[1:-1]
+        yield b'"'
+        separator = b',\n  '
+    yield b'\n}'
+
+
+# 保存后才生成的输出文件字段（未生成时不出现在结果字典中）
+_OUTPUT_FILE_FIELDS = frozenset((
+    'transcript_file', 'transcript_with_timestamps_file', 'formatted_file', 'combined_file', 'result_file',
+))
+
+
+@dataclasses.dataclass(slots=True)
+class WorkflowResult:
+    """单个视频的完整处理结果（保存和返回时才转换为字典）"""
+    success: bool
+    input_text: str
+    link_type: str
+    platform_id: Optional[str]
+    video_path: str
+    audio_path: str
+    transcript: str
+    transcript_with_timestamps: Optional[str]
+    formatted_text: str
+    text_processing_success: bool
+    text_processing_error: Optional[str]
+    message: str
+    title: Any
+    duration: Any
+    size: Any
+    platform: str
+    url: str
+    transcript_file: Optional[str] = None
+    transcript_with_timestamps_file: Optional[str] = None
+    formatted_file: Optional[str] = None
+    combined_file: Optional[str] = None
+    result_file: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        """转换为字典（字段顺序与定义一致）"""
+        return {
+            field.name: getattr(self, field.name)
+            for field in dataclasses.fields(self)
+            if field.name not in _OUTPUT_FILE_FIELDS or getattr(self, field.name) is not None
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def get_controller() -> 'WorkflowController':
+    """获取进程内共享的控制器（每个进程只初始化一次，API服务和多进程批处理的工作进程共用）"""
+    return WorkflowController()
+
+
+def _process_in_worker(input_text: str) -> Dict:
+    """在工作进程中处理单个视频链接（模块级函数，便于进程池序列化）"""
+    return get_controller().process_video_link(input_text)
 
-# 导入各个模块
-from ..link_classifier import LinkClassifier
-from ..preprocessing.video_downloader import VideoDownloader
-from ..preprocessing.audio_processor import AudioProcessor
-from ..transcription.audio_transcriber import AudioTranscriber
-from ..text_processing.text_processor import TextProcessor
 
 class WorkflowController:
     """工作流控制器"""
     
+    # 固定属性集合，不为每个实例创建__dict__
+    __slots__ = (
+        'logger',
+        '_link_classifier', '_video_downloader', '_audio_processor', '_audio_transcriber', '_text_processor',
+        'download_workers', 'audio_workers', 'transcribe_workers', 'text_workers', 'parallel_workers',
+        '_classification_cache', '_downloads', '_downloads_lock', '_base_ts', '_counter', '_transcriptions_dir', '_processed_dir',
+        'combined_output',
+    )
+    
     def __init__(self):
         """初始化工作流控制器"""
-        # 加载配置
-        config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config.env')
-        load_dotenv(config_path)
-        
-        # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - WORKFLOW_CONTROLLER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'workflow_controller.log'), encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # 加载配置（每个进程只解析一次）
+        load_config()
+        
+        # 设置日志（同名记录器只配置一次）
+        self.logger = get_logger('WorkflowController', 'workflow_controller.log', 'WORKFLOW_CONTROLLER')
+        
+        # 各个模块（首次使用时创建）
+        self._link_classifier = None
+        self._video_downloader = None
+        self._audio_processor = None
+        self._audio_transcriber = None
+        self._text_processor = None
+        
+        # 批量流水线各阶段的并发数
+        self.download_workers = int(os.getenv("WORKFLOW_DOWNLOAD_WORKERS", "8"))
+        self.audio_workers = int(os.getenv("WORKFLOW_AUDIO_WORKERS", "2"))
+        self.transcribe_workers = int(os.getenv("WORKFLOW_TRANSCRIBE_WORKERS", "4"))
+        self.text_workers = int(os.getenv("WORKFLOW_TEXT_WORKERS", "4"))
         
-        self.logger = logging.getLogger('WorkflowController')
+        # 多进程批量处理的进程数（默认CPU核数）
+        self.parallel_workers = int(os.getenv("WORKFLOW_PARALLEL_WORKERS", str(os.cpu_count() or 1)))
         
-        # 初始化各个模块
-        self.link_classifier = LinkClassifier()
-        self.video_downloader = VideoDownloader()
-        self.audio_processor = AudioProcessor()
-        self.audio_transcriber = AudioTranscriber()
-        self.text_processor = TextProcessor()
+        # 链接分类结果缓存（批量任务中重复的输入只分类一次）
+        self._classification_cache = TTLCache(maxsize=1024)
+        _DOWNLOAD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # 正在下载的链接（链接哈希 -> Future），批量任务中重复的链接只下载一次
+        self._downloads: Dict[str, Future] = {}
+        self._downloads_lock = threading.Lock()
+        
+        # 输出文件名的时间戳：初始化时格式化一次，再追加递增序号保证唯一
+        self._base_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._counter = itertools.count()
+        
+        # 输出目录（只解析和创建一次）
+        self._transcriptions_dir = PROJECT_ROOT / 'output' / 'transcriptions'
+        self._processed_dir = PROJECT_ROOT / 'output' / 'processed'
+        self._transcriptions_dir.mkdir(parents=True, exist_ok=True)
+        self._processed_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 合并输出模式：三种文本写入同一个文件（默认仍分别写入各自的文件）
+        self.combined_output = os.getenv("COMBINED_OUTPUT", "false").lower() == "true"
         
         self.logger.info("工作流控制器已初始化")
     
-    def _save_transcription_result(self, result: Dict) -> Dict:
+    # 各个模块在首次使用时才导入和初始化
+    @property
+    def link_classifier(self):
+        if self._link_classifier is None:
+            from ..link_classifier import LinkClassifier
+            self._link_classifier = LinkClassifier()
+        return self._link_classifier
+    
+    @property
+    def video_downloader(self):
+        if self._video_downloader is None:
+            from ..preprocessing.video_downloader import VideoDownloader
+            self._video_downloader = VideoDownloader()
+        return self._video_downloader
+    
+    @property
+    def audio_processor(self):
+        if self._audio_processor is None:
+            from ..preprocessing.audio_processor import AudioProcessor
+            self._audio_processor = AudioProcessor()
+        return self._audio_processor
+    
+    @property
+    def audio_transcriber(self):
+        if self._audio_transcriber is None:
+            from ..transcription.audio_transcriber import AudioTranscriber
+            self._audio_transcriber = AudioTranscriber()
+        return self._audio_transcriber
+    
+    @property
+    def text_processor(self):
+        if self._text_processor is None:
+            from ..text_processing.text_processor import TextProcessor
+            self._text_processor = TextProcessor()
+        return self._text_processor
+    
+    def _save_transcription_result(self, result: WorkflowResult) -> Dict:
         """
         保存转录结果到output目录
         :param result: 转录结果
-        :return: 包含保存路径的结果
+        :return: 包含保存路径的结果字典
         """
         try:
-            # 创建输出目录
-            output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'output')
-            transcriptions_dir = os.path.join(output_dir, 'transcriptions')
-            processed_dir = os.path.join(output_dir, 'processed')
-            
-            os.makedirs(transcriptions_dir, exist_ok=True)
-            os.makedirs(processed_dir, exist_ok=True)
-            
-            # 生成时间戳
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # 保存原始转录文本
-            if result.get('transcript'):
-                transcript_filename = f"transcript_{result.get('platform_id', 'unknown')}_{timestamp}.txt"
-                transcript_path = os.path.join(transcriptions_dir, transcript_filename)
-                
-                with open(transcript_path, 'w', encoding='utf-8') as f:
-                    f.write(result['transcript'])
-                
-                result['transcript_file'] = transcript_path
-                self.logger.info(f"转录文本已保存: {transcript_path}")
+            # 生成时间戳（同一控制器并发保存时也不会重名）
+            timestamp = f"{self._base_ts}_{next(self._counter):04d}"
             
-            # 保存带时间戳的转录文本
-            if result.get('transcript_with_timestamps'):
-                timestamped_filename = f"transcript_with_timestamps_{result.get('platform_id', 'unknown')}_{timestamp}.txt"
-                timestamped_path = os.path.join(transcriptions_dir, timestamped_filename)
-                
-                with open(timestamped_path, 'w', encoding='utf-8') as f:
-                    f.write(result['transcript_with_timestamps'])
-                
-                result['transcript_with_timestamps_file'] = timestamped_path
-                self.logger.info(f"带时间戳转录文本已保存: {timestamped_path}")
-            
-            # 保存格式化文本
-            if result.get('formatted_text'):
-                formatted_filename = f"processed_transcript_{result.get('platform_id', 'unknown')}_{timestamp}.md"
-                formatted_path = os.path.join(processed_dir, formatted_filename)
-                
-                with open(formatted_path, 'w', encoding='utf-8') as f:
-                    f.write(result['formatted_text'])
-                
-                result['formatted_file'] = formatted_path
-                self.logger.info(f"格式化文本已保存: {formatted_path}")
-            
-            # 保存完整结果JSON
-            json_filename = f"transcription_result_{result.get('platform_id', 'unknown')}_{timestamp}.json"
-            json_path = os.path.join(processed_dir, json_filename)
-            
-            # 移除文件路径等敏感信息
-            json_result = result.copy()
-            if 'video_path' in json_result:
-                json_result['video_path'] = os.path.basename(json_result['video_path'])
-            if 'audio_path' in json_result:
-                json_result['audio_path'] = os.path.basename(json_result['audio_path'])
-            
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(json_result, f, ensure_ascii=False, indent=2)
-            
-            result['result_file'] = json_path
-            self.logger.info(f"完整结果已保存: {json_path}")
-            
-            return result
+            platform_id = result.platform_id
+            
+            # (结果字段, 输出路径, 文件内容, 日志说明)
+            if self.combined_output:
+                outputs = self._combined_output(result, platform_id, timestamp)
+            else:
+                outputs = self._text_outputs(result, platform_id, timestamp)
+            
+            # 完整结果JSON（包含上面各文件的路径）
+            for field, path, _, _ in outputs:
+                setattr(result, field, path)
+            json_path = str(self._processed_dir / f"transcription_result_{platform_id}_{timestamp}.json")
+            
+            # 只输出白名单字段，并移除文件路径等敏感信息
+            data = result.to_dict()
+            json_result = {field: data[field] for field in _JSON_FIELDS if field in data}
+            for field in _BASENAME_FIELDS:
+                if json_result.get(field):
+                    json_result[field] = os.path.basename(json_result[field])
+            
+            outputs.append(('result_file', json_path, _iter_result_json(json_result), "完整结果"))
+            
+            # 各文件互不依赖，并发写入
+            list(_get_write_executor().map(lambda output: _write_file(output[1], output[2]), outputs))
+            
+            for _, path, _, label in outputs:
+                self.logger.info(f"{label}已保存: {path}")
+            
+            result.result_file = data['result_file'] = json_path
+            
+            return data
             
         except Exception as e:
             self.logger.error(f"保存转录结果失败: {e}")
-            return result
+            return result.to_dict()
+    
+    def _text_outputs(self, result: WorkflowResult, platform_id: str, timestamp: str) -> List[tuple]:
+        """
+        分文件输出：原始转录、带时间戳转录和格式化文本各写一个文件
+        :return: [(结果字段, 输出路径, 文件内容, 日志说明)]
+        """
+        outputs = []
+        
+        # 原始转录文本
+        if result.transcript:
+            transcript_path = str(self._transcriptions_dir / f"transcript_{platform_id}_{timestamp}.txt")
+            staged_path = result.transcript_file
+            if staged_path and os.path.exists(staged_path):
+                # 转录器已写好文本文件，直接移动到最终位置
+                os.replace(staged_path, transcript_path)
+                result.transcript_file = transcript_path
+                self.logger.info(f"转录文本已保存: {transcript_path}")
+            else:
+                outputs.append(('transcript_file', transcript_path, result.transcript.encode('utf-8'), "转录文本"))
+        
+        # 带时间戳的转录文本
+        if result.transcript_with_timestamps:
+            timestamped_path = str(self._transcriptions_dir / f"transcript_with_timestamps_{platform_id}_{timestamp}.txt")
+            outputs.append((
+                'transcript_with_timestamps_file', timestamped_path,
+                result.transcript_with_timestamps.encode('utf-8'), "带时间戳转录文本"
+            ))
+        
+        # 格式化文本
+        if result.formatted_text:
+            formatted_path = str(self._processed_dir / f"processed_transcript_{platform_id}_{timestamp}.md")
+            outputs.append(('formatted_file', formatted_path, result.formatted_text.encode('utf-8'), "格式化文本"))
+        
+        return outputs
+    
+    def _combined_output(self, result: WorkflowResult, platform_id: str, timestamp: str) -> List[tuple]:
+        """
+        合并输出：三种文本按段写入同一个文件，头部一行JSON记录各段的偏移和长度
+        :return: [(结果字段, 输出路径, 文件内容, 日志说明)]
+        """
+        sections, offsets, offset = [], {}, 0
+        for section, field in _COMBINED_SECTIONS:
+            data = (getattr(result, field) or '').encode('utf-8')
+            offsets[section] = [offset, len(data)]
+            sections.append(data)
+            offset += len(data)
+        
+        combined_path = str(self._processed_dir / f"combined_{platform_id}_{timestamp}.bin")
+        parts = [_dump_value({"offsets": offsets}) + b'\n', *sections]
+        return [('combined_file', combined_path, parts, "合并输出")]
     
     def process_video_link(self, input_text: str) -> Dict:
         """
@@ -131,29 +405,12 @@ class WorkflowController:
         :param input_text: 输入文本（包含链接）
         :return: 处理结果
         """
+        staged_path = None
         try:
             self.logger.info(f"开始处理视频链接: {input_text}")
             
-            # 步骤1: 链接分类
-            self.logger.info("步骤1: 链接分类")
-            classification_result = self.link_classifier.classify_link(input_text)
-            if not classification_result.get("success"):
-                return classification_result
-            
-            primary_link = classification_result.get("primary_link")
-            if not primary_link:
-                return {
-                    "success": False,
-                    "error": "未找到主要链接",
-                    "input_text": input_text
-                }
-            
-            # 步骤2: 视频下载
-            self.logger.info("步骤2: 视频下载")
-            download_result = self.video_downloader.download_video(
-                primary_link["url"], 
-                primary_link["type"]
-            )
+            # 步骤1-2: 链接分类和视频下载
+            download_result = self._classify_and_download(input_text)
             if not download_result.get("success"):
                 return download_result
             
@@ -169,55 +426,17 @@ class WorkflowController:
             
             # 步骤4: 音频转录
             self.logger.info("步骤4: 音频转录")
-            transcription_result = self.audio_transcriber.transcribe_audio(audio_path)
+            staged_path = self._staging_path()
+            transcription_result = self.audio_transcriber.transcribe_audio(audio_path, staged_path)
             if not transcription_result.get("success"):
                 return transcription_result
             
-            transcript = transcription_result["transcript"]
-            
-            # 提取带时间戳的转录结果（如果存在）
-            transcript_with_timestamps = transcription_result.get("transcript_with_timestamps")
-            
-            # 添加调试日志
-            self.logger.info(f"转录结果字段: {list(transcription_result.keys())}")
-            self.logger.info(f"transcript_with_timestamps存在: {transcript_with_timestamps is not None}")
-            if transcript_with_timestamps:
-                self.logger.info(f"transcript_with_timestamps长度: {len(transcript_with_timestamps)}")
-                self.logger.info(f"transcript_with_timestamps前100字符: {transcript_with_timestamps[:100]}")
-            
             # 步骤5: 文本处理
             self.logger.info("步骤5: 文本处理")
-            text_result = self.text_processor.process_text(transcript, "format")
-            
-            # 即使文本处理失败，也要返回转录结果
-            if text_result.get("success"):
-                formatted_text = text_result["formatted_text"]
-                text_message = "文本格式化完成"
-            else:
-                formatted_text = transcript  # 使用原始转录文本
-                text_message = f"文本格式化失败: {text_result.get('error', '未知错误')}"
+            transcript = transcription_result["transcript"]
+            text_result = self._preformatted(transcript) or self.text_processor.process_text(transcript, "format")
             
-            # 返回完整结果，包含视频信息
-            result = {
-                "success": True,
-                "input_text": input_text,
-                "link_type": primary_link["type"],
-                "platform_id": primary_link["platform_id"],
-                "video_path": video_path,
-                "audio_path": audio_path,
-                "transcript": transcript,
-                "transcript_with_timestamps": transcript_with_timestamps,
-                "formatted_text": formatted_text,
-                "text_processing_success": text_result.get("success", False),
-                "text_processing_error": text_result.get("error") if not text_result.get("success") else None,
-                "message": f"视频转录处理完成 - {text_message}",
-                # 添加视频信息
-                "title": download_result.get("title", "未知标题"),
-                "duration": download_result.get("duration", "未知"),
-                "size": download_result.get("size", "未知"),
-                "platform": download_result.get("platform", primary_link["type"]),
-                "url": primary_link["url"]
-            }
+            result = self._build_result(input_text, download_result, audio_path, transcription_result, text_result)
             
             # 保存结果到output目录
             final_result = self._save_transcription_result(result)
@@ -225,22 +444,336 @@ class WorkflowController:
             
         except Exception as e:
             self.logger.error(f"工作流处理失败: {e}")
+            self._discard_staged(staged_path)
             return {
                 "success": False,
                 "error": str(e),
                 "input_text": input_text
             }
     
+    def _preformatted(self, transcript: str) -> Optional[Dict]:
+        """
+        转录文本已是Markdown（至少3个标题行且分段）时直接作为格式化结果
+        相同文本的重复格式化由TextProcessor的结果缓存处理
+        :param transcript: 转录文本
+        :return: 格式化结果，需要调用文本处理器时返回None
+        """
+        headings = transcript.startswith('#') + transcript.count('\n#')
+        if headings >= 3 and '\n\n' in transcript:
+            self.logger.info("转录文本已是Markdown格式，跳过格式化")
+            return {
+                "success": True,
+                "original_text": transcript,
+                "formatted_text": transcript,
+                "task": "format",
+                "message": "文本已是Markdown格式"
+            }
+        return None
+    
+    def _staging_path(self) -> Optional[str]:
+        """
+        生成转录器直接写入转录文本的临时文件路径（保存结果时重命名为正式文件）
+        :return: 临时文件路径，合并输出模式不单独保存转录文本，返回None
+        """
+        if self.combined_output:
+            return None
+        return str(self._transcriptions_dir / f".transcript_{uuid.uuid4().hex}.tmp")
+    
+    def _discard_staged(self, staged_path: Optional[str]):
+        """处理失败时删除转录器已写入的临时文件"""
+        if staged_path and os.path.exists(staged_path):
+            os.unlink(staged_path)
+    
+    def _classify_and_download(self, input_text: str) -> Dict:
+        """
+        链接分类并下载主要链接对应的视频
+        :param input_text: 输入文本（包含链接）
+        :return: 下载结果（附带primary_link）
+        """
+        # 步骤1: 链接分类
+        self.logger.info("步骤1: 链接分类")
+        cache_key = ' '.join(input_text.split())
+        classification_result = self._classification_cache.get(cache_key)
+        if classification_result is None:
+            classification_result = self.link_classifier.classify_link(input_text)
+            if not classification_result.get("success"):
+                return classification_result
+            self._classification_cache.set(cache_key, classification_result)
+        
+        primary_link = classification_result.get("primary_link")
+        if not primary_link:
+            return {
+                "success": False,
+                "error": "未找到主要链接",
+                "input_text": input_text
+            }
+        
+        # 步骤2: 视频下载（同一链接已下载过且文件仍在时跳过解析和下载）
+        self.logger.info("步骤2: 视频下载")
+        url_hash = hashlib.blake2b(primary_link['url'].encode('utf-8'), digest_size=8).hexdigest()
+        meta_path = _DOWNLOAD_CACHE_DIR / f"{url_hash}.json"
+        download_result = self._load_download_meta(meta_path)
+        if download_result is None:
+            download_result = self._download_once(url_hash, primary_link, meta_path)
+        if download_result.get("success"):
+            download_result["primary_link"] = primary_link
+        return download_result
+    
+    def _download_once(self, url_hash: str, primary_link: Dict, meta_path) -> Dict:
+        """
+        下载视频并写入元数据；同一链接正在下载时等待该次下载完成并共用结果，
+        避免并发下载同一链接时写入同一个临时文件
+        :param url_hash: 链接哈希
+        :param primary_link: 主要链接
+        :param meta_path: 元数据文件路径
+        :return: 下载结果（每个调用方得到独立的副本）
+        """
+        with self._downloads_lock:
+            future = self._downloads.get(url_hash)
+            owner = future is None
+            if owner:
+                future = self._downloads[url_hash] = Future()
+        
+        if not owner:
+            self.logger.info(f"相同链接正在下载，等待其完成: {primary_link['url']}")
+            return dict(future.result())
+        
+        try:
+            # 上一次下载可能在检查元数据之后刚刚完成
+            download_result = self._load_download_meta(meta_path)
+            if download_result is None:
+                download_result = self.video_downloader.download_video(
+                    primary_link["url"], 
+                    primary_link["type"]
+                )
+                if download_result.get("success"):
+                    _write_file(str(meta_path), _dump_value(download_result))
+            future.set_result(download_result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._downloads_lock:
+                del self._downloads[url_hash]
+        return dict(download_result)
+    
+    def _load_download_meta(self, meta_path) -> Optional[Dict]:
+        """
+        读取已下载视频的元数据
+        :param meta_path: 元数据文件路径
+        :return: 下载结果，视频文件已不存在或大小不符时返回None
+        """
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = json.loads(f.read())
+            if os.path.getsize(meta["file_path"]) != meta.get("size"):
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+        self.logger.info(f"使用已下载的视频: {meta['file_path']}")
+        return meta
+    
+    def _build_result(self, input_text: str, download_result: Dict, audio_path: str,
+                      transcription_result: Dict, text_result: Dict) -> WorkflowResult:
+        """
+        汇总各步骤结果
+        :param input_text: 输入文本
+        :param download_result: 下载结果（含primary_link）
+        :param audio_path: 音频文件路径
+        :param transcription_result: 转录结果
+        :param text_result: 文本处理结果
+        :return: 完整结果
+        """
+        primary_link = download_result["primary_link"]
+        transcript = transcription_result["transcript"]
+        
+        # 提取带时间戳的转录结果（如果存在）
+        transcript_with_timestamps = transcription_result.get("transcript_with_timestamps")
+        
+        # 调试日志（仅在DEBUG级别时生成）
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("转录结果字段: %s", list(transcription_result.keys()))
+            self.logger.debug("transcript_with_timestamps存在: %s", transcript_with_timestamps is not None)
+            if transcript_with_timestamps:
+                self.logger.debug("transcript_with_timestamps长度: %d", len(transcript_with_timestamps))
+                # 只取第一行（一个时间戳段），不复制后面的内容
+                first_line_end = transcript_with_timestamps.find('\n')
+                self.logger.debug(
+                    "transcript_with_timestamps首行: %s",
+                    transcript_with_timestamps if first_line_end < 0 else transcript_with_timestamps[:first_line_end]
+                )
+        
+        # 即使文本处理失败，也要返回转录结果
+        if text_result.get("success"):
+            formatted_text = text_result["formatted_text"]
+            text_message = "文本格式化完成"
+        else:
+            formatted_text = transcript  # 使用原始转录文本
+            text_message = f"文本格式化失败: {text_result.get('error', '未知错误')}"
+        
+        # 返回完整结果，包含视频信息
+        return WorkflowResult(
+            success=True,
+            input_text=input_text,
+            link_type=primary_link["type"],
+            platform_id=primary_link["platform_id"],
+            video_path=download_result["file_path"],
+            audio_path=audio_path,
+            transcript=transcript,
+            transcript_with_timestamps=transcript_with_timestamps,
+            formatted_text=formatted_text,
+            text_processing_success=text_result.get("success", False),
+            text_processing_error=text_result.get("error") if not text_result.get("success") else None,
+            message=f"视频转录处理完成 - {text_message}",
+            # 添加视频信息
+            title=download_result.get("title", "未知标题"),
+            duration=download_result.get("duration", "未知"),
+            size=download_result.get("size", "未知"),
+            platform=download_result.get("platform", primary_link["type"]),
+            url=primary_link["url"],
+            transcript_file=transcription_result.get("transcript_file")
+        )
+    
+    def process_video_links(self, inputs: List[str]) -> Dict:
+        """
+        批量处理视频链接（同步接口，在后台事件循环中执行）
+        :param inputs: 输入文本列表（每项包含链接）
+        :return: 处理结果，results与inputs顺序一致
+        """
+        return run_sync(self.process_video_links_async(inputs))
+    
+    async def process_video_links_async(self, inputs: List[str]) -> Dict:
+        """
+        以流水线方式批量处理视频链接：下载、音频提取、转录和文本处理各阶段
+        由独立的工作协程消费队列，第K个视频转录时第K+1个视频可同时提取音频
+        :param inputs: 输入文本列表（每项包含链接）
+        :return: 处理结果，results与inputs顺序一致
+        """
+        self.logger.info(f"开始批量处理视频链接，共{len(inputs)}个")
+        
+        results: List[Optional[Dict]] = [None] * len(inputs)
+        
+        # 先在当前线程完成各模块的初始化，避免下载线程池中多个线程同时首次访问
+        self.link_classifier, self.video_downloader
+        
+        with ThreadPoolExecutor(max_workers=self.download_workers) as download_pool:
+            loop = asyncio.get_running_loop()
+            
+            async def download(job: Dict) -> Dict:
+                # 分类和下载为同步阻塞调用，放到I/O线程池中执行
+                return await loop.run_in_executor(download_pool, self._classify_and_download, job["input_text"])
+            
+            async def extract(job: Dict) -> Dict:
+                return await self.audio_processor.extract_audio_from_video_async(job["download"]["file_path"])
+            
+            async def transcribe(job: Dict) -> Dict:
+                job["staged_path"] = self._staging_path()
+                return await self.audio_transcriber.transcribe_audio_async(job["audio"]["audio_path"], job["staged_path"])
+            
+            async def finish(job: Dict) -> Dict:
+                transcript = job["transcription"]["transcript"]
+                text_result = self._preformatted(transcript) or await self.text_processor.process_text_async(transcript, "format")
+                result = self._build_result(
+                    job["input_text"], job["download"], job["audio"]["audio_path"], job["transcription"], text_result
+                )
+                return await asyncio.to_thread(self._save_transcription_result, result)
+            
+            # (阶段处理函数, 结果在job中的键, 并发数)
+            stages = [
+                (download, "download", self.download_workers),
+                (extract, "audio", self.audio_workers),
+                (transcribe, "transcription", self.transcribe_workers),
+                (finish, "result", self.text_workers),
+            ]
+            queues = [asyncio.Queue(maxsize=max(1, workers) * 2) for _, _, workers in stages]
+            
+            async def worker(index: int):
+                handle, key, _ = stages[index]
+                queue_in = queues[index]
+                queue_out = queues[index + 1] if index + 1 < len(queues) else None
+                while True:
+                    job = await queue_in.get()
+                    try:
+                        outcome = await handle(job)
+                    except Exception as e:
+                        self.logger.error(f"工作流处理失败: {e}")
+                        self._discard_staged(job.get("staged_path"))
+                        outcome = {"success": False, "error": str(e), "input_text": job["input_text"]}
+                    
+                    if outcome.get("success") and queue_out is not None:
+                        job[key] = outcome
+                        await queue_out.put(job)
+                    else:
+                        # 失败或最后一个阶段完成时直接记录结果
+                        results[job["position"]] = outcome
+                    queue_in.task_done()
+            
+            workers = [
+                asyncio.create_task(worker(index))
+                for index, (_, _, count) in enumerate(stages)
+                for _ in range(max(1, count))
+            ]
+            try:
+                for position, input_text in enumerate(inputs):
+                    await queues[0].put({"position": position, "input_text": input_text})
+                # 前一阶段的任务都已交给下一阶段后，再等待下一阶段
+                for queue in queues:
+                    await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        
+        succeeded = sum(1 for result in results if result.get("success"))
+        self.logger.info(f"批量处理完成，成功{succeeded}/{len(results)}个")
+        
+        return {
+            "success": succeeded == len(results),
+            "results": results,
+            "total": len(results),
+            "message": f"批量处理完成，成功{succeeded}/{len(results)}个"
+        }
+    
+    def process_video_links_parallel(self, inputs: List[str]) -> Dict:
+        """
+        多进程批量处理视频链接：每个进程独立运行完整流程，适合大量视频的CPU密集场景
+        :param inputs: 输入文本列表（每项包含链接）
+        :return: 处理结果，results与inputs顺序一致
+        """
+        self.logger.info(f"开始多进程批量处理视频链接，共{len(inputs)}个")
+        
+        if not inputs:
+            return {"success": True, "results": [], "total": 0, "message": "没有需要处理的视频链接"}
+        
+        max_workers = max(1, min(len(inputs), self.parallel_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_process_in_worker, input_text) for input_text in inputs]
+            results = []
+            for input_text, future in zip(inputs, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    self.logger.error(f"工作流处理失败: {e}")
+                    results.append({"success": False, "error": str(e), "input_text": input_text})
+        
+        succeeded = sum(1 for result in results if result.get("success"))
+        self.logger.info(f"多进程批量处理完成，成功{succeeded}/{len(results)}个")
+        
+        return {
+            "success": succeeded == len(results),
+            "results": results,
+            "total": len(results),
+            "message": f"批量处理完成，成功{succeeded}/{len(results)}个"
+        }
+    
     def get_workflow_status(self) -> Dict:
         """获取工作流状态"""
         return {
             "success": True,
             "modules": {
-                "link_classifier": "已初始化",
-                "video_downloader": "已初始化",
-                "audio_processor": "已初始化",
-                "audio_transcriber": "已初始化",
-                "text_processor": "已初始化"
+                name: "已初始化" if getattr(self, f"_{name}") is not None else "首次使用时加载"
+                for name in ("link_classifier", "video_downloader", "audio_processor",
+                             "audio_transcriber", "text_processor")
             },
             "message": "所有模块已就绪"
         } 
\ No newline at end of file
@@ -5,26 +5,282 @@
 """
 
 import os
+import gzip
 import json
+import uuid
+import hashlib
+import functools
+import time
 import logging
-from datetime import datetime
-from flask import Flask, request, jsonify
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from flask import Flask, Response, g, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
+from werkzeug.serving import WSGIRequestHandler
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
 from dotenv import load_dotenv
 
-# 导入工作流控制器
-import sys
-import os
-# 添加项目根目录到Python路径
-project_root = os.path.join(os.path.dirname(__file__), '..')
-sys.path.insert(0, project_root)
+# brotli为可选依赖，安装后主页额外提供br压缩版本
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# flask-compress为可选依赖，安装后JSON响应按Accept-Encoding自动压缩
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+# fastjsonschema为可选依赖，安装后请求体用预编译的校验器检查
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
 
+# flask-limiter为可选依赖，安装后按客户端IP限流
 try:
-    from modules.workflow import WorkflowController
-except ImportError as e:
-    print(f"导入WorkflowController失败: {e}")
-    print(f"当前Python路径: {sys.path}")
-    print(f"项目根目录: {project_root}")
-    raise
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+except ImportError:
+    Limiter = None
+
+# prometheus_client为可选依赖，安装后记录各接口耗时并在/metrics提供给Prometheus抓取
+try:
+    from prometheus_client import Histogram, make_wsgi_app
+except ImportError:
+    Histogram = None
+
+# orjson为可选依赖，安装后接口响应改用orjson序列化
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 项目模块（从项目根目录启动：python main.py 或 gunicorn wsgi:app）
+from modules.workflow import get_controller
+from modules.link_classifier import URL_RE, identify_link_type
+from modules._cache import TTLCache
+from modules._logging import LOG_DIR, queue_handler
+
+# 主页静态页面（导入时读取一次，ETag取内容哈希）
+_STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+with open(os.path.join(_STATIC_DIR, 'index.html'), 'rb') as f:
+    _INDEX_BYTES = f.read()
+_INDEX_ETAG = hashlib.blake2b(_INDEX_BYTES, digest_size=16).hexdigest()
+# 主页缓存有效期（秒）
+_INDEX_MAX_AGE = 3600
+
+# 主页预压缩版本（Content-Encoding -> 压缩后内容），按优先顺序排列
+_INDEX_ENCODED = {}
+if brotli is not None:
+    _INDEX_ENCODED['br'] = brotli.compress(_INDEX_BYTES, quality=11)
+_INDEX_ENCODED['gzip'] = gzip.compress(_INDEX_BYTES, compresslevel=9, mtime=0)
+
+# 分享链接中与视频内容无关的跟踪参数
+_TRACKING_PARAMS = frozenset({
+    'spm_id_from', 'vd_source', 'share_source', 'share_medium', 'share_plat',
+    'share_session_id', 'share_tag', 'share_times', 'unique_k', 'bbid', 'si', 'feature'
+})
+
+
+def _normalize_url(url: str) -> str:
+    """
+    规范化链接：协议和主机名小写，去掉锚点和跟踪参数，其余参数排序
+    :param url: 链接
+    :return: 规范化后的链接
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), urlencode(query), ''))
+
+
+@functools.lru_cache(maxsize=4096)
+def canonicalize(video_url: str) -> str:
+    """
+    生成转录结果缓存和合并请求使用的键（结果按输入缓存）
+    识别出平台视频ID时按平台和ID归并，同一视频的不同写法得到同一个键；否则使用规范化后的链接
+    :param video_url: 请求中的视频链接（可以是包含链接的分享文本）
+    :return: 缓存键
+    """
+    match = URL_RE.search(video_url)
+    raw_url = match.group(0) if match else video_url.strip()
+    url = _normalize_url(raw_url)
+    # 平台ID的模式依赖参数顺序（如YouTube的v参数在首位），先按原链接识别
+    link_type, platform_id = identify_link_type(raw_url)
+    if not platform_id:
+        link_type, platform_id = identify_link_type(url)
+    if not platform_id:
+        return url
+    if link_type == 'youtube':
+        # 时间点、播放列表等参数不影响视频内容
+        return f'youtube:{platform_id}'
+    # 其余平台保留剩余参数（如B站分P的p参数）
+    query = urlsplit(url).query
+    return f'{link_type}:{platform_id}?{query}' if query else f'{link_type}:{platform_id}'
+
+# 各接口请求耗时（Prometheus指标注册在进程级，只能创建一次）
+_REQUEST_LATENCY = Histogram(
+    'http_request_seconds', '接口请求耗时（秒）', ['endpoint', 'method', 'status']
+) if Histogram is not None else None
+
+# 健康检查响应的刷新间隔（秒），间隔内复用同一份响应体
+_HEALTH_REFRESH_S = 30
+
+# 请求体大小上限（字节），超出时直接返回413
+_MAX_REQUEST_BYTES = 16 * 1024
+
+# 转录请求体的schema（video_url可以是包含链接的分享文本，不限制格式）
+_TRANSCRIBE_SCHEMA = {
+    'type': 'object',
+    'required': ['video_url'],
+    'properties': {
+        'video_url': {'type': 'string', 'minLength': 1, 'maxLength': 2048},
+        'wait': {'type': 'boolean'}
+    }
+}
+_validate_transcribe = fastjsonschema.compile(_TRANSCRIBE_SCHEMA) if fastjsonschema is not None else None
+
+
+def _check_transcribe_request(data: Any) -> Optional[str]:
+    """
+    校验转录请求体
+    :param data: 解析后的请求JSON（解析失败时为None）
+    :return: 错误说明，校验通过时返回None
+    """
+    if not isinstance(data, dict):
+        return '请求体必须是JSON对象'
+    if 'video_url' not in data:
+        return '缺少video_url参数'
+    if _validate_transcribe is not None:
+        try:
+            _validate_transcribe(data)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return f'请求参数错误: {e.message}'
+        return None
+    
+    video_url = data['video_url']
+    if not isinstance(video_url, str) or not 0 < len(video_url) <= 2048:
+        return '请求参数错误: video_url必须是长度不超过2048的非空字符串'
+    if not isinstance(data.get('wait', False), bool):
+        return '请求参数错误: wait必须是布尔值'
+    return None
+
+
+def _requested_fields(fields_arg: Optional[str]) -> Optional[frozenset]:
+    """
+    解析?fields=参数
+    :param fields_arg: 逗号分隔的output_files字段名（为空或all表示全部）
+    :return: 需要返回的字段集合，None表示全部返回
+    """
+    if not fields_arg:
+        return None
+    fields = frozenset(field.strip() for field in fields_arg.split(',') if field.strip())
+    return None if not fields or 'all' in fields else fields
+
+
+def _select_output_files(payload: Dict, fields: Optional[frozenset]) -> Dict:
+    """
+    按请求的字段筛选output_files，省去客户端不需要的大段文本
+    :param payload: 响应数据
+    :param fields: 需要返回的字段集合，None表示全部返回
+    :return: 筛选后的响应数据（不修改原字典）
+    """
+    output_files = payload.get('output_files')
+    if fields is None or not isinstance(output_files, dict):
+        return payload
+    return {**payload, 'output_files': {key: value for key, value in output_files.items() if key in fields}}
+
+
+def _json_bytes(value: Any) -> bytes:
+    """
+    序列化为UTF-8 JSON字节
+    :param value: 待序列化的值
+    :return: JSON字节
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _iter_response_json(payload: Dict) -> Iterator[bytes]:
+    """
+    逐段生成响应JSON：output_files中的各个文本逐个序列化后输出，不在内存中拼出整个响应体
+    :param payload: 响应数据
+    :return: JSON片段（按顺序拼接即为完整文档）
+    """
+    output_files = payload.get('output_files')
+    if not isinstance(output_files, dict):
+        yield _json_bytes(payload)
+        return
+    
+    head = _json_bytes({key: value for key, value in payload.items() if key != 'output_files'})
+    yield head[:-1] + (b',' if head != b'{}' else b'') + b'"output_files":{'
+    separator = b''
+    for key, value in output_files.items():
+        yield separator + _json_bytes(key) + b':' + _json_bytes(value)
+        separator = b','
+    yield b'}}'
+
+
+@functools.lru_cache(maxsize=128)
+def _error_body(error: str) -> bytes:
+    """
+    序列化只含错误说明的响应体（参数错误等固定消息按消息缓存）
+    :param error: 错误说明
+    :return: JSON字节
+    """
+    return _json_bytes({'success': False, 'error': error})
+
+
+def _error_response(error: str, status_code: int, **fields) -> Response:
+    """
+    构建错误响应
+    :param error: 错误说明
+    :param status_code: HTTP状态码
+    :param fields: 附加字段（有附加字段时每次单独序列化）
+    :return: 响应对象
+    """
+    body = _json_bytes({'success': False, 'error': error, **fields}) if fields else _error_body(error)
+    return Response(body, status=status_code, mimetype='application/json')
+
+
+def _stream_json(payload: Dict, status_code: int = 200) -> Response:
+    """
+    以流式响应返回转录结果，序列化和发送交替进行
+    :param payload: 响应数据
+    :param status_code: HTTP状态码
+    :return: 响应对象
+    """
+    return Response(_iter_response_json(payload), status=status_code, mimetype='application/json')
+
+class _BufferedRequestHandler(WSGIRequestHandler):
+    """开发服务器的请求处理器：加大套接字读取缓冲，较大的请求体用更少的recv读完"""
+    
+    rbufsize = 256 * 1024
+
+class OrjsonProvider(DefaultJSONProvider):
+    """使用orjson序列化响应的JSON提供器（直接输出UTF-8字节，解析仍使用默认实现）"""
+    
+    _OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_to_bytes(obj).decode('utf-8')
+    
+    def dumps_to_bytes(self, obj) -> bytes:
+        """序列化为字节（无法处理的类型交给默认实现的default转换）"""
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS)
+    
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_to_bytes(obj), mimetype=self.mimetype)
 
 class VideoTranscriptionAPI:
     """视频转录API服务器"""
@@ -35,659 +291,149 @@ class VideoTranscriptionAPI:
         config_path = os.path.join(os.path.dirname(__file__), '..', 'config.env')
         load_dotenv(config_path)
         
-        # 设置日志
-        log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - API_SERVER - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(log_dir, 'api_server.log'), encoding='utf-8'),
+        # 设置日志（根记录器未配置时），文件和控制台输出经队列由后台线程写出，请求线程不等待磁盘IO
+        root_logger = logging.getLogger()
+        if not root_logger.handlers:
+            formatter = logging.Formatter('%(asctime)s - API_SERVER - %(levelname)s - %(message)s')
+            for handler in (
+                logging.FileHandler(LOG_DIR / 'api_server.log', encoding='utf-8'),
                 logging.StreamHandler()
-            ]
-        )
+            ):
+                handler.setFormatter(formatter)
+                root_logger.addHandler(queue_handler(handler))
+            root_logger.setLevel(logging.INFO)
         
         self.logger = logging.getLogger('VideoTranscriptionAPI')
         
         # 初始化Flask应用
         self.app = Flask(__name__)
-        self.setup_routes()
-        
-        # 初始化工作流控制器
-        self.workflow_controller = WorkflowController()
-        
-        self.logger.info("API服务器已初始化")
-    
-    def setup_routes(self):
-        """设置API路由"""
+        self.app.config['MAX_CONTENT_LENGTH'] = _MAX_REQUEST_BYTES
+        if orjson is not None:
+            self.app.json = OrjsonProvider(self.app)
+        if Compress is not None:
+            # 主页已预压缩，这里只处理接口返回的JSON（转录文本重复度高，压缩效果明显）
+            self.app.config.update(
+                COMPRESS_MIMETYPES=['application/json'],
+                COMPRESS_MIN_SIZE=500,
+                COMPRESS_LEVEL=6
+            )
+            Compress(self.app)
         
-        @self.app.route('/', methods=['GET'])
-        def index():
-            """主页 - 包含转录功能和API文档"""
-            return '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>视频转录系统</title>
-    <meta charset="utf-8">
-    <style>
-        body { 
-            font-family: Arial, sans-serif; 
-            margin: 40px; 
-            background-color: #f5f5f5; 
-        }
-        .container { 
-            max-width: 1200px; 
-            margin: 0 auto; 
-            background: white; 
-            padding: 30px; 
-            border-radius: 10px; 
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1); 
-        }
-        h1, h2, h3 { color: #333; }
-        h1 { text-align: center; }
-        .transcription-section { 
-            margin: 30px 0; 
-            padding: 20px; 
-            border: 1px solid #ddd; 
-            border-radius: 8px; 
-            background-color: #f0f8ff; 
-        }
-        .form-group { margin: 20px 0; }
-        label { 
-            display: block; 
-            margin-bottom: 5px; 
-            font-weight: bold; 
-        }
-        input[type="text"], textarea { 
-            width: 100%; 
-            padding: 10px; 
-            border: 1px solid #ddd; 
-            border-radius: 5px; 
-            font-size: 16px; 
-        }
-        button { 
-            background-color: #007bff; 
-            color: white; 
-            padding: 12px 24px; 
-            border: none; 
-            border-radius: 5px; 
-            cursor: pointer; 
-            font-size: 16px; 
-            margin: 5px; 
-        }
-        button:hover { background-color: #0056b3; }
-        .download-btn { background-color: #28a745; }
-        .download-btn:hover { background-color: #218838; }
-        .result { 
-            margin-top: 20px; 
-            padding: 15px; 
-            background-color: #f8f9fa; 
-            border-radius: 5px; 
-        }
-        .api-section { 
-            margin: 30px 0; 
-            padding: 20px; 
-            border: 1px solid #ddd; 
-            border-radius: 8px; 
-            background-color: #f9f9f9; 
-        }
-        .endpoint { 
-            font-family: monospace; 
-            background-color: #e3f2fd; 
-            padding: 8px 12px; 
-            border-radius: 5px; 
-            font-weight: bold; 
-            color: #1976d2; 
-        }
-        .method { 
-            display: inline-block; 
-            padding: 4px 8px; 
-            border-radius: 4px; 
-            font-size: 12px; 
-            font-weight: bold; 
-            color: white; 
-            margin-right: 10px; 
-        }
-        .method.get { background-color: #4caf50; }
-        .method.post { background-color: #2196f3; }
-        .param-table { 
-            width: 100%; 
-            border-collapse: collapse; 
-            margin: 15px 0; 
-        }
-        .param-table th, .param-table td { 
-            border: 1px solid #ddd; 
-            padding: 10px; 
-            text-align: left; 
-        }
-        .param-table th { 
-            background-color: #f2f2f2; 
-            font-weight: bold; 
-        }
-        .response-example { 
-            background-color: #f8f9fa; 
-            padding: 15px; 
-            border-radius: 5px; 
-            font-family: monospace; 
-            white-space: pre-wrap; 
-            border-left: 4px solid #007bff; 
-        }
-        .test-section { 
-            background-color: #e8f5e8; 
-            padding: 20px; 
-            border-radius: 8px; 
-            margin: 20px 0; 
-        }
-        .test-form { margin: 15px 0; }
-        .test-input { 
-            width: 100%; 
-            padding: 10px; 
-            border: 1px solid #ddd; 
-            border-radius: 5px; 
-            font-size: 14px; 
-            margin-bottom: 10px; 
-        }
-        .test-button { 
-            background-color: #007bff; 
-            color: white; 
-            padding: 10px 20px; 
-            border: none; 
-            border-radius: 5px; 
-            cursor: pointer; 
-            font-size: 14px; 
-        }
-        .test-button:hover { background-color: #0056b3; }
-        .status { 
-            padding: 5px 10px; 
-            border-radius: 3px; 
-            font-size: 14px; 
-            font-weight: bold; 
-            margin-bottom: 10px; 
-        }
-        .status.success { background-color: #d4edda; color: #155724; }
-        .status.error { background-color: #f8d7da; color: #721c24; }
-        .transcript-section { 
-            margin: 15px 0; 
-            padding: 15px; 
-            border: 1px solid #dee2e6; 
-            border-radius: 5px; 
-            background-color: #fff; 
-        }
-        .transcript-title { 
-            font-weight: bold; 
-            color: #495057; 
-            margin-bottom: 10px; 
-        }
-        .transcript-content { 
-            background-color: #f8f9fa; 
-            padding: 10px; 
-            border-radius: 3px; 
-            font-family: monospace; 
-            white-space: pre-wrap; 
-            max-height: 300px; 
-            overflow-y: auto; 
-        }
-        .download-section { 
-            margin: 15px 0; 
-            padding: 15px; 
-            background-color: #e7f3ff; 
-            border-radius: 5px; 
-        }
-        .file-info { 
-            background-color: #e7f3ff; 
-            padding: 10px; 
-            border-radius: 5px; 
-            margin: 10px 0; 
-        }
-        .nav-tabs { 
-            display: flex; 
-            border-bottom: 1px solid #ddd; 
-            margin-bottom: 20px; 
-        }
-        .nav-tab { 
-            padding: 10px 20px; 
-            cursor: pointer; 
-            border: 1px solid transparent; 
-            border-bottom: none; 
-            background-color: #f8f9fa; 
-        }
-        .nav-tab.active { 
-            background-color: white; 
-            border-color: #ddd; 
-            border-bottom-color: white; 
-            margin-bottom: -1px; 
-        }
-        .tab-content { display: none; }
-        .tab-content.active { display: block; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🚀 视频转录系统</h1>
+        # 按客户端IP限流，超出时在进入工作流之前直接返回429（多进程部署时存储改为redis://）
+        self.limiter = Limiter(
+            get_remote_address,
+            app=self.app,
+            default_limits=[os.getenv('API_RATE_LIMIT', '60/minute')],
+            storage_uri=os.getenv('API_RATE_LIMIT_STORAGE', 'memory://')
+        ) if Limiter is not None else None
+        self.setup_routes()
         
-        <!-- 导航标签 -->
-        <div class="nav-tabs">
-            <div class="nav-tab active" onclick="showTab('transcription', this)">🎬 转录功能</div>
-            <div class="nav-tab" onclick="showTab('api-docs', this)">📚 API文档</div>
-            <div class="nav-tab" onclick="showTab('testing', this)">🧪 接口测试</div>
-        </div>
+        if _REQUEST_LATENCY is not None:
+            self.app.wsgi_app = DispatcherMiddleware(self.app.wsgi_app, {'/metrics': make_wsgi_app()})
         
-        <!-- 转录功能标签页 -->
-        <div id="transcription" class="tab-content active">
-            <div class="transcription-section">
-                <h2>🎬 视频转录</h2>
-                <p>输入视频链接，系统将自动下载、转录并处理视频内容。</p>
-                
-                <div class="form-group">
-                    <label for="videoUrl">视频链接:</label>
-                    <input type="text" id="videoUrl" placeholder="请输入B站、YouTube等视频链接" value="https://www.bilibili.com/video/BV1Dt4y1o7bU">
-                </div>
-                
-                <div class="form-group">
-                    <button onclick="transcribeVideo()">开始转录</button>
-                </div>
-                
-                <div id="transcriptionResult" class="result" style="display: none;"></div>
-            </div>
-        </div>
+        # 工作流控制器为进程内单例，已加载的模块和OpenAI连接池在多个API实例间共用
+        self.workflow_controller = get_controller()
         
-        <!-- API文档标签页 -->
-        <div id="api-docs" class="tab-content">
-            <div class="api-section">
-                <h2>📋 API接口概览</h2>
-                <p>本系统提供以下API接口，支持B站、YouTube、Vimeo等平台的视频转录处理。</p>
-                
-                <table class="param-table">
-                    <tr>
-                        <th>接口</th>
-                        <th>方法</th>
-                        <th>描述</th>
-                        <th>状态</th>
-                    </tr>
-                    <tr>
-                        <td>/api/health</td>
-                        <td><span class="method get">GET</span></td>
-                        <td>健康检查接口</td>
-                        <td>✅ 可用</td>
-                    </tr>
-                    <tr>
-                        <td>/api/transcribe</td>
-                        <td><span class="method post">POST</span></td>
-                        <td>视频转录接口</td>
-                        <td>✅ 可用</td>
-                    </tr>
-                </table>
-            </div>
-            
-            <div class="api-section">
-                <h2>🏥 健康检查接口</h2>
-                <p><span class="endpoint">GET /api/health</span></p>
-                <p>检查系统各个模块的运行状态和API配置情况。</p>
-                
-                <h4>响应示例：</h4>
-                <div class="response-example">{
-  "status": "healthy",
-  "timestamp": "2024-01-01T12:00:00",
-  "version": "2.0.0",
-  "modules": {
-    "link_classifier": "ok",
-    "bilibili_parser": "ok",
-    "video_downloader": "ok",
-    "audio_processor": "ok",
-    "audio_transcriber": "ok",
-    "text_processor": "ok"
-  },
-  "api_status": {
-    "whisper_api": "configured",
-    "gpt_api": "configured"
-  }
-}</div>
-            </div>
-            
-            <div class="api-section">
-                <h2>🎬 视频转录接口</h2>
-                <p><span class="endpoint">POST /api/transcribe</span></p>
-                <p>传入视频链接，返回处理时间、平台信息、视频信息和四个处理后的文件。</p>
-                
-                <h4>请求参数：</h4>
-                <table class="param-table">
-                    <tr>
-                        <th>参数名</th>
-                        <th>类型</th>
-                        <th>必填</th>
-                        <th>描述</th>
-                    </tr>
-                    <tr>
-                        <td>video_url</td>
-                        <td>string</td>
-                        <td>是</td>
-                        <td>视频链接（支持B站、YouTube、Vimeo等）</td>
-                    </tr>
-                </table>
-                
-                <h4>响应字段：</h4>
-                <table class="param-table">
-                    <tr>
-                        <th>字段名</th>
-                        <th>类型</th>
-                        <th>描述</th>
-                    </tr>
-                    <tr>
-                        <td>success</td>
-                        <td>boolean</td>
-                        <td>处理是否成功</td>
-                    </tr>
-                    <tr>
-                        <td>processing_time</td>
-                        <td>string</td>
-                        <td>处理完成时间</td>
-                    </tr>
-                    <tr>
-                        <td>platform_info</td>
-                        <td>object</td>
-                        <td>平台信息（类型、ID等）</td>
-                    </tr>
-                    <tr>
-                        <td>video_info</td>
-                        <td>object</td>
-                        <td>视频信息（标题、时长、大小等）</td>
-                    </tr>
-                    <tr>
-                        <td>output_files</td>
-                        <td>object</td>
-                        <td>四个输出文件的信息</td>
-                    </tr>
-                </table>
-                
-                <h4>响应示例：</h4>
-                <div class="response-example">{
-  "success": true,
-  "processing_time": "2024-01-01T12:05:30",
-  "platform_info": {
-    "type": "bilibili",
-    "platform_id": "BV1Dt4y1o7bU"
-  },
-  "video_info": {
-    "title": "视频标题",
-    "duration": "00:05:30",
-    "size": "50.2 MB"
-  },
-  "output_files": {
-    "transcript": "转录文本内容...",
-    "transcript_with_timestamps": "带时间戳的转录文本...",
-    "formatted_text": "格式化后的文本...",
-    "result_json": "完整的处理结果JSON..."
-  }
-}</div>
-            </div>
-            
-            <div class="api-section">
-                <h2>📚 使用说明</h2>
-                <h3>支持的平台：</h3>
-                <ul>
-                    <li><strong>B站 (bilibili.com)</strong> - 支持视频、番剧、课程等</li>
-                    <li><strong>YouTube</strong> - 支持各种视频格式</li>
-                    <li><strong>Vimeo</strong> - 支持高清视频</li>
-                    <li><strong>抖音/快手</strong> - 支持短视频</li>
-                    <li><strong>直链视频</strong> - 支持MP4、AVI等格式</li>
-                </ul>
-                
-                <h3>处理流程：</h3>
-                <ol>
-                    <li>链接分类识别</li>
-                    <li>视频下载</li>
-                    <li>音频提取</li>
-                    <li>语音转录</li>
-                    <li>文本处理</li>
-                    <li>结果输出</li>
-                </ol>
-                
-                <h3>输出文件：</h3>
-                <ul>
-                    <li><strong>原始转录文本</strong> - 纯文本格式</li>
-                    <li><strong>带时间戳转录</strong> - 包含时间信息的文本</li>
-                    <li><strong>格式化文本</strong> - Markdown格式的整理后文本</li>
-                    <li><strong>完整结果JSON</strong> - 包含所有处理信息的JSON文件</li>
-                </ul>
-            </div>
-        </div>
+        # 转录成功的响应按规范化链接缓存，相同视频再次请求时直接返回（0为关闭）
+        cache_ttl = int(os.getenv('API_RESULT_CACHE_TTL_S', '86400'))
+        self.result_cache = TTLCache(maxsize=512, ttl=cache_ttl) if cache_ttl > 0 else None
         
-        <!-- 接口测试标签页 -->
-        <div id="testing" class="tab-content">
-            <div class="test-section">
-                <h3>健康检查测试</h3>
-                <button class="test-button" onclick="testHealth()">测试健康检查</button>
-                <div id="healthResult" class="result" style="display: none;"></div>
-            </div>
-            
-            <div class="test-section">
-                <h3>转录功能测试</h3>
-                <div class="test-form">
-                    <input type="text" id="testVideoUrl" class="test-input" placeholder="请输入视频链接" value="https://www.bilibili.com/video/BV1Dt4y1o7bU">
-                    <button class="test-button" onclick="testTranscribe()">测试转录</button>
-                </div>
-                <div id="transcribeResult" class="result" style="display: none;"></div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        // 简化的测试版本
-        console.log('JavaScript代码已加载 - 测试版本');
+        # 后台转录线程池，以及任务ID -> Future（完成的任务保留一段时间供查询）
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('API_JOB_WORKERS', '4')), thread_name_prefix='transcribe'
+        )
+        self.jobs = TTLCache(maxsize=1024, ttl=int(os.getenv('API_JOB_TTL_S', '21600')))
+        # 正在处理的缓存键 -> Future，相同视频的并发请求共用同一个任务
+        self.inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
         
-        // 标签页切换功能
-        function showTab(tabName, element) {
-            console.log('切换到标签页:', tabName);
-            
-            // 隐藏所有标签页内容
-            var tabContents = document.querySelectorAll('.tab-content');
-            for (var i = 0; i < tabContents.length; i++) {
-                tabContents[i].classList.remove('active');
-            }
-            
-            // 移除所有标签页的active状态
-            var navTabs = document.querySelectorAll('.nav-tab');
-            for (var i = 0; i < navTabs.length; i++) {
-                navTabs[i].classList.remove('active');
-            }
-            
-            // 显示选中的标签页内容
-            var targetTab = document.getElementById(tabName);
-            if (targetTab) {
-                targetTab.classList.add('active');
-                console.log('显示标签页内容:', tabName);
-            } else {
-                console.error('未找到标签页内容:', tabName);
-            }
-            
-            // 设置选中标签页的active状态
-            if (element) {
-                element.classList.add('active');
+        # 健康检查的静态部分（API配置在进程运行期间不变，初始化时检查一次）
+        api_state = 'configured' if os.getenv('OPENAI_API_KEY') and os.getenv('OPENAI_BASE_URL') else 'not_configured'
+        self._health_template = {
+            'status': 'healthy',
+            'version': '2.0.0',
+            'modules': {
+                'link_classifier': 'ok',
+                'bilibili_parser': 'ok',
+                'video_downloader': 'ok',
+                'audio_processor': 'ok',
+                'audio_transcriber': 'ok',
+                'text_processor': 'ok'
+            },
+            'api_status': {
+                'whisper_api': api_state,
+                'gpt_api': api_state
             }
         }
+        # (刷新时刻, Last-Modified, 响应体)，整体替换保证并发读取一致
+        self._health_cache = (float('-inf'), None, b'')
         
-        // 转录功能
-        function transcribeVideo() {
-            console.log('开始转录视频...');
-            
-            var url = document.getElementById('videoUrl').value;
-            if (!url) {
-                alert('请输入视频链接');
-                return;
-            }
-            
-            console.log('视频链接:', url);
-            
-            var resultDiv = document.getElementById('transcriptionResult');
-            resultDiv.style.display = 'block';
-            resultDiv.innerHTML = '<div class="status success">正在处理中，请稍候...</div>';
-            
-            // 使用XMLHttpRequest而不是fetch
-            var xhr = new XMLHttpRequest();
-            xhr.open('POST', '/api/transcribe', true);
-            xhr.setRequestHeader('Content-Type', 'application/json');
-            
-            xhr.onreadystatechange = function() {
-                if (xhr.readyState === 4) {
-                    console.log('API响应状态:', xhr.status);
-                    if (xhr.status === 200) {
-                        try {
-                            var data = JSON.parse(xhr.responseText);
-                            console.log('API响应数据:', data);
-                            
-                            if (data.success) {
-                                var resultHtml = '<div class="status success">✅ 转录完成</div>';
-                                
-                                // 显示处理信息
-                                resultHtml += '<div class="file-info">';
-                                resultHtml += '<strong>处理时间:</strong> ' + data.processing_time + '<br>';
-                                resultHtml += '<strong>平台:</strong> ' + data.platform_info.type + '<br>';
-                                resultHtml += '<strong>视频ID:</strong> ' + data.platform_info.platform_id + '<br>';
-                                if (data.video_info) {
-                                    resultHtml += '<strong>标题:</strong> ' + (data.video_info.title || '未知') + '<br>';
-                                    resultHtml += '<strong>时长:</strong> ' + (data.video_info.duration || '未知') + '<br>';
-                                    resultHtml += '<strong>大小:</strong> ' + (data.video_info.size || '未知');
-                                }
-                                resultHtml += '</div>';
-                                
-                                // 显示转录结果
-                                if (data.output_files.transcript) {
-                                    resultHtml += '<div class="transcript-section">';
-                                    resultHtml += '<div class="transcript-title">📝 原始转录文本</div>';
-                                    resultHtml += '<div class="transcript-content">' + data.output_files.transcript + '</div>';
-                                    resultHtml += '</div>';
-                                }
-                                
-                                if (data.output_files.transcript_with_timestamps) {
-                                    resultHtml += '<div class="transcript-section">';
-                                    resultHtml += '<div class="transcript-title">⏰ 带时间戳转录文本</div>';
-                                    resultHtml += '<div class="transcript-content">' + data.output_files.transcript_with_timestamps + '</div>';
-                                    resultHtml += '</div>';
-                                }
-                                
-                                if (data.output_files.formatted_text) {
-                                    resultHtml += '<div class="transcript-section">';
-                                    resultHtml += '<div class="transcript-title">✨ 格式化文本</div>';
-                                    resultHtml += '<div class="transcript-content">' + data.output_files.formatted_text + '</div>';
-                                    resultHtml += '</div>';
-                                }
-                                
-                                resultDiv.innerHTML = resultHtml;
-                            } else {
-                                resultDiv.innerHTML = '<div class="status error">❌ 转录失败: ' + (data.error || '未知错误') + '</div>';
-                            }
-                        } catch (e) {
-                            console.error('解析响应失败:', e);
-                            resultDiv.innerHTML = '<div class="status error">❌ 响应解析失败</div>';
-                        }
-                    } else {
-                        resultDiv.innerHTML = '<div class="status error">❌ 请求失败: HTTP ' + xhr.status;
-                    }
-                }
-            };
-            
-            xhr.onerror = function() {
-                console.error('请求失败');
-                resultDiv.innerHTML = '<div class="status error">❌ 网络请求失败</div>';
-            };
-            
-            var requestData = JSON.stringify({
-                video_url: url
-            });
-            
-            console.log('发送请求数据:', requestData);
-            xhr.send(requestData);
-        }
+        self.logger.info("API服务器已初始化")
+    
+    def setup_routes(self):
+        """设置API路由"""
+        # 未安装flask-limiter时限流装饰器不做任何处理
+        if self.limiter is not None:
+            limit, exempt = self.limiter.limit, self.limiter.exempt
+        else:
+            limit, exempt = (lambda *args, **kwargs: lambda f: f), (lambda f: f)
         
-        // 健康检查测试
-        function testHealth() {
-            console.log('测试健康检查...');
-            var resultDiv = document.getElementById('healthResult');
-            resultDiv.style.display = 'block';
-            resultDiv.innerHTML = '<div class="status success">测试中...</div>';
-            
-            var xhr = new XMLHttpRequest();
-            xhr.open('GET', '/api/health', true);
-            
-            xhr.onreadystatechange = function() {
-                if (xhr.readyState === 4 && xhr.status === 200) {
-                    try {
-                        var data = JSON.parse(xhr.responseText);
-                        var resultHtml = '<div class="status success">✅ 健康检查成功</div>';
-                        resultHtml += '<div class="response-example">' + JSON.stringify(data, null, 2) + '</div>';
-                        resultDiv.innerHTML = resultHtml;
-                    } catch (e) {
-                        resultDiv.innerHTML = '<div class="status error">❌ 响应解析失败</div>';
-                    }
-                }
-            };
+        if _REQUEST_LATENCY is not None:
+            @self.app.before_request
+            def start_timer():
+                """记录请求开始时间"""
+                g.request_start = time.perf_counter()
             
-            xhr.send();
-        }
+            @self.app.after_request
+            def record_latency(response):
+                """按接口记录请求耗时（流式响应记录到开始发送为止）"""
+                start = g.get('request_start')
+                if start is not None:
+                    _REQUEST_LATENCY.labels(
+                        request.endpoint or 'unknown', request.method, response.status_code
+                    ).observe(time.perf_counter() - start)
+                return response
         
-        // 页面加载完成后初始化
-        document.addEventListener('DOMContentLoaded', function() {
-            console.log('页面加载完成，初始化标签页');
-            
-            // 测试DOM元素是否存在
-            var transcriptionTab = document.getElementById('transcription');
-            var apiDocsTab = document.getElementById('api-docs');
-            var testingTab = document.getElementById('testing');
-            
-            console.log('标签页元素检查:');
-            console.log('- transcription:', transcriptionTab);
-            console.log('- api-docs:', apiDocsTab);
-            console.log('- testing:', testingTab);
-            
-            // 默认显示第一个标签页
-            showTab('transcription', document.querySelector('.nav-tab.active'));
-            
-            console.log('初始化完成');
-        });
-    </script>
-</body>
-</html>
-            '''
+        @self.app.route('/', methods=['GET'])
+        @exempt
+        def index():
+            """主页 - 包含转录功能和API文档"""
+            # 内容不变时浏览器带If-None-Match请求，直接返回304
+            if _INDEX_ETAG in request.if_none_match:
+                response = Response(status=304)
+            else:
+                # 按Accept-Encoding选择预压缩版本，不支持压缩时返回原文
+                encoding = request.accept_encodings.best_match(_INDEX_ENCODED)
+                if encoding:
+                    response = Response(_INDEX_ENCODED[encoding], mimetype='text/html')
+                    response.content_encoding = encoding
+                else:
+                    response = Response(_INDEX_BYTES, mimetype='text/html')
+            response.vary.add('Accept-Encoding')
+            response.set_etag(_INDEX_ETAG)
+            response.cache_control.public = True
+            response.cache_control.max_age = _INDEX_MAX_AGE
+            return response
         
         @self.app.route('/api/health', methods=['GET'])
+        @exempt
         def health_check():
             """健康检查接口"""
             try:
-                # 检查各个模块状态
-                status = {
-                    'status': 'healthy',
-                    'timestamp': datetime.now().isoformat(),
-                    'version': '2.0.0',
-                    'modules': {
-                        'link_classifier': 'ok',
-                        'bilibili_parser': 'ok',
-                        'video_downloader': 'ok',
-                        'audio_processor': 'ok',
-                        'audio_transcriber': 'ok',
-                        'text_processor': 'ok'
-                    },
-                    'api_status': {
-                        'whisper_api': 'unknown',
-                        'gpt_api': 'unknown'
-                    }
-                }
-                
-                # 检查OpenAI API状态
-                try:
-                    # 简单的API连接测试
-                    if os.getenv('OPENAI_API_KEY') and os.getenv('OPENAI_BASE_URL'):
-                        status['api_status']['whisper_api'] = 'configured'
-                        status['api_status']['gpt_api'] = 'configured'
-                    else:
-                        status['api_status']['whisper_api'] = 'not_configured'
-                        status['api_status']['gpt_api'] = 'not_configured'
-                except Exception as e:
-                    status['api_status']['whisper_api'] = f'error: {str(e)}'
-                    status['api_status']['gpt_api'] = f'error: {str(e)}'
+                # 静态字段在初始化时已生成，刷新间隔内直接复用上次序列化的响应体
+                refreshed_at, last_modified, body = self._health_cache
+                if time.monotonic() - refreshed_at >= _HEALTH_REFRESH_S:
+                    body = _json_bytes({**self._health_template, 'timestamp': datetime.now().isoformat()})
+                    last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+                    self._health_cache = (time.monotonic(), last_modified, body)
                 
-                return jsonify(status)
+                if request.if_modified_since and request.if_modified_since >= last_modified:
+                    response = Response(status=304)
+                else:
+                    response = Response(body, mimetype='application/json')
+                response.last_modified = last_modified
+                response.cache_control.no_cache = True
+                return response
             except Exception as e:
                 return jsonify({
                     'status': 'unhealthy',
@@ -696,100 +442,217 @@ class VideoTranscriptionAPI:
                 }), 500
         
         @self.app.route('/api/transcribe', methods=['POST'])
+        @limit(os.getenv('API_TRANSCRIBE_RATE_LIMIT', '5/minute;1/second'))
         def transcribe_video():
-            """转录视频接口 - 接收链接参数"""
+            """转录视频接口 - 接收链接参数，提交后台任务并返回任务ID（wait为true时等待处理完成）"""
             try:
-                data = request.get_json()
-                if not data or 'video_url' not in data:
-                    return jsonify({
-                        'success': False,
-                        'error': '缺少video_url参数'
-                    }), 400
+                data = request.get_json(silent=True, cache=False)
+                error_msg = _check_transcribe_request(data)
+                if error_msg:
+                    return _error_response(error_msg, 400)
                 
                 video_url = data['video_url']
+                fields = _requested_fields(request.args.get('fields'))
                 self.logger.info(f"收到转录请求: {video_url}")
                 
-                # 记录开始时间
-                start_time = datetime.now()
+                cache_key = canonicalize(video_url)
+                if self.result_cache is not None:
+                    cached = self.result_cache.get(cache_key)
+                    if cached is not None:
+                        self.logger.info(f"命中转录结果缓存: {cache_key}")
+                        response = _stream_json(_select_output_files(cached, fields))
+                        response.headers['X-Cache'] = 'HIT'
+                        return response
                 
-                # 调用工作流控制器
-                result = self.workflow_controller.process_video_link(video_url)
+                # 转录耗时较长，放到后台线程池执行，请求线程不必一直占用
+                job_id = uuid.uuid4().hex
+                future = self._submit_transcription(video_url, cache_key)
+                self.jobs.set(job_id, future)
                 
-                # 记录结束时间
-                end_time = datetime.now()
-                processing_time = end_time.isoformat()
+                if data.get('wait'):
+                    response_data, status_code = future.result()
+                    response = _stream_json(_select_output_files(response_data, fields), status_code)
+                    response.headers['X-Cache'] = 'MISS'
+                    return response
                 
-                if result.get('success'):
-                    # 构建响应数据
-                    response_data = {
-                        'success': True,
-                        'processing_time': processing_time,
-                        'platform_info': {
-                            'type': result.get('link_type'),
-                            'platform_id': result.get('platform_id')
-                        },
-                        'video_info': {
-                            'title': result.get('title', '未知标题'),
-                            'duration': result.get('duration', '未知'),
-                            'size': result.get('size', '未知'),
-                            'url': video_url
-                        },
-                        'output_files': {
-                            'transcript': result.get('transcript', ''),
-                            'transcript_with_timestamps': result.get('transcript_with_timestamps', ''),
-                            'formatted_text': result.get('formatted_text', ''),
-                            'result_json': {
-                                'input_url': video_url,
-                                'platform_type': result.get('link_type'),
-                                'platform_id': result.get('platform_id'),
-                                'processing_time': processing_time,
-                                'text_processing_success': result.get('text_processing_success'),
-                                'text_processing_error': result.get('text_processing_error'),
-                                'message': result.get('message')
-                            }
-                        }
-                    }
-                    
-                    # 记录成功信息
-                    self.logger.info(f"转录成功: {result.get('message')}")
-                    if result.get('transcript'):
-                        self.logger.info(f"转录文本长度: {len(result.get('transcript'))} 字符")
-                    if result.get('formatted_text'):
-                        self.logger.info(f"格式化文本长度: {len(result.get('formatted_text'))} 字符")
-                    
-                    return jsonify(response_data)
-                else:
-                    # 记录错误信息
-                    error_msg = result.get('error', '未知错误')
-                    self.logger.error(f"转录失败: {error_msg}")
-                    
-                    return jsonify({
-                        'success': False,
-                        'error': error_msg,
-                        'video_url': video_url,
-                        'processing_time': processing_time
-                    }), 400
-                    
+                status_url = f'/api/status/{job_id}'
+                self.logger.info(f"已提交转录任务: {job_id}")
+                return jsonify({
+                    'success': True,
+                    'job_id': job_id,
+                    'status': 'pending',
+                    'status_url': status_url
+                }), 202, {'Location': status_url}
+            
+            except HTTPException:
+                # 请求体过大等由Flask按状态码处理
+                raise
             except Exception as e:
                 error_msg = f"转录处理异常: {str(e)}"
                 self.logger.error(error_msg)
-                return jsonify({
-                    'success': False,
-                    'error': error_msg,
-                    'processing_time': datetime.now().isoformat()
-                }), 500
+                return _error_response(error_msg, 500, processing_time=datetime.now().isoformat())
+        
+        @self.app.errorhandler(413)
+        def request_too_large(e):
+            """请求体超出大小限制"""
+            return _error_response(f'请求体过大（上限{_MAX_REQUEST_BYTES}字节）', 413)
+        
+        @self.app.errorhandler(429)
+        def too_many_requests(e):
+            """超出限流额度"""
+            return _error_response(f'请求过于频繁，请稍后重试（{e.description}）', 429)
         
         @self.app.route('/api/status/<job_id>', methods=['GET'])
         def get_job_status(job_id):
-            """获取任务状态接口"""
-            return jsonify({
-                'success': True,
-                'job_id': job_id,
-                'status': 'completed',
-                'message': '任务状态查询功能待实现'
-            })
+            """获取任务状态接口 - 任务完成后返回与同步转录相同的结果"""
+            future = self.jobs.get(job_id)
+            if future is None:
+                return _error_response('任务不存在或已过期', 404, job_id=job_id)
+            
+            fields = _requested_fields(request.args.get('fields'))
+            if future.done():
+                response_data, status_code = future.result()
+                state = 'completed' if response_data.get('success') else 'failed'
+            else:
+                response_data, status_code = None, 200
+                state = 'running' if future.running() else 'pending'
+            
+            # 任务状态不变时响应内容不变，轮询的客户端带If-None-Match时直接返回304
+            etag = None
+            if status_code == 200:
+                etag = f'{job_id}-{state}'
+                if fields is not None:
+                    etag += '-' + hashlib.blake2b(','.join(sorted(fields)).encode('utf-8'), digest_size=4).hexdigest()
+                if etag in request.if_none_match:
+                    response = Response(status=304)
+                    response.set_etag(etag)
+                    response.cache_control.no_cache = True
+                    return response
+            
+            if response_data is None:
+                response = jsonify({
+                    'success': True,
+                    'job_id': job_id,
+                    'status': state
+                })
+            else:
+                response = _stream_json({
+                    **_select_output_files(response_data, fields),
+                    'job_id': job_id,
+                    'status': state
+                }, status_code)
+            if etag is not None:
+                response.set_etag(etag)
+                response.cache_control.no_cache = True
+            return response
+    
+    def _submit_transcription(self, video_url: str, cache_key: str) -> Future:
+        """
+        提交转录任务；相同视频已在处理中时直接返回该任务，不重复下载和转录
+        :param video_url: 视频链接
+        :param cache_key: 结果缓存键
+        :return: 任务Future
+        """
+        with self._inflight_lock:
+            future = self.inflight.get(cache_key)
+            if future is not None:
+                self.logger.info(f"相同视频正在处理中，合并请求: {cache_key}")
+                return future
+            future = self.executor.submit(self._run_transcription, video_url, cache_key)
+            self.inflight[cache_key] = future
+        future.add_done_callback(lambda done: self._finish_inflight(cache_key, done))
+        return future
+    
+    def _finish_inflight(self, cache_key: str, future: Future):
+        """
+        任务完成后从处理中列表移除
+        :param cache_key: 结果缓存键
+        :param future: 已完成的任务
+        """
+        with self._inflight_lock:
+            if self.inflight.get(cache_key) is future:
+                del self.inflight[cache_key]
+    
+    def _run_transcription(self, video_url: str, cache_key: str) -> Tuple[Dict, int]:
+        """
+        执行转录并构建响应（在后台线程池中运行）
+        :param video_url: 视频链接
+        :param cache_key: 结果缓存键
+        :return: (响应数据, HTTP状态码)
+        """
+        try:
+            # 调用工作流控制器
+            result = self.workflow_controller.process_video_link(video_url)
+            
+            # 记录结束时间
+            processing_time = datetime.now().isoformat()
+            
+            if result.get('success'):
+                # 构建响应数据
+                response_data = {
+                    'success': True,
+                    'processing_time': processing_time,
+                    'platform_info': {
+                        'type': result.get('link_type'),
+                        'platform_id': result.get('platform_id')
+                    },
+                    'video_info': {
+                        'title': result.get('title', '未知标题'),
+                        'duration': result.get('duration', '未知'),
+                        'size': result.get('size', '未知'),
+                        'url': video_url
+                    },
+                    'output_files': {
+                        'transcript': result.get('transcript', ''),
+                        'transcript_with_timestamps': result.get('transcript_with_timestamps', ''),
+                        'formatted_text': result.get('formatted_text', ''),
+                        'result_json': {
+                            'input_url': video_url,
+                            'platform_type': result.get('link_type'),
+                            'platform_id': result.get('platform_id'),
+                            'processing_time': processing_time,
+                            'text_processing_success': result.get('text_processing_success'),
+                            'text_processing_error': result.get('text_processing_error'),
+                            'message': result.get('message')
+                        }
+                    }
+                }
+                
+                # 记录成功信息
+                self.logger.info(f"转录成功: {result.get('message')}")
+                if result.get('transcript'):
+                    self.logger.info(f"转录文本长度: {len(result.get('transcript'))} 字符")
+                if result.get('formatted_text'):
+                    self.logger.info(f"格式化文本长度: {len(result.get('formatted_text'))} 字符")
+                
+                if self.result_cache is not None:
+                    self.result_cache.set(cache_key, response_data)
+                
+                return response_data, 200
+            
+            # 记录错误信息
+            error_msg = result.get('error', '未知错误')
+            self.logger.error(f"转录失败: {error_msg}")
+            
+            return {
+                'success': False,
+                'error': error_msg,
+                'video_url': video_url,
+                'processing_time': processing_time
+            }, 400
+            
+        except Exception as e:
+            error_msg = f"转录处理异常: {str(e)}"
+            self.logger.error(error_msg)
+            return {
+                'success': False,
+                'error': error_msg,
+                'video_url': video_url,
+                'processing_time': datetime.now().isoformat()
+            }, 500
     
     def run(self, host='0.0.0.0', port=8000, debug=False):
-        """启动API服务器"""
+        """启动API服务器（Flask内置服务器，仅用于开发调试；生产环境使用wsgi.py）"""
         self.logger.info(f"启动API服务器，地址: {host}:{port}")
-        self.app.run(host=host, port=port, debug=debug) 
\ No newline at end of file
+        # 每个请求独立线程，多个转录请求可以同时等待下载和API响应
+        self.app.run(host=host, port=port, debug=debug, threaded=True, request_handler=_BufferedRequestHandler) 
\ No newline at end of file
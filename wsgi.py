@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+WSGI入口
+供gunicorn等生产服务器加载，例如：
+    gunicorn -k gthread -w 2 --threads 8 -b 0.0.0.0:8000 wsgi:app
+"""
+
+from web.api_server import VideoTranscriptionAPI
+
+app = VideoTranscriptionAPI().app